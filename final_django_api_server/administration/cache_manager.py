@@ -94,6 +94,112 @@ class RedisCacheManager:
         key = f'{queue_type}:waiting_count'
         self.redis_client.set(key, count)
 
+    # 아웃박스 이벤트 단위 카운터 적용 스크립트
+    # - KEYS[1]: 적용 완료 마커, KEYS[2..]: 카운터 키
+    # - ARGV[1]: 마커 TTL, ARGV[2..]: 증감값
+    # 마커가 이미 있으면(재시도) 아무것도 하지 않으며, 0 미만으로 내려가지 않음
+    _APPLY_COUNTER_DELTAS_SCRIPT = """
+    if redis.call('SET', KEYS[1], '1', 'NX', 'EX', ARGV[1]) then
+        for i = 2, #KEYS do
+            local value = tonumber(redis.call('GET', KEYS[i]) or '0') + tonumber(ARGV[i])
+            if value < 0 then value = 0 end
+            redis.call('SET', KEYS[i], value)
+        end
+        return 1
+    end
+    return 0
+    """
+
+    def apply_counter_deltas(self, token, deltas, ttl=86400):
+        """
+        카운터 증감을 원자적/멱등적으로 적용 (아웃박스 디스패처용)
+
+        Args:
+            token: 이벤트 고유 식별자 (같은 token은 한 번만 적용)
+            deltas: {'clinic:waiting_count': -1, ...}
+            ttl: 적용 완료 마커 TTL (초)
+
+        Returns:
+            bool: 이번 호출에서 적용했으면 True, 이미 적용된 이벤트면 False
+        """
+        if not self.is_connected():
+            raise ConnectionError('Redis is not connected')
+        if not deltas:
+            return False
+
+        keys = [f'outbox:applied:{token}', *deltas.keys()]
+        args = [ttl, *deltas.values()]
+        return bool(self.redis_client.eval(self._APPLY_COUNTER_DELTAS_SCRIPT, len(keys), *keys, *args))
+
+    # 상태별 체류 시간 통계 적용 스크립트 (아웃박스 이벤트 단위, 멱등)
+    # - KEYS[1]: 적용 완료 마커, KEYS[2..n+1]: 통계 Hash, KEYS[n+2..]: 처리량 카운터
+    # - ARGV[1]: 마커 TTL, ARGV[2]: EWMA 가중치, ARGV[3]: 통계 Hash 개수(n),
+    #   ARGV[4]: 처리량 카운터 TTL, ARGV[5..]: 통계 Hash별 체류 시간(초)
+    _RECORD_STATE_DURATIONS_SCRIPT = """
+    if redis.call('SET', KEYS[1], '1', 'NX', 'EX', ARGV[1]) then
+        local alpha = tonumber(ARGV[2])
+        local n = tonumber(ARGV[3])
+        for i = 2, n + 1 do
+            local seconds = tonumber(ARGV[i + 3])
+            local previous = redis.call('HGET', KEYS[i], 'ewma_seconds')
+            local ewma = seconds
+            if previous then ewma = alpha * seconds + (1 - alpha) * tonumber(previous) end
+            redis.call('HINCRBY', KEYS[i], 'count', 1)
+            redis.call('HINCRBYFLOAT', KEYS[i], 'total_seconds', seconds)
+            redis.call('HSET', KEYS[i], 'ewma_seconds', ewma, 'last_seconds', seconds)
+        end
+        for i = n + 2, #KEYS do
+            redis.call('INCR', KEYS[i])
+            redis.call('EXPIRE', KEYS[i], ARGV[4])
+        end
+        return 1
+    end
+    return 0
+    """
+
+    def record_state_durations(self, token, durations, throughput_keys=(), alpha=0.2,
+                               ttl=86400, throughput_ttl=8 * 86400):
+        """
+        상태별 체류 시간 통계를 원자적/멱등적으로 갱신 (아웃박스 디스패처용)
+
+        Args:
+            token: 이벤트 고유 식별자 (같은 token은 한 번만 적용)
+            durations: [('encounter_stats:WAITING_CLINIC:all', 312.5), ...]
+            throughput_keys: 1씩 증가시킬 일별 처리량 키
+            alpha: EWMA 가중치 (클수록 최근 값 반영이 빠름)
+
+        Returns:
+            bool: 이번 호출에서 적용했으면 True, 이미 적용된 이벤트면 False
+        """
+        if not self.is_connected():
+            raise ConnectionError('Redis is not connected')
+        if not durations and not throughput_keys:
+            return False
+
+        keys = [f'stats:applied:{token}', *(key for key, _ in durations), *throughput_keys]
+        args = [ttl, alpha, len(durations), throughput_ttl, *(seconds for _, seconds in durations)]
+        return bool(self.redis_client.eval(self._RECORD_STATE_DURATIONS_SCRIPT, len(keys), *keys, *args))
+
+    def get_state_stats(self, key):
+        """
+        상태별 체류 시간 통계 조회
+
+        Returns:
+            dict: {'count', 'total_seconds', 'ewma_seconds', 'last_seconds'} 또는 None
+        """
+        if not self.is_connected():
+            return None
+
+        data = self.redis_client.hgetall(key)
+        if not data:
+            return None
+        return {
+            'count': int(data.get('count', 0)),
+            'total_seconds': float(data.get('total_seconds', 0)),
+            'ewma_seconds': float(data.get('ewma_seconds', 0)),
+            'last_seconds': float(data.get('last_seconds', 0)),
+        }
+
     # ========================================
     # 진행 중 카운트 관리
     # ========================================
@@ -249,6 +355,94 @@ class RedisCacheManager:
         data = self.redis_client.get(key)
         return json.loads(data) if data else None
 
+    # ========================================
+    # 대기열 목록 캐시
+    # ========================================
+
+    def invalidate_waiting_queue(self):
+        """
+        대기열 목록 캐시 삭제
+        - 'waiting_queue_list:all', 'waiting_queue_list:doctor_{id}' 전체
+        """
+        if not self.is_connected():
+            return
+
+        keys = ['waiting_queue_list', *self.redis_client.scan_iter(match='waiting_queue_list:*')]
+        self.redis_client.delete(*keys)
+
+    # ========================================
+    # 검사 결과 추이 캐싱
+    # ========================================
+
+    def get_lab_trends(self, patient_id, variant):
+        """
+        환자별 검사 추이 캐시 조회
+
+        Args:
+            patient_id: 환자 ID
+            variant: 조회 조건 (예: 'day:3')
+
+        Returns:
+            dict: 추이 데이터 또는 None
+        """
+        if not self.is_connected():
+            return None
+
+        key = f'lab_trends:{patient_id}'
+        data = self.redis_client.hget(key, variant)
+        return json.loads(data) if data else None
+
+    def set_lab_trends(self, patient_id, variant, data, ttl=86400):
+        """
+        환자별 검사 추이 캐싱 (Hash, 조회 조건별 필드)
+
+        새 검사 결과가 들어오면 invalidate_lab_trends()로 삭제됩니다.
+        TTL은 안전장치용 (기본 1일)
+        """
+        if not self.is_connected():
+            return
+
+        key = f'lab_trends:{patient_id}'
+        self.redis_client.hset(key, variant, json.dumps(data))
+        self.redis_client.expire(key, ttl)
+
+    def invalidate_lab_trends(self, patient_id):
+        """환자별 검사 추이 캐시 삭제 (검사 결과 등록 시 호출)"""
+        if not self.is_connected():
+            return
+
+        self.redis_client.delete(f'lab_trends:{patient_id}')
+
+    # ========================================
+    # 오더 상태별 건수 캐싱 ("추가진료" 탭)
+    # ========================================
+
+    def get_order_counts(self):
+        """오늘 오더의 상태별 건수 캐시 조회"""
+        if not self.is_connected():
+            return None
+
+        data = self.redis_client.get('orders:status_counts')
+        return json.loads(data) if data else None
+
+    def set_order_counts(self, counts, ttl=30):
+        """
+        오늘 오더의 상태별 건수 캐싱 (TTL 30초)
+
+        오더 생성/접수 시 invalidate_order_counts()로 삭제됩니다.
+        """
+        if not self.is_connected():
+            return
+
+        self.redis_client.setex('orders:status_counts', ttl, json.dumps(counts))
+
+    def invalidate_order_counts(self):
+        """오더 상태별 건수 캐시 삭제 (오더 생성/상태 변경 시 호출)"""
+        if not self.is_connected():
+            return
+
+        self.redis_client.delete('orders:status_counts')
+
     # ========================================
     # 유틸리티
     # ========================================
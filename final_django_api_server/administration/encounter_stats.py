@@ -0,0 +1,205 @@
+# administration/encounter_stats.py
+"""
+Encounter 상태별 대기/진료 시간 통계
+- 원본: EncounterStateEvent (append-only 이벤트 로그)
+- 상태 전이 시 아웃박스 디스패처가 Redis 통계를 증분 갱신 (EWMA + 누적 합계)
+- 예상 대기 시간 / 처리량은 Redis Hash 조회만으로 계산 (대기열 테이블 조회 없음)
+"""
+from datetime import date, timedelta
+
+from django.db.models import Avg, Count
+from django.utils import timezone
+
+from .cache_manager import cache_manager
+
+
+# 통계를 유지할 상태 (이 상태에서 빠져나갈 때 체류 시간 기록)
+TRACKED_STATES = (
+    'WAITING_CLINIC',
+    'IN_CLINIC',
+    'WAITING_IMAGING',
+    'IN_IMAGING',
+    'WAITING_RESULTS',
+)
+
+# 의사별 표본이 이보다 적으면 전체 통계로 대체
+MIN_DOCTOR_SAMPLES = 5
+
+# 하루 이상 머문 값은 통계에서 제외 (미처리 방치 건)
+MAX_SAMPLE_SECONDS = 24 * 60 * 60
+
+
+def stats_key(state, doctor_id=None):
+    """상태별 통계 Hash 키 (예: 'encounter_stats:WAITING_CLINIC:doctor_3')"""
+    scope = f'doctor_{doctor_id}' if doctor_id else 'all'
+    return f'encounter_stats:{state}:{scope}'
+
+
+def throughput_key(day, doctor_id=None):
+    """일별 진료 완료 건수 키 (예: 'encounter_throughput:2025-01-01:all')"""
+    scope = f'doctor_{doctor_id}' if doctor_id else 'all'
+    return f'encounter_throughput:{day.isoformat()}:{scope}'
+
+
+def transition_sample(from_state, to_state, doctor_id, seconds, day):
+    """
+    아웃박스 payload에 담을 통계 표본 1건
+
+    Returns:
+        dict 또는 None (통계 대상이 아닌 전이)
+    """
+    track_duration = from_state in TRACKED_STATES and seconds is not None and 0 <= seconds <= MAX_SAMPLE_SECONDS
+    if not track_duration and to_state != 'COMPLETED':
+        return None
+    return {
+        'state': from_state if track_duration else None,
+        'to_state': to_state,
+        'doctor_id': doctor_id,
+        'seconds': seconds if track_duration else None,
+        'day': day.isoformat(),
+    }
+
+
+def apply_stats_samples(token, samples):
+    """
+    통계 표본을 Redis에 반영 (아웃박스 디스패처에서 호출, token 단위 멱등)
+    """
+    durations = []
+    throughput_keys = []
+    for sample in samples or []:
+        doctor_id = sample.get('doctor_id')
+        if sample.get('state'):
+            durations.append((stats_key(sample['state']), sample['seconds']))
+            if doctor_id:
+                durations.append((stats_key(sample['state'], doctor_id), sample['seconds']))
+        if sample.get('to_state') == 'COMPLETED':
+            day = date.fromisoformat(sample['day'])
+            throughput_keys.append(throughput_key(day))
+            if doctor_id:
+                throughput_keys.append(throughput_key(day, doctor_id))
+
+    return cache_manager.record_state_durations(token, durations, throughput_keys)
+
+
+def get_state_stats(state, doctor_id=None):
+    """
+    상태별 체류 시간 통계 (의사별 표본이 부족하면 전체 통계)
+
+    Returns:
+        dict: {'scope', 'count', 'avg_seconds', 'ewma_seconds', 'last_seconds'} 또는 None
+    """
+    candidates = [(f'doctor_{doctor_id}', stats_key(state, doctor_id))] if doctor_id else []
+    candidates.append(('all', stats_key(state)))
+
+    for scope, key in candidates:
+        stats = cache_manager.get_state_stats(key)
+        if not stats or not stats['count']:
+            continue
+        if scope != 'all' and stats['count'] < MIN_DOCTOR_SAMPLES:
+            continue
+        return {
+            'scope': scope,
+            'count': stats['count'],
+            'avg_seconds': round(stats['total_seconds'] / stats['count'], 1),
+            'ewma_seconds': round(stats['ewma_seconds'], 1),
+            'last_seconds': round(stats['last_seconds'], 1),
+        }
+    return None
+
+
+def get_throughput(day=None, doctor_id=None):
+    """일별 진료 완료 건수"""
+    if not cache_manager.is_connected():
+        return None
+    day = day or timezone.localdate()
+    value = cache_manager.redis_client.get(throughput_key(day, doctor_id))
+    return int(value) if value else 0
+
+
+def estimate_wait(encounter):
+    """
+    Encounter의 예상 대기 시간
+
+    현재 상태의 EWMA 체류 시간에서 이미 머문 시간을 뺀 값을 남은 시간으로 봅니다.
+
+    Returns:
+        dict: {'state', 'expected_seconds', 'elapsed_seconds', 'remaining_seconds', 'basis'}
+    """
+    state = encounter.workflow_state
+    elapsed = None
+    if encounter.state_entered_at:
+        elapsed = max((timezone.now() - encounter.state_entered_at).total_seconds(), 0)
+
+    stats = get_state_stats(state, encounter.assigned_doctor_id) if state in TRACKED_STATES else None
+    expected = stats['ewma_seconds'] if stats else None
+    remaining = max(expected - elapsed, 0) if expected is not None and elapsed is not None else expected
+
+    return {
+        'state': state,
+        'expected_seconds': expected,
+        'elapsed_seconds': round(elapsed, 1) if elapsed is not None else None,
+        'remaining_seconds': round(remaining, 1) if remaining is not None else None,
+        'basis': stats,
+    }
+
+
+def summarize_from_events(days=7, doctor_id=None):
+    """
+    이벤트 로그 기반 상태별 평균 체류 시간 (Redis 장애/초기화 시 대체용)
+
+    대기열 테이블(encounters)이 아닌 이벤트 로그만 조회합니다.
+    """
+    from doctor.models import EncounterStateEvent
+
+    events = EncounterStateEvent.objects.filter(
+        occurred_at__gte=timezone.now() - timedelta(days=days),
+        from_state__in=TRACKED_STATES,
+        duration_seconds__isnull=False,
+        duration_seconds__lte=MAX_SAMPLE_SECONDS,
+    )
+    if doctor_id:
+        events = events.filter(doctor_id=doctor_id)
+
+    rows = events.values('from_state').annotate(count=Count('event_id'), avg_seconds=Avg('duration_seconds'))
+    return {
+        row['from_state']: {
+            'scope': f'doctor_{doctor_id}' if doctor_id else 'all',
+            'count': row['count'],
+            'avg_seconds': round(row['avg_seconds'], 1),
+            'ewma_seconds': None,
+            'last_seconds': None,
+        }
+        for row in rows
+    }
+
+
+def rebuild_stats_from_events(days=7, batch_size=2000):
+    """
+    이벤트 로그를 재생하여 Redis 통계 재구성
+
+    Returns:
+        int: 반영한 이벤트 수
+    """
+    from doctor.models import EncounterStateEvent
+
+    if not cache_manager.is_connected():
+        raise ConnectionError('Redis is not connected')
+
+    for pattern in ('encounter_stats:*', 'encounter_throughput:*', 'stats:applied:rebuild:*'):
+        keys = list(cache_manager.redis_client.scan_iter(match=pattern))
+        if keys:
+            cache_manager.redis_client.delete(*keys)
+
+    events = (
+        EncounterStateEvent.objects.filter(occurred_at__gte=timezone.now() - timedelta(days=days))
+        .order_by('event_id')
+        .values_list('event_id', 'from_state', 'to_state', 'doctor_id', 'duration_seconds', 'occurred_at')
+    )
+
+    applied = 0
+    for event_id, from_state, to_state, doctor_id, seconds, occurred_at in events.iterator(chunk_size=batch_size):
+        sample = transition_sample(from_state, to_state, doctor_id, seconds, timezone.localdate(occurred_at))
+        if sample:
+            apply_stats_samples(f'rebuild:{event_id}', [sample])
+            applied += 1
+    return applied
@@ -0,0 +1,31 @@
+# administration/management/commands/rebuild_encounter_stats.py
+"""
+Encounter 상태 이벤트 로그로 Redis 대기/진료 시간 통계 재구성
+
+사용 예:
+    python manage.py rebuild_encounter_stats
+    python manage.py rebuild_encounter_stats --days 30
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from administration.encounter_stats import rebuild_stats_from_events
+
+
+class Command(BaseCommand):
+    help = 'EncounterStateEvent 로그를 재생하여 Redis 대기/진료 시간 통계를 다시 만듭니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=7,
+            help='재생할 기간(일) (기본값: 7)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            applied = rebuild_stats_from_events(days=options['days'])
+        except ConnectionError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(f'[OK] {applied}건의 이벤트로 통계를 재구성했습니다.'))
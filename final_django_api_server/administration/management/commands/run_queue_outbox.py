@@ -0,0 +1,62 @@
+# administration/management/commands/run_queue_outbox.py
+"""
+대기열 아웃박스 디스패처 워커
+
+사용 예:
+    python manage.py run_queue_outbox
+    python manage.py run_queue_outbox --once
+    python manage.py run_queue_outbox --batch-size 200 --interval 0.2
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from administration.outbox import dispatch_queue_outbox
+
+
+class Command(BaseCommand):
+    help = '대기열 아웃박스 이벤트(카운터/캐시/WebSocket)를 배치로 적용합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='한 번에 처리할 이벤트 수 (기본값: 100)'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0.5,
+            help='처리할 이벤트가 없을 때 대기 시간(초) (기본값: 0.5)'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='남은 이벤트를 모두 처리한 뒤 종료합니다.'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        interval = options['interval']
+        once = options['once']
+
+        self.stdout.write('[OK] Queue outbox dispatcher started')
+        try:
+            while True:
+                try:
+                    processed = dispatch_queue_outbox(batch_size=batch_size)
+                except Exception as e:
+                    self.stderr.write(f'!!! 아웃박스 처리 실패: {e}')
+                    processed = 0
+
+                if processed:
+                    self.stdout.write(f'  {processed}건 처리')
+                if processed < batch_size:
+                    if once:
+                        break
+                    time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write('[OK] Queue outbox dispatcher stopped')
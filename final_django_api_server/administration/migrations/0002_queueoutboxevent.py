@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-19 06:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('administration', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueueOutboxEvent',
+            fields=[
+                ('event_id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('event_type', models.CharField(max_length=50)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('attempts', models.IntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': '대기열 아웃박스',
+                'verbose_name_plural': '대기열 아웃박스',
+                'db_table': 'hospital"."queue_outbox_events',
+                'ordering': ['event_id'],
+                'indexes': [models.Index(condition=models.Q(('processed_at__isnull', True)), fields=['event_id'], name='queue_outbox_pending_idx')],
+            },
+        ),
+    ]
@@ -22,4 +22,36 @@ class Administration(models.Model):
         verbose_name_plural = '원무과'
     
     def __str__(self):
-        return f"{self.name} ({self.employee_no})"
\ No newline at end of file
+        return f"{self.name} ({self.employee_no})"
+
+class QueueOutboxEvent(models.Model):
+    """
+    대기열 부수효과 아웃박스
+    - Encounter 상태 변경과 같은 트랜잭션에서 기록
+    - 디스패처가 배치로 꺼내 Redis 카운터/캐시 무효화/WebSocket 알림 적용
+    """
+
+    event_id = models.BigAutoField(primary_key=True)
+    event_type = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict, blank=True)
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        db_table = 'hospital"."queue_outbox_events'
+        verbose_name = '대기열 아웃박스'
+        verbose_name_plural = '대기열 아웃박스'
+        ordering = ['event_id']
+        indexes = [
+            # 미처리 이벤트만 인덱싱 (디스패처 조회용)
+            models.Index(
+                fields=['event_id'],
+                name='queue_outbox_pending_idx',
+                condition=models.Q(processed_at__isnull=True),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} #{self.event_id}"
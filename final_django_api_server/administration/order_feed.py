@@ -0,0 +1,190 @@
+# administration/order_feed.py
+"""
+통합 오더 피드 ("추가진료" 탭용)
+- LabOrder + DoctorToRadiologyOrder를 UNION ALL 단일 쿼리로 조회
+- 공통 컬럼 형태로 투영 후 DB에서 시간순 정렬
+- (시간, 피드 ID) 기준 keyset 페이지네이션
+- 상태별 건수는 Redis에 캐싱
+"""
+import base64
+from datetime import datetime
+
+from django.db.models import Case, CharField, Count, F, Q, Value, When
+from django.db.models.functions import Cast, Coalesce, Concat
+from django.utils import timezone
+
+from doctor.models import LabOrder, DoctorToRadiologyOrder
+from .cache_manager import cache_manager
+
+
+# 피드 공통 컬럼 (UNION ALL 양쪽이 같은 순서로 투영해야 함)
+FEED_COLUMNS = (
+    'feed_id', 'feed_type', 'feed_type_display', 'order_name',
+    'patient_no', 'patient_name', 'doctor_name', 'department_name',
+    'feed_ts', 'feed_status',
+)
+
+STATUS_DISPLAY = {
+    ('LAB', 'REQUESTED'): '검사대기',
+    ('IMAGING', 'REQUESTED'): '촬영대기',
+}
+
+
+def today_start():
+    """오늘 00:00 (로컬 시간)"""
+    return timezone.localtime(timezone.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def encode_cursor(feed_ts, feed_id):
+    """(시간, 피드 ID) -> URL-safe 커서 문자열"""
+    raw = f'{feed_ts.isoformat()}|{feed_id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """커서 문자열 -> (시간, 피드 ID). 형식이 잘못되면 ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        ts_text, feed_id = raw.split('|', 1)
+        return datetime.fromisoformat(ts_text), feed_id
+    except Exception as exc:
+        raise ValueError('잘못된 cursor 값입니다.') from exc
+
+
+def _keyset_filter(cursor):
+    """최신순 정렬 기준 다음 페이지 조건"""
+    if not cursor:
+        return Q()
+    cursor_ts, cursor_id = cursor
+    return Q(feed_ts__lt=cursor_ts) | Q(feed_ts=cursor_ts, feed_id__lt=cursor_id)
+
+
+def _lab_feed(order_status, since, cursor):
+    order_type_display = Case(
+        *[When(order_type=value, then=Value(label)) for value, label in LabOrder.OrderType.choices],
+        default=F('order_type'),
+        output_field=CharField(),
+    )
+    return (
+        LabOrder.objects.filter(status=order_status, created_at__gte=since)
+        .annotate(
+            feed_id=Concat(Value('lab_'), Cast('order_id', CharField()), output_field=CharField()),
+            feed_ts=F('created_at'),
+        )
+        .filter(_keyset_filter(cursor))
+        .values(
+            feed_id=F('feed_id'),
+            feed_type=Value('LAB', output_field=CharField()),
+            feed_type_display=Value('진단검사', output_field=CharField()),
+            order_name=order_type_display,
+            patient_no=F('patient__patient_id'),
+            patient_name=F('patient__name'),
+            doctor_name=F('doctor__name'),
+            department_name=Coalesce(F('doctor__department__dept_name'), Value('N/A'), output_field=CharField()),
+            feed_ts=F('feed_ts'),
+            feed_status=F('status'),
+        )
+    )
+
+
+def _imaging_feed(order_status, since, cursor):
+    return (
+        DoctorToRadiologyOrder.objects.filter(status=order_status, ordered_at__gte=since)
+        .annotate(
+            feed_id=Concat(Value('img_'), Cast('order_id', CharField()), output_field=CharField()),
+            feed_ts=F('ordered_at'),
+        )
+        .filter(_keyset_filter(cursor))
+        .values(
+            feed_id=F('feed_id'),
+            feed_type=Value('IMAGING', output_field=CharField()),
+            feed_type_display=Value('영상의학', output_field=CharField()),
+            order_name=Concat(
+                F('modality'), Value(' ('), Coalesce(F('body_part'), Value('전신')), Value(')'),
+                output_field=CharField(),
+            ),
+            patient_no=F('patient__patient_id'),
+            patient_name=F('patient__name'),
+            doctor_name=F('doctor__name'),
+            department_name=Coalesce(F('doctor__department__dept_name'), Value('N/A'), output_field=CharField()),
+            feed_ts=F('feed_ts'),
+            feed_status=F('status'),
+        )
+    )
+
+
+def fetch_order_feed(order_status='REQUESTED', limit=50, cursor=None, since=None):
+    """
+    통합 오더 피드 한 페이지 조회 (UNION ALL + ORDER BY + LIMIT 단일 쿼리)
+
+    Args:
+        order_status: 조회할 오더 상태
+        limit: 페이지 크기
+        cursor: decode_cursor() 결과 (없으면 첫 페이지)
+        since: 조회 시작 시간 (기본값: 오늘 00:00)
+
+    Returns:
+        (results, next_cursor)
+    """
+    since = since or today_start()
+    feed = (
+        _lab_feed(order_status, since, cursor)
+        .union(_imaging_feed(order_status, since, cursor), all=True)
+        .order_by('-feed_ts', '-feed_id')
+    )
+    # 다음 페이지 존재 여부 확인용으로 1건 더 조회
+    rows = list(feed[:limit + 1])
+    has_next = len(rows) > limit
+    rows = rows[:limit]
+
+    results = [
+        {
+            'id': row['feed_id'],
+            'type': row['feed_type'],
+            'type_display': row['feed_type_display'],
+            'order_name': row['order_name'],
+            'patient_id': row['patient_no'],
+            'patient_name': row['patient_name'],
+            'doctor_name': row['doctor_name'],
+            'department_name': row['department_name'],
+            'created_at': row['feed_ts'],
+            'status': row['feed_status'],
+            'status_display': STATUS_DISPLAY.get((row['feed_type'], row['feed_status']), row['feed_status']),
+        }
+        for row in rows
+    ]
+
+    next_cursor = encode_cursor(rows[-1]['feed_ts'], rows[-1]['feed_id']) if has_next else None
+    return results, next_cursor
+
+
+def get_order_status_counts(since=None):
+    """
+    오늘 오더의 상태별 건수 (Redis 캐시 우선)
+
+    Returns:
+        {'LAB': {'REQUESTED': 3, ...}, 'IMAGING': {...}, 'total': {...}}
+    """
+    counts = cache_manager.get_order_counts()
+    if counts is not None:
+        return counts
+
+    since = since or today_start()
+    lab_counts = dict(
+        LabOrder.objects.filter(created_at__gte=since)
+        .values_list('status')
+        .annotate(count=Count('order_id'))
+    )
+    imaging_counts = dict(
+        DoctorToRadiologyOrder.objects.filter(ordered_at__gte=since)
+        .values_list('status')
+        .annotate(count=Count('order_id'))
+    )
+
+    total = dict(lab_counts)
+    for order_status, count in imaging_counts.items():
+        total[order_status] = total.get(order_status, 0) + count
+
+    counts = {'LAB': lab_counts, 'IMAGING': imaging_counts, 'total': total}
+    cache_manager.set_order_counts(counts)
+    return counts
@@ -0,0 +1,167 @@
+# administration/outbox.py
+"""
+대기열 부수효과 트랜잭셔널 아웃박스
+- 요청 스레드: Encounter 변경과 같은 트랜잭션에서 QueueOutboxEvent만 기록
+- 디스패처 (run_queue_outbox 커맨드 / Celery task): 미처리 이벤트를 배치로 꺼내
+  Redis 카운터 증감, 대기/진료 시간 통계, 대기열 캐시 무효화, WebSocket 알림을 적용
+- 카운터는 이벤트 ID 기반 마커로 멱등 적용 (재시도해도 중복 증감 없음)
+"""
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+from django.utils import timezone
+
+from .cache_manager import cache_manager
+from .encounter_stats import apply_stats_samples
+from .models import QueueOutboxEvent
+
+
+# 이 횟수 이상 실패한 이벤트는 더 이상 재시도하지 않음 (last_error 확인용으로 보관)
+MAX_ATTEMPTS = 10
+
+
+def send_queue_update_websocket(message="대기열이 업데이트되었습니다.", extra_data=None):
+    """
+    WebSocket을 통해 대기열 변경 알림을 전송하는 헬퍼 함수
+
+    Args:
+        message: 전송할 메시지
+        extra_data: 추가 데이터 (dict)
+    """
+    try:
+        waiting_count = cache_manager.get_waiting_count('clinic')
+        in_progress_count = cache_manager.get_in_progress_count('clinic')
+
+        channel_layer = get_channel_layer()
+        data = {
+            "waiting_count": waiting_count,
+            "in_progress_count": in_progress_count,
+        }
+
+        if extra_data:
+            data.update(extra_data)
+
+        async_to_sync(channel_layer.group_send)(
+            "clinic_dashboard",
+            {
+                "type": "update_queue",
+                "message": message,
+                "data": data
+            }
+        )
+    except Exception as e:
+        print(f"!!! WebSocket 전송 실패: {e}")
+
+
+def counter_key(queue_type, kind):
+    """카운터 키 (예: 'clinic:waiting_count', 'clinic:in_progress_count')"""
+    return f'{queue_type}:{kind}_count'
+
+
+def queue_counter_deltas(old_state, new_state, queue_type='clinic'):
+    """
+    워크플로우 상태 전이에 따른 대기/진료중 카운터 증감
+
+    - WAITING_CLINIC 진입/이탈: 대기 +1/-1
+    - IN_CLINIC 진입/이탈: 진료중 +1/-1
+    - old_state가 None이면 신규 접수
+    """
+    deltas = {}
+    if old_state == new_state:
+        return deltas
+
+    for state, kind in (('WAITING_CLINIC', 'waiting'), ('IN_CLINIC', 'in_progress')):
+        key = counter_key(queue_type, kind)
+        if new_state == state:
+            deltas[key] = deltas.get(key, 0) + 1
+        if old_state == state:
+            deltas[key] = deltas.get(key, 0) - 1
+    return deltas
+
+
+def enqueue_queue_effects(event_type, counters=None, invalidate_queue=True, message=None, extra_data=None,
+                          stats=None):
+    """
+    대기열 부수효과를 아웃박스에 기록 (반드시 상태 변경과 같은 트랜잭션 안에서 호출)
+
+    Args:
+        event_type: 이벤트 종류 (예: 'ENCOUNTER_REGISTERED')
+        counters: {'clinic:waiting_count': 1, ...} 카운터 증감
+        invalidate_queue: 대기열 목록 캐시 무효화 여부
+        message: WebSocket 알림 메시지 (없으면 알림 생략)
+        extra_data: WebSocket 알림 추가 데이터
+        stats: 대기/진료 시간 통계 표본 (encounter_stats.transition_sample 결과 목록)
+    """
+    payload = {
+        'counters': {key: delta for key, delta in (counters or {}).items() if delta},
+        'invalidate_queue': invalidate_queue,
+        'broadcast': {'message': message, 'extra_data': extra_data} if message else None,
+        'stats': stats or [],
+    }
+    return QueueOutboxEvent.objects.create(event_type=event_type, payload=payload)
+
+
+def dispatch_queue_outbox(batch_size=100):
+    """
+    미처리 아웃박스 이벤트를 배치로 적용
+
+    - SELECT ... FOR UPDATE SKIP LOCKED로 여러 디스패처가 동시에 실행돼도 안전
+    - 캐시 무효화는 배치당 1회, 알림은 이벤트 순서대로 전송
+
+    Returns:
+        int: 처리 완료된 이벤트 수
+    """
+    if not cache_manager.is_connected():
+        return 0
+
+    with transaction.atomic():
+        events = list(
+            QueueOutboxEvent.objects.select_for_update(skip_locked=True)
+            .filter(processed_at__isnull=True, attempts__lt=MAX_ATTEMPTS)
+            .order_by('event_id')[:batch_size]
+        )
+        if not events:
+            return 0
+
+        processed_ids = []
+        failed = []
+        invalidate_queue = False
+        broadcasts = []
+
+        for event in events:
+            payload = event.payload or {}
+            try:
+                cache_manager.apply_counter_deltas(f'queue:{event.event_id}', payload.get('counters'))
+                apply_stats_samples(f'queue:{event.event_id}', payload.get('stats'))
+            except Exception as e:
+                event.attempts += 1
+                event.last_error = str(e)
+                failed.append(event)
+                continue
+
+            processed_ids.append(event.event_id)
+            invalidate_queue = invalidate_queue or payload.get('invalidate_queue', False)
+            if payload.get('broadcast'):
+                broadcasts.append(payload['broadcast'])
+
+        # 캐시를 먼저 비운 뒤 알림 (클라이언트가 최신 목록을 다시 조회하도록)
+        if invalidate_queue:
+            cache_manager.invalidate_waiting_queue()
+        for broadcast in broadcasts:
+            send_queue_update_websocket(message=broadcast['message'], extra_data=broadcast.get('extra_data'))
+
+        if processed_ids:
+            QueueOutboxEvent.objects.filter(event_id__in=processed_ids).update(processed_at=timezone.now())
+        if failed:
+            QueueOutboxEvent.objects.bulk_update(failed, ['attempts', 'last_error'])
+
+    return len(processed_ids)
+
+
+def purge_processed_queue_outbox(days=7):
+    """처리 완료 후 일정 기간이 지난 아웃박스 이벤트 삭제"""
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = QueueOutboxEvent.objects.filter(processed_at__lt=cutoff).delete()
+    return deleted
@@ -0,0 +1,26 @@
+from celery import shared_task
+
+from .outbox import dispatch_queue_outbox, purge_processed_queue_outbox
+
+
+@shared_task(name='administration.dispatch_queue_outbox')
+def dispatch_queue_outbox_task(batch_size=100):
+    """
+    대기열 아웃박스 주기 처리 (beat 안전망)
+
+    run_queue_outbox 워커가 없는 환경에서도 이벤트가 밀리지 않도록
+    남은 이벤트를 모두 처리합니다.
+    """
+    total = 0
+    while True:
+        processed = dispatch_queue_outbox(batch_size=batch_size)
+        total += processed
+        if processed < batch_size:
+            break
+    return {'processed': total}
+
+
+@shared_task(name='administration.purge_queue_outbox')
+def purge_queue_outbox_task(days=7):
+    """처리 완료된 오래된 아웃박스 이벤트 정리"""
+    return {'deleted': purge_processed_queue_outbox(days=days)}
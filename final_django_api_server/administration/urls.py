@@ -8,11 +8,14 @@ from .views import (
     AppointmentDetailView,
     EncounterListView,
     EncounterDetailView,
+    EncounterExpectedWaitView,
+    QueueTimeStatsView,
     WaitingQueueView,
     CallNextPatientView,
     DashboardStatsView,
     PendingOrdersView,
     ConfirmOrderView,
+    BatchConfirmOrderView,
 )
 
 urlpatterns = [
@@ -32,13 +35,16 @@ urlpatterns = [
     # 진료 기록 (접수)
     path('encounters/', EncounterListView.as_view(), name='encounter_list'),
     path('encounters/<int:encounter_id>/', EncounterDetailView.as_view(), name='encounter_detail'),
+    path('encounters/<int:encounter_id>/expected-wait/', EncounterExpectedWaitView.as_view(), name='encounter_expected_wait'),
 
     # 대기열 관리 (Queue + Cache)
     path('queue/', WaitingQueueView.as_view(), name='waiting_queue'),  # /api/administration/queue/
     path('queue/waiting/', WaitingQueueView.as_view(), name='waiting_queue_alt'),  # 하위 호환성 유지
     path('queue/call-next/', CallNextPatientView.as_view(), name='call_next_patient'),
+    path('queue/time-stats/', QueueTimeStatsView.as_view(), name='queue_time_stats'),
 
     # 오더 관리 (추가진료 탭)
     path('orders/pending/', PendingOrdersView.as_view(), name='pending_orders'),
+    path('orders/confirm/batch/', BatchConfirmOrderView.as_view(), name='batch_confirm_orders'),
     path('orders/<int:order_id>/confirm/', ConfirmOrderView.as_view(), name='confirm_order'),
 ]
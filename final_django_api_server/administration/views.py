@@ -14,42 +14,24 @@ from .serializers import (
 from django.db.models import Q, Count
 from datetime import date, datetime
 from .cache_manager import cache_manager
+from .order_feed import fetch_order_feed, get_order_status_counts, decode_cursor
+from .outbox import enqueue_queue_effects, queue_counter_deltas
+from .encounter_stats import estimate_wait, get_state_stats, get_throughput, summarize_from_events, TRACKED_STATES
+from doctor.encounter_workflow import (
+    transition_encounter, transition_encounters, record_state_events, InvalidTransition, TransitionConflict,
+)
 from django.db import transaction
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
-
-
-def send_queue_update_websocket(message="대기열이 업데이트되었습니다.", extra_data=None):
-    """
-    WebSocket을 통해 대기열 변경 알림을 전송하는 헬퍼 함수
 
-    Args:
-        message: 전송할 메시지
-        extra_data: 추가 데이터 (dict)
-    """
-    try:
-        waiting_count = cache_manager.get_waiting_count('clinic')
-        in_progress_count = cache_manager.get_in_progress_count('clinic')
 
-        channel_layer = get_channel_layer()
-        data = {
-            "waiting_count": waiting_count,
-            "in_progress_count": in_progress_count,
-        }
-
-        if extra_data:
-            data.update(extra_data)
-
-        async_to_sync(channel_layer.group_send)(
-            "clinic_dashboard",
-            {
-                "type": "update_queue",
-                "message": message,
-                "data": data
-            }
-        )
-    except Exception as e:
-        print(f"!!! WebSocket 전송 실패: {e}")
+# 프론트엔드 encounter_status 값 -> workflow_state
+ENCOUNTER_STATUS_ALIASES = {
+    'IN_PROGRESS': Encounter.WorkflowState.IN_CLINIC,
+    'IN_CLINIC': Encounter.WorkflowState.IN_CLINIC,
+    'WAITING': Encounter.WorkflowState.WAITING_CLINIC,
+    'COMPLETED': Encounter.WorkflowState.COMPLETED,
+    'CANCELLED': Encounter.WorkflowState.CANCELLED,
+    'WAITING_RESULTS': Encounter.WorkflowState.WAITING_RESULTS,
+}
 
 
 class AdministrationDashboardView(APIView):
@@ -336,24 +318,26 @@ class EncounterListView(APIView):
                     
                     encounter = serializer.save(**save_kwargs)
 
-                    # 3. Redis 대기 카운트 증가
-                    # 바로 진료 대기 상태로 접수된 경우 카운트 증가
-                    if initial_workflow_state == Encounter.WorkflowState.WAITING_CLINIC:
-                         cache_manager.increment_waiting_count('clinic')
-
-                # 4. Redis 캐시 무효화
-                cache_manager.redis_client.delete('waiting_queue_list')
-
-                # 5. WebSocket 알림
-                send_queue_update_websocket(
-                    message=f"새로운 환자 접수: {encounter.patient.name}",
-                    extra_data={
-                        "new_encounter": {
-                            "patient_name": encounter.patient.name,
-                            "patient_id": encounter.patient.patient_id
+                    # 3. 접수 이벤트 로그 기록
+                    samples = record_state_events(
+                        [(encounter.encounter_id, None, None, encounter.assigned_doctor_id)],
+                        initial_workflow_state, encounter.state_entered_at
+                    )
+
+                    # 4. 대기 카운트 증가 / 캐시 무효화 / WebSocket 알림은 아웃박스로 기록
+                    # (바로 진료 대기 상태로 접수된 경우 카운트 증가)
+                    enqueue_queue_effects(
+                        'ENCOUNTER_REGISTERED',
+                        counters=queue_counter_deltas(None, initial_workflow_state),
+                        stats=samples,
+                        message=f"새로운 환자 접수: {encounter.patient.name}",
+                        extra_data={
+                            "new_encounter": {
+                                "patient_name": encounter.patient.name,
+                                "patient_id": encounter.patient.patient_id
+                            }
                         }
-                    }
-                )
+                    )
 
                 return Response({
                     'success': True,
@@ -390,9 +374,7 @@ class EncounterDetailView(APIView):
     def patch(self, request, encounter_id):
         """방문 세션 상태 변경 (Encounter)"""
         try:
-            encounter = Encounter.objects.get(encounter_id=encounter_id)
-            old_workflow_state = encounter.workflow_state
-            updated = False
+            encounter = Encounter.objects.select_related('patient').get(encounter_id=encounter_id)
 
             # 워크플로우 상태 변경
             new_workflow_state = None
@@ -400,123 +382,66 @@ class EncounterDetailView(APIView):
             # 1. Frontend API (encounter_status) - 우선 처리
             encounter_status = request.data.get('encounter_status')
             if encounter_status:
-                if encounter_status == 'IN_PROGRESS':
-                    new_workflow_state = Encounter.WorkflowState.IN_CLINIC
-                elif encounter_status == 'IN_CLINIC':
-                    new_workflow_state = Encounter.WorkflowState.IN_CLINIC
-                elif encounter_status == 'WAITING':
-                    new_workflow_state = Encounter.WorkflowState.WAITING_CLINIC
-                elif encounter_status == 'COMPLETED':
-                    new_workflow_state = Encounter.WorkflowState.COMPLETED
-                elif encounter_status == 'CANCELLED':
-                    new_workflow_state = Encounter.WorkflowState.CANCELLED
-                elif encounter_status == 'WAITING_RESULTS':
-                    new_workflow_state = Encounter.WorkflowState.WAITING_RESULTS
+                new_workflow_state = ENCOUNTER_STATUS_ALIASES.get(encounter_status)
 
             # 2. Internal / Legacy (workflow_state, status) - Fallback
             if not new_workflow_state:
                 new_workflow_state = request.data.get('workflow_state') or request.data.get('status')
 
-            if new_workflow_state:
-                encounter.workflow_state = new_workflow_state
-                encounter.state_entered_at = datetime.now()  # 상태 진입 시간 갱신
-
-                # FHIR 레벨 status 자동 설정
-                if new_workflow_state in [Encounter.WorkflowState.REQUESTED, Encounter.WorkflowState.REGISTERED]:
-                    encounter.status = Encounter.Status.PLANNED
-                elif new_workflow_state in [Encounter.WorkflowState.WAITING_CLINIC, Encounter.WorkflowState.IN_CLINIC,
-                                            Encounter.WorkflowState.WAITING_IMAGING, Encounter.WorkflowState.IN_IMAGING,
-                                            Encounter.WorkflowState.WAITING_RESULTS]:
-                    encounter.status = Encounter.Status.IN_PROGRESS
-                elif new_workflow_state == Encounter.WorkflowState.COMPLETED:
-                    encounter.status = Encounter.Status.COMPLETED
-                elif new_workflow_state == Encounter.WorkflowState.CANCELLED:
-                    encounter.status = Encounter.Status.CANCELLED
-
-                updated = True
-
-                # 완료/취소 시 종료 시간 기록
-                if new_workflow_state in [Encounter.WorkflowState.COMPLETED, Encounter.WorkflowState.CANCELLED]:
-                    encounter.end_time = datetime.now()
-
-                # Redis 카운트 업데이트
-                if old_workflow_state == Encounter.WorkflowState.WAITING_CLINIC and new_workflow_state == Encounter.WorkflowState.IN_CLINIC:
-                    cache_manager.decrement_waiting_count('clinic')
-                    cache_manager.increment_in_progress_count('clinic')
-                elif old_workflow_state == Encounter.WorkflowState.IN_CLINIC and new_workflow_state == Encounter.WorkflowState.COMPLETED:
-                    cache_manager.decrement_in_progress_count('clinic')
-
             # 위치 변경
+            location_kwargs = {}
             if 'current_location' in request.data:
-                encounter.current_location = request.data['current_location']
-                updated = True
+                location_kwargs['current_location'] = request.data['current_location']
 
-            # 문진표 데이터 처리
             questionnaire_data = request.data.get('questionnaire_data')
             questionnaire_status = request.data.get('questionnaire_status')
-            
-            if questionnaire_data is not None or questionnaire_status is not None:
-                from doctor.models import Questionnaire
-                
-                # 기존 문진표 가져오기 또는 생성
-                questionnaire, created = Questionnaire.objects.get_or_create(
-                    encounter=encounter,
-                    defaults={
-                        'patient': encounter.patient,
-                        'status': Questionnaire.QStatus.NOT_STARTED,
-                        'data': {}
-                    }
-                )
-                
-                if questionnaire_data is not None:
-                    # null인 경우 (삭제 요청) 처리
-                    if questionnaire_data is None: 
-                         questionnaire.data = {}
-                    else:
-                         questionnaire.data = questionnaire_data
-                    updated = True
-                    
-                if questionnaire_status:
-                    questionnaire.status = questionnaire_status
-                    updated = True
-                    
-                questionnaire.save()
-
-            if updated:
-                encounter.save()
-
-                # 캐시 무효화
-                cache_manager.redis_client.delete('waiting_queue_list')
-
-                # WebSocket 알림
-                send_queue_update_websocket(
-                    message=f"환자 상태 변경: {encounter.patient.name} ({encounter.get_status_display()})",
-                    extra_data={
-                        "updated_encounter": {
-                            "id": encounter.encounter_id,
-                            "patient_name": encounter.patient.name,
-                            "status": encounter.status
-                        }
-                    }
-                )
+            questionnaire_updated = questionnaire_data is not None or bool(questionnaire_status)
 
+            if not (new_workflow_state or location_kwargs or questionnaire_updated):
                 return Response(
-                    {
-                        'message': '방문 상태가 업데이트되었습니다.',
-                        'encounter': EncounterSerializer(encounter).data
-                    },
-                    status=status.HTTP_200_OK
+                    {'error': '수정할 데이터가 없습니다.'},
+                    status=status.HTTP_400_BAD_REQUEST
                 )
 
+            with transaction.atomic():
+                # 문진표 데이터 처리
+                if questionnaire_updated:
+                    from doctor.models import Questionnaire
+
+                    # 기존 문진표 가져오기 또는 생성
+                    questionnaire, created = Questionnaire.objects.get_or_create(
+                        encounter=encounter,
+                        defaults={
+                            'patient': encounter.patient,
+                            'status': Questionnaire.QStatus.NOT_STARTED,
+                            'data': {}
+                        }
+                    )
+                    if questionnaire_data is not None:
+                        questionnaire.data = questionnaire_data
+                    if questionnaire_status:
+                        questionnaire.status = questionnaire_status
+                    questionnaire.save()
+
+                # 상태/위치 변경 + 카운트/캐시/알림 이벤트 (조건부 UPDATE)
+                transition_encounter(encounter, new_workflow_state or None, **location_kwargs)
+
             return Response(
-                {'error': '수정할 데이터가 없습니다.'},
-                status=status.HTTP_400_BAD_REQUEST
+                {
+                    'message': '방문 상태가 업데이트되었습니다.',
+                    'encounter': EncounterSerializer(encounter).data
+                },
+                status=status.HTTP_200_OK
             )
         except Encounter.DoesNotExist:
             return Response(
                 {'error': '방문 기록을 찾을 수 없습니다.'},
                 status=status.HTTP_404_NOT_FOUND
             )
+        except InvalidTransition as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except TransitionConflict as e:
+            return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
 
 
 class WaitingQueueView(APIView):
@@ -605,42 +530,36 @@ class CallNextPatientView(APIView):
         - Encounter를 IN_CLINIC으로 변경
         - Redis 카운트 조정
         """
-        # 1. DB에서 가장 오래 대기 중인 환자 가져오기 (FIFO - state_entered_at 기준)
-        encounter = Encounter.objects.filter(
-            workflow_state=Encounter.WorkflowState.WAITING_CLINIC
-        ).select_related('patient').order_by('state_entered_at').first()
-
-        if not encounter:
-            return Response({
-                'success': False,
-                'message': '대기 중인 환자가 없습니다.'
-            }, status=status.HTTP_200_OK)
+        with transaction.atomic():
+            # 1. DB에서 가장 오래 대기 중인 환자 가져오기 (FIFO - state_entered_at 기준)
+            #    동시 호출 시 같은 환자를 중복 호출하지 않도록 잠긴 행은 건너뜀
+            encounter = Encounter.objects.select_for_update(
+                skip_locked=True, of=('self',)
+            ).filter(
+                workflow_state=Encounter.WorkflowState.WAITING_CLINIC
+            ).select_related('patient').order_by('state_entered_at').first()
+
+            if not encounter:
+                return Response({
+                    'success': False,
+                    'message': '대기 중인 환자가 없습니다.'
+                }, status=status.HTTP_200_OK)
 
-        # 2. Encounter 상태 업데이트
-        encounter.status = Encounter.Status.IN_PROGRESS
-        encounter.workflow_state = Encounter.WorkflowState.IN_CLINIC
-        encounter.state_entered_at = datetime.now()
-        encounter.save()
-
-        # 3. Redis 카운트 업데이트
-        cache_manager.decrement_waiting_count('clinic')
-        cache_manager.increment_in_progress_count('clinic')
-
-        # 4. Redis 캐시 무효화 (대기열 변경)
-        cache_manager.redis_client.delete('waiting_queue_list')
-
-        # 5. WebSocket으로 실시간 알림 전송
-        send_queue_update_websocket(
-            message=f"환자 호출: {encounter.patient.name}",
-            extra_data={
-                "called_patient": {
-                    "name": encounter.patient.name,
-                    "id": encounter.patient.patient_id
+            # 2. Encounter 상태 전이 (카운트/캐시/알림은 아웃박스로 기록)
+            transition_encounter(
+                encounter,
+                Encounter.WorkflowState.IN_CLINIC,
+                event_type='PATIENT_CALLED',
+                message=f"환자 호출: {encounter.patient.name}",
+                extra_data={
+                    "called_patient": {
+                        "name": encounter.patient.name,
+                        "id": encounter.patient.patient_id
+                    }
                 }
-            }
-        )
+            )
 
-        # 6. 현재 통계 조회
+        # 3. 현재 통계 조회 (아웃박스 반영 전이므로 근사값)
         waiting_count = cache_manager.get_waiting_count('clinic')
         in_progress_count = cache_manager.get_in_progress_count('clinic')
 
@@ -681,72 +600,112 @@ class DashboardStatsView(APIView):
             'stats': stats
         }, status=status.HTTP_200_OK)
 
+class EncounterExpectedWaitView(APIView):
+    """예상 대기 시간 조회 API (환자 안내용)"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, encounter_id):
+        """
+        현재 상태의 예상 체류 시간 / 남은 시간 (초)
+
+        Redis 통계(EWMA)만 사용하며 대기열 목록은 조회하지 않습니다.
+        """
+        try:
+            encounter = Encounter.objects.only(
+                'encounter_id', 'workflow_state', 'state_entered_at', 'assigned_doctor_id'
+            ).get(encounter_id=encounter_id)
+        except Encounter.DoesNotExist:
+            return Response(
+                {'error': '방문 기록을 찾을 수 없습니다.'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        try:
+            return Response({
+                'success': True,
+                'encounter_id': encounter.encounter_id,
+                **estimate_wait(encounter)
+            }, status=status.HTTP_200_OK)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class QueueTimeStatsView(APIView):
+    """상태별 대기/진료 시간 통계 및 처리량 API"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """
+        Query params:
+        - doctor_id: 의사별 통계 (표본 부족 시 전체 통계로 대체)
+        """
+        try:
+            doctor_id = request.query_params.get('doctor_id')
+            if doctor_id:
+                doctor_id = int(doctor_id)
+        except ValueError:
+            return Response({'error': 'doctor_id는 숫자여야 합니다.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            if cache_manager.is_connected():
+                source = 'redis'
+                states = {state: get_state_stats(state, doctor_id) for state in TRACKED_STATES}
+            else:
+                # Redis 장애 시 이벤트 로그 집계로 대체
+                source = 'event_log'
+                summary = summarize_from_events(doctor_id=doctor_id)
+                states = {state: summary.get(state) for state in TRACKED_STATES}
+
+            return Response({
+                'success': True,
+                'source': source,
+                'doctor_id': doctor_id,
+                'states': states,
+                'throughput_today': get_throughput(doctor_id=doctor_id),
+            }, status=status.HTTP_200_OK)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 class PendingOrdersView(APIView):
     """
     모든 미처리 오더(검사 대기) 목록 조회 API ("추가진료" 탭용)
-    - LabOrder (REQUESTED)
-    - DoctorToRadiologyOrder (REQUESTED)
+    - LabOrder + DoctorToRadiologyOrder 통합 피드 (UNION ALL 단일 쿼리)
+    - 최신순 정렬 및 keyset 페이지네이션 (cursor)
+    - 상태별 건수 (Redis 캐시)
     """
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
+        """
+        Query params:
+        - status: 오더 상태 (기본값: REQUESTED)
+        - limit: 페이지 크기 (기본값: 50, 최대 200)
+        - cursor: 이전 응답의 next_cursor
+        """
         try:
-            from doctor.models import LabOrder, DoctorToRadiologyOrder
-            from django.utils import timezone
+            order_status = request.query_params.get('status', 'REQUESTED')
 
-            today_start = timezone.localtime(timezone.now()).replace(hour=0, minute=0, second=0, microsecond=0)
-            
-            # 1. Lab Orders (REQUESTED) - 오늘 날짜 기준
-            lab_orders = LabOrder.objects.filter(
-                status='REQUESTED',
-                created_at__gte=today_start
-            ).select_related('patient', 'doctor', 'doctor__department').order_by('-created_at')
-
-            # 2. Imaging Orders (REQUESTED) - 오늘 날짜 기준
-            imaging_orders = DoctorToRadiologyOrder.objects.filter(
-                status='REQUESTED',
-                ordered_at__gte=today_start
-            ).select_related('patient', 'doctor', 'doctor__department').order_by('-ordered_at')
+            try:
+                limit = min(int(request.query_params.get('limit', 50)), 200)
+            except ValueError:
+                return Response({'error': 'limit는 정수여야 합니다.'}, status=status.HTTP_400_BAD_REQUEST)
+            if limit < 1:
+                return Response({'error': 'limit는 1 이상이어야 합니다.'}, status=status.HTTP_400_BAD_REQUEST)
 
-            results = []
+            cursor = request.query_params.get('cursor')
+            try:
+                cursor = decode_cursor(cursor) if cursor else None
+            except ValueError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-            # Lab Order 변환
-            for order in lab_orders:
-                results.append({
-                    'id': f'lab_{order.order_id}',
-                    'type': 'LAB',
-                    'type_display': '진단검사',
-                    'order_name': order.get_order_type_display(),
-                    'patient_id': order.patient.patient_id,
-                    'patient_name': order.patient.name,
-                    'doctor_name': order.doctor.name,
-                    'department_name': order.doctor.department.dept_name if order.doctor.department else 'N/A',
-                    'created_at': order.created_at,
-                    'status': order.status,
-                    'status_display': '검사대기'
-                })
-
-            # Imaging Order 변환
-            for order in imaging_orders:
-                results.append({
-                    'id': f'img_{order.order_id}',
-                    'type': 'IMAGING',
-                    'type_display': '영상의학',
-                    'order_name': f"{order.modality} ({order.body_part or '전신'})",
-                    'patient_id': order.patient.patient_id,
-                    'patient_name': order.patient.name,
-                    'doctor_name': order.doctor.name,
-                    'department_name': order.doctor.department.dept_name if order.doctor.department else 'N/A',
-                    'created_at': order.ordered_at,
-                    'status': order.status,
-                    'status_display': '촬영대기'
-                })
-
-            # 최신순 정렬 (created_at 기준)
-            results.sort(key=lambda x: x['created_at'], reverse=True)
+            results, next_cursor = fetch_order_feed(order_status=order_status, limit=limit, cursor=cursor)
+            counts = get_order_status_counts()
 
             return Response({
-                'count': len(results),
+                'count': counts['total'].get(order_status, 0),
+                'counts': counts,
+                'next_cursor': next_cursor,
                 'results': results
             }, status=status.HTTP_200_OK)
 
@@ -768,36 +727,173 @@ class ConfirmOrderView(APIView):
             action = request.data.get('action') # 'CONFIRM' or 'CONFIRM_AND_DISCHARGE'
             
             from doctor.models import LabOrder, DoctorToRadiologyOrder, Encounter
-            from django.utils import timezone
 
             encounter_to_close = None
 
-            if order_type == 'LAB':
-                order = LabOrder.objects.get(order_id=order_id)
-                order.status = 'IN_PROGRESS' # 접수 완료 -> 검사 중
-                order.save()
-                encounter_to_close = order.encounter
-            
-            elif order_type == 'IMAGING':
-                order = DoctorToRadiologyOrder.objects.get(order_id=order_id)
-                order.status = 'WAITING' # 접수 완료 -> 촬영 대기
-                order.save()
-                encounter_to_close = order.encounter
-            
-            else:
-                return Response({'error': 'Invalid order type'}, status=status.HTTP_400_BAD_REQUEST)
-
-            # 귀가 조치 로직
-            if action == 'CONFIRM_AND_DISCHARGE' and encounter_to_close:
-                encounter_to_close.workflow_state = Encounter.WorkflowState.COMPLETED
-                encounter_to_close.status = Encounter.Status.COMPLETED
-                encounter_to_close.end_time = timezone.now()
-                encounter_to_close.save()
+            with transaction.atomic():
+                if order_type == 'LAB':
+                    order = LabOrder.objects.select_related('encounter__patient').get(order_id=order_id)
+                    order.status = 'IN_PROGRESS' # 접수 완료 -> 검사 중
+                    order.save(update_fields=['status', 'updated_at'])
+                    encounter_to_close = order.encounter
+
+                elif order_type == 'IMAGING':
+                    order = DoctorToRadiologyOrder.objects.select_related('encounter__patient').get(order_id=order_id)
+                    order.status = 'WAITING' # 접수 완료 -> 촬영 대기
+                    order.save(update_fields=['status'])
+                    encounter_to_close = order.encounter
+
+                else:
+                    return Response({'error': 'Invalid order type'}, status=status.HTTP_400_BAD_REQUEST)
+
+                # 귀가 조치 로직 (이미 완료된 방문은 건너뜀)
+                if (action == 'CONFIRM_AND_DISCHARGE' and encounter_to_close
+                        and encounter_to_close.workflow_state != Encounter.WorkflowState.COMPLETED):
+                    transition_encounter(
+                        encounter_to_close,
+                        Encounter.WorkflowState.COMPLETED,
+                        event_type='ENCOUNTER_DISCHARGED',
+                        message=f"귀가 처리: {encounter_to_close.patient.name}"
+                    )
+
+                # 상태별 건수 캐시 무효화
+                transaction.on_commit(cache_manager.invalidate_order_counts)
 
             return Response({'message': '오더가 처리되었습니다.'}, status=status.HTTP_200_OK)
 
+        except InvalidTransition as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except TransitionConflict as e:
+            return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
         except (LabOrder.DoesNotExist, DoctorToRadiologyOrder.DoesNotExist):
              return Response({'error': '오더를 찾을 수 없습니다.'}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+
+
+class BatchConfirmOrderView(APIView):
+    """
+    오더 일괄 접수 및 처리 API (관리자용)
+    - 여러 오더의 상태를 집합 단위 UPDATE로 변경 (LAB -> IN_PROGRESS, IMAGING -> WAITING)
+    - CONFIRM_AND_DISCHARGE 항목의 Encounter를 한 번에 귀가(COMPLETED) 처리
+    - 하나의 트랜잭션에서 처리 후 항목별 결과 반환
+    """
+    permission_classes = [IsAuthenticated]
+
+    ORDER_ACTIONS = ('CONFIRM', 'CONFIRM_AND_DISCHARGE')
+
+    def post(self, request):
+        """
+        Request Body:
+        {
+            "items": [
+                {"order_type": "LAB", "order_id": 1, "action": "CONFIRM"},
+                {"order_type": "IMAGING", "order_id": 3, "action": "CONFIRM_AND_DISCHARGE"}
+            ]
+        }
+        """
+        items = request.data.get('items')
+        if not isinstance(items, list) or not items:
+            return Response({'error': 'items는 비어 있지 않은 목록이어야 합니다.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            from doctor.models import LabOrder, DoctorToRadiologyOrder
+            from django.utils import timezone
+
+            order_models = {
+                'LAB': (LabOrder, LabOrder.OrderStatus.IN_PROGRESS),  # 접수 완료 -> 검사 중
+                'IMAGING': (DoctorToRadiologyOrder, DoctorToRadiologyOrder.ImagingStatus.WAITING),  # 접수 완료 -> 촬영 대기
+            }
+
+            # 1. 항목 검증
+            results = []
+            requested = {'LAB': set(), 'IMAGING': set()}
+            for item in items:
+                result = {
+                    'order_type': item.get('order_type') if isinstance(item, dict) else None,
+                    'order_id': item.get('order_id') if isinstance(item, dict) else None,
+                    'action': (item.get('action') or 'CONFIRM') if isinstance(item, dict) else None,
+                }
+                results.append(result)
+
+                if result['order_type'] not in order_models:
+                    result.update(success=False, error='Invalid order type')
+                    continue
+                if result['action'] not in self.ORDER_ACTIONS:
+                    result.update(success=False, error='Invalid action')
+                    continue
+                try:
+                    result['order_id'] = int(result['order_id'])
+                except (TypeError, ValueError):
+                    result.update(success=False, error='Invalid order id')
+                    continue
+                requested[result['order_type']].add(result['order_id'])
+
+            # 2. 존재하는 오더와 연결된 Encounter 조회 (유형별 1회)
+            encounter_map = {
+                order_type: dict(
+                    model.objects.filter(order_id__in=requested[order_type])
+                    .values_list('order_id', 'encounter_id')
+                ) if requested[order_type] else {}
+                for order_type, (model, _) in order_models.items()
+            }
+
+            to_confirm = {'LAB': set(), 'IMAGING': set()}
+            to_discharge = set()
+            for result in results:
+                if 'success' in result:
+                    continue
+                order_type, order_id = result['order_type'], result['order_id']
+                if order_id not in encounter_map[order_type]:
+                    result.update(success=False, error='오더를 찾을 수 없습니다.')
+                    continue
+
+                to_confirm[order_type].add(order_id)
+                result.update(success=True, status=order_models[order_type][1])
+
+                encounter_id = encounter_map[order_type][order_id]
+                if result['action'] == 'CONFIRM_AND_DISCHARGE' and encounter_id:
+                    to_discharge.add(encounter_id)
+                    result['encounter_id'] = encounter_id
+
+            # 3. 집합 단위 UPDATE (단일 트랜잭션)
+            now = timezone.now()
+            with transaction.atomic():
+                for order_type, (model, new_status) in order_models.items():
+                    if not to_confirm[order_type]:
+                        continue
+                    update_kwargs = {'status': new_status}
+                    if order_type == 'LAB':
+                        # update()는 auto_now를 갱신하지 않으므로 직접 지정
+                        update_kwargs['updated_at'] = now
+                    model.objects.filter(order_id__in=to_confirm[order_type]).update(**update_kwargs)
+
+                # 귀가 대상 일괄 전이 (카운트/캐시/알림은 아웃박스 이벤트 1건)
+                discharged = set(transition_encounters(
+                    to_discharge,
+                    Encounter.WorkflowState.COMPLETED,
+                    event_type='ENCOUNTERS_DISCHARGED',
+                    message="귀가 처리: {count}명"
+                ))
+
+                transaction.on_commit(cache_manager.invalidate_order_counts)
+
+            # 이미 귀가했거나 귀가할 수 없는 상태라 전이되지 않은 Encounter는 항목별로 표시
+            for result in results:
+                encounter_id = result.pop('encounter_id', None)
+                if encounter_id is None:
+                    continue
+                if encounter_id in discharged:
+                    result['discharged_encounter_id'] = encounter_id
+                else:
+                    result['discharge_error'] = '귀가 처리할 수 없는 진료 상태입니다.'
+
+            succeeded = sum(1 for result in results if result['success'])
+            return Response({
+                'message': f'오더 {succeeded}/{len(results)}건이 처리되었습니다.',
+                'results': results
+            }, status=status.HTTP_200_OK if succeeded == len(results) else status.HTTP_207_MULTI_STATUS)
+
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -3,17 +3,14 @@ import requests
 import os
 import msgpack
 
+from orthanc_server.client import orthanc_client
 
-def _get_series_instance_uid(orthanc_base_url, orthanc_series_id):
+
+def _get_series_instance_uid(orthanc_series_id):
     if not orthanc_series_id:
         return None
     try:
-        response = requests.get(
-            f"{orthanc_base_url}/series/{orthanc_series_id}",
-            timeout=30,
-        )
-        response.raise_for_status()
-        payload = response.json()
+        payload = orthanc_client.get_json(f"series/{orthanc_series_id}")
         return payload.get('MainDicomTags', {}).get('SeriesInstanceUID')
     except Exception as e:
         print(f"Failed to fetch SeriesInstanceUID for series_id={orthanc_series_id}: {str(e)}")
@@ -77,18 +74,29 @@ def process_segmentation(self, series_id):
         )
 
         try:
-            from radiology.models import RadiologyAIRun
+            from radiology.models import DICOMSeries, RadiologyAIRun
 
-            orthanc_url = os.getenv('ORTHANC_BASE_URL', 'http://34.67.62.238/orthanc')
-            series_instance_uid = _get_series_instance_uid(orthanc_url, series_id)
+            series_instance_uid = _get_series_instance_uid(series_id)
 
+            mask_series_id = result.get('mask_series_id')
             mask_series_uid = (
                 result.get('mask_series_uid')
                 or result.get('mask_seriesinstanceuid')
             )
             if not mask_series_uid:
-                mask_series_id = result.get('mask_series_id')
-                mask_series_uid = _get_series_instance_uid(orthanc_url, mask_series_id)
+                mask_series_uid = _get_series_instance_uid(mask_series_id)
+
+            # SEG -> 원본 시리즈 참조 저장 (Study 시리즈 목록에서 Orthanc 태그 조회 없이 사용)
+            source_series = DICOMSeries.objects.filter(series_uid=series_instance_uid).first()
+            if mask_series_uid and source_series:
+                mask_defaults = {'referenced_series_uid': series_instance_uid}
+                if mask_series_id:
+                    mask_defaults['orthanc_series_id'] = mask_series_id
+                DICOMSeries.objects.update_or_create(
+                    series_uid=mask_series_uid,
+                    defaults=mask_defaults,
+                    create_defaults={**mask_defaults, 'study_id': source_series.study_id, 'modality': 'SEG'},
+                )
 
             run = (
                 RadiologyAIRun.objects.filter(series__series_uid=series_instance_uid)
@@ -0,0 +1,256 @@
+# doctor/encounter_workflow.py
+"""
+Encounter 상태 전이 엔진
+- 허용된 워크플로우 전이만 통과 (ALLOWED_TRANSITIONS)
+- workflow_state -> FHIR status 매핑, 시간 기록을 한 곳에서 처리
+- 조건부 UPDATE (WHERE workflow_state = 이전 상태)로 동시 수정 시 lost update 방지
+- 전이마다 EncounterStateEvent(append-only) 1행 기록
+- 카운터/통계/캐시/WebSocket 부수효과는 같은 트랜잭션에서 아웃박스 이벤트 1건으로 기록
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from administration.encounter_stats import transition_sample
+from administration.outbox import enqueue_queue_effects, queue_counter_deltas
+from .models import Encounter, EncounterStateEvent
+
+
+WorkflowState = Encounter.WorkflowState
+
+# workflow_state -> FHIR 수준 status
+STATUS_FOR_STATE = {
+    WorkflowState.REQUESTED: Encounter.Status.PLANNED,
+    WorkflowState.REGISTERED: Encounter.Status.PLANNED,
+    WorkflowState.WAITING_CLINIC: Encounter.Status.IN_PROGRESS,
+    WorkflowState.IN_CLINIC: Encounter.Status.IN_PROGRESS,
+    WorkflowState.WAITING_RESULTS: Encounter.Status.IN_PROGRESS,
+    WorkflowState.WAITING_IMAGING: Encounter.Status.IN_PROGRESS,
+    WorkflowState.IN_IMAGING: Encounter.Status.IN_PROGRESS,
+    WorkflowState.COMPLETED: Encounter.Status.COMPLETED,
+    WorkflowState.CANCELLED: Encounter.Status.CANCELLED,
+}
+
+# 종료 상태 (end_time 기록, 이후 전이 불가)
+TERMINAL_STATES = {WorkflowState.COMPLETED, WorkflowState.CANCELLED}
+
+# 현재 상태 -> 전이 가능한 상태
+ALLOWED_TRANSITIONS = {
+    WorkflowState.REQUESTED: {
+        WorkflowState.REGISTERED, WorkflowState.WAITING_CLINIC, WorkflowState.CANCELLED,
+    },
+    WorkflowState.REGISTERED: {
+        WorkflowState.WAITING_CLINIC, WorkflowState.IN_CLINIC, WorkflowState.WAITING_IMAGING,
+        WorkflowState.CANCELLED,
+    },
+    WorkflowState.WAITING_CLINIC: {
+        WorkflowState.REGISTERED, WorkflowState.IN_CLINIC, WorkflowState.WAITING_RESULTS,
+        WorkflowState.WAITING_IMAGING, WorkflowState.COMPLETED, WorkflowState.CANCELLED,
+    },
+    WorkflowState.IN_CLINIC: {
+        WorkflowState.WAITING_CLINIC, WorkflowState.WAITING_RESULTS, WorkflowState.WAITING_IMAGING,
+        WorkflowState.COMPLETED, WorkflowState.CANCELLED,
+    },
+    WorkflowState.WAITING_RESULTS: {
+        WorkflowState.WAITING_CLINIC, WorkflowState.IN_CLINIC, WorkflowState.WAITING_IMAGING,
+        WorkflowState.COMPLETED, WorkflowState.CANCELLED,
+    },
+    WorkflowState.WAITING_IMAGING: {
+        WorkflowState.IN_IMAGING, WorkflowState.WAITING_CLINIC, WorkflowState.COMPLETED,
+        WorkflowState.CANCELLED,
+    },
+    WorkflowState.IN_IMAGING: {
+        WorkflowState.WAITING_IMAGING, WorkflowState.WAITING_RESULTS, WorkflowState.WAITING_CLINIC,
+        WorkflowState.COMPLETED, WorkflowState.CANCELLED,
+    },
+    WorkflowState.COMPLETED: set(),
+    WorkflowState.CANCELLED: set(),
+}
+
+# current_location 미지정 표시 (None은 "위치 비우기"로 사용)
+_UNSET = object()
+
+
+class InvalidTransition(ValueError):
+    """허용되지 않은 워크플로우 전이"""
+
+
+class TransitionConflict(Exception):
+    """조회 이후 다른 요청이 먼저 상태를 바꾼 경우"""
+
+
+def can_transition(old_state, new_state):
+    """old_state -> new_state 전이 허용 여부 (같은 상태는 허용)"""
+    return old_state == new_state or new_state in ALLOWED_TRANSITIONS.get(old_state, set())
+
+
+def _state_fields(new_state, now, end_time=None):
+    """전이 시 갱신할 컬럼 값"""
+    fields = {
+        'workflow_state': new_state,
+        'status': STATUS_FOR_STATE[new_state],
+        'state_entered_at': now,
+        'updated_at': now,
+    }
+    if new_state in TERMINAL_STATES and not end_time:
+        fields['end_time'] = now
+    return fields
+
+
+def record_state_events(transitions, to_state, now):
+    """
+    상태 전이 이벤트 로그 기록 + 통계 표본 생성 (호출자 트랜잭션 안에서 실행)
+
+    Args:
+        transitions: [(encounter_id, from_state, entered_at, doctor_id), ...]
+        to_state: 전이한 상태
+        now: 전이 시간
+
+    Returns:
+        list: 아웃박스 payload용 통계 표본
+    """
+    events = []
+    samples = []
+    day = timezone.localdate(now)
+    for encounter_id, from_state, entered_at, doctor_id in transitions:
+        seconds = (now - entered_at).total_seconds() if (from_state and entered_at) else None
+        events.append(EncounterStateEvent(
+            encounter_id=encounter_id,
+            doctor_id=doctor_id,
+            from_state=from_state,
+            to_state=to_state,
+            entered_at=entered_at,
+            occurred_at=now,
+            duration_seconds=seconds,
+        ))
+        sample = transition_sample(from_state, to_state, doctor_id, seconds, day)
+        if sample:
+            samples.append(sample)
+
+    EncounterStateEvent.objects.bulk_create(events)
+    return samples
+
+
+def transition_encounter(encounter, new_state=None, current_location=_UNSET,
+                         event_type='ENCOUNTER_UPDATED', message=None, extra_data=None):
+    """
+    Encounter 1건 상태 전이 (+ 선택적 위치 변경)
+
+    Args:
+        encounter: 대상 Encounter (조회 시점의 workflow_state 기준으로 조건부 UPDATE)
+        new_state: 전이할 workflow_state (None이면 위치만 변경)
+        current_location: 변경할 위치 (미지정 시 유지)
+        event_type: 아웃박스 이벤트 종류
+        message: WebSocket 알림 메시지 (기본값: "환자 상태 변경: ...")
+        extra_data: WebSocket 알림 추가 데이터
+
+    Returns:
+        Encounter: 변경 값이 반영된 같은 인스턴스
+
+    Raises:
+        InvalidTransition: 허용되지 않은 전이
+        TransitionConflict: 그 사이 다른 요청이 상태를 변경함
+    """
+    old_state = encounter.workflow_state
+    old_entered_at = encounter.state_entered_at
+    now = timezone.now()
+
+    if new_state and new_state not in STATUS_FOR_STATE:
+        raise InvalidTransition(f'알 수 없는 상태입니다: {new_state}')
+    if new_state and not can_transition(old_state, new_state):
+        raise InvalidTransition(
+            f'{encounter.get_workflow_state_display()} 상태에서 {WorkflowState(new_state).label}(으)로 변경할 수 없습니다.'
+        )
+
+    # 같은 상태로의 요청은 상태 진입 시간을 유지 (대기 시간 보존)
+    if new_state == old_state:
+        new_state = None
+
+    if new_state:
+        fields = _state_fields(new_state, now, encounter.end_time)
+    else:
+        fields = {'updated_at': now}
+    if current_location is not _UNSET:
+        fields['current_location'] = current_location
+
+    with transaction.atomic():
+        updated = Encounter.objects.filter(
+            encounter_id=encounter.encounter_id,
+            workflow_state=old_state,
+        ).update(**fields)
+        if not updated:
+            raise TransitionConflict('다른 요청에서 방문 상태가 이미 변경되었습니다. 다시 조회 후 시도해 주세요.')
+
+        for name, value in fields.items():
+            setattr(encounter, name, value)
+
+        samples = []
+        if new_state:
+            samples = record_state_events(
+                [(encounter.encounter_id, old_state, old_entered_at, encounter.assigned_doctor_id)],
+                new_state, now
+            )
+
+        enqueue_queue_effects(
+            event_type,
+            counters=queue_counter_deltas(old_state, new_state) if new_state else None,
+            stats=samples,
+            message=message or f"환자 상태 변경: {encounter.patient.name} ({encounter.get_status_display()})",
+            extra_data=extra_data if extra_data is not None else {
+                "updated_encounter": {
+                    "id": encounter.encounter_id,
+                    "patient_name": encounter.patient.name,
+                    "status": encounter.status
+                }
+            }
+        )
+
+    return encounter
+
+
+def transition_encounters(encounter_ids, new_state, event_type='ENCOUNTERS_UPDATED', message=None):
+    """
+    Encounter 여러 건 일괄 전이 (현재 상태별 조건부 UPDATE, 아웃박스 이벤트 1건)
+
+    허용되지 않은 전이 / 이미 같은 상태인 건은 건너뜁니다.
+    message에는 전이 건수 자리표시자 {count}를 쓸 수 있습니다.
+
+    Returns:
+        list: 실제로 전이된 encounter_id 목록
+    """
+    if not encounter_ids:
+        return []
+
+    now = timezone.now()
+    transitioned = []
+    counters = {}
+
+    with transaction.atomic():
+        # 현재 상태별로 묶어 상태마다 UPDATE 1회
+        by_state = {}
+        transitions = []
+        rows = Encounter.objects.select_for_update().filter(
+            encounter_id__in=encounter_ids
+        ).values_list('encounter_id', 'workflow_state', 'end_time', 'state_entered_at', 'assigned_doctor_id')
+        for encounter_id, old_state, end_time, entered_at, doctor_id in rows:
+            if old_state == new_state or not can_transition(old_state, new_state):
+                continue
+            # end_time 유무에 따라 갱신 컬럼이 달라지므로 함께 묶음
+            by_state.setdefault((old_state, end_time is None), []).append(encounter_id)
+            transitions.append((encounter_id, old_state, entered_at, doctor_id))
+
+        for (old_state, needs_end_time), ids in by_state.items():
+            fields = _state_fields(new_state, now, end_time=None if needs_end_time else now)
+            Encounter.objects.filter(encounter_id__in=ids, workflow_state=old_state).update(**fields)
+            transitioned.extend(ids)
+            for key, delta in queue_counter_deltas(old_state, new_state).items():
+                counters[key] = counters.get(key, 0) + delta * len(ids)
+
+        if transitioned:
+            enqueue_queue_effects(
+                event_type,
+                counters=counters,
+                stats=record_state_events(transitions, new_state, now),
+                message=(message or "환자 상태 변경: {count}명").format(count=len(transitioned))
+            )
+
+    return transitioned
@@ -0,0 +1,160 @@
+# doctor/lab_trends.py
+"""
+혈액검사(LabResult) 추이 계산 유틸리티
+- values_list로 숫자 컬럼만 가져와 NumPy 배열로 변환
+- 기간 단위 리샘플링 (일/주/월 평균)
+- 변화량(delta), 이동 평균/표준편차 계산
+- 컬럼 단위(필드별 배열) 응답 포맷 생성
+"""
+import warnings
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .models import LabResult
+
+
+# 추이 차트에 사용하는 수치 컬럼
+TREND_FIELDS = ('afp', 'albumin', 'bilirubin_total', 'pt_inr', 'platelet')
+
+# 리샘플링 단위 -> numpy datetime64 단위
+BUCKET_UNITS = {
+    'raw': None,
+    'day': 'D',
+    'week': 'W',
+    'month': 'M',
+}
+
+DEFAULT_BUCKET = 'day'
+DEFAULT_WINDOW = 3
+
+
+def load_lab_arrays(patient_id, fields=TREND_FIELDS):
+    """
+    환자의 검사 결과를 NumPy 배열로 로드
+
+    Returns:
+        (dates, values)
+        - dates: datetime64[D] 배열 (test_date 오름차순)
+        - values: dict[field] -> float64 배열 (결측값은 NaN)
+    """
+    rows = list(
+        LabResult.objects.filter(patient_id=patient_id)
+        .order_by('test_date', 'lab_id')
+        .values_list('test_date', *fields)
+    )
+
+    if not rows:
+        return np.array([], dtype='datetime64[D]'), {field: np.array([], dtype=np.float64) for field in fields}
+
+    columns = list(zip(*rows))
+    dates = np.array(columns[0], dtype='datetime64[D]')
+    values = {
+        # Decimal/None -> float/NaN
+        field: np.array(
+            [np.nan if value is None else float(value) for value in column],
+            dtype=np.float64
+        )
+        for field, column in zip(fields, columns[1:])
+    }
+    return dates, values
+
+
+def resample(dates, values, bucket=DEFAULT_BUCKET):
+    """
+    기간 단위 평균으로 리샘플링 (결측값 제외 평균)
+
+    같은 버킷에 값이 하나도 없으면 NaN을 유지합니다.
+    """
+    unit = BUCKET_UNITS.get(bucket)
+    if unit is None or dates.size == 0:
+        return dates, values
+
+    # datetime64[W]는 목요일(1970-01-01) 기준이므로 월요일 시작 주로 보정
+    offset = np.timedelta64(3, 'D') if unit == 'W' else np.timedelta64(0, 'D')
+    buckets = (dates + offset).astype(f'datetime64[{unit}]')
+    keys, inverse = np.unique(buckets, return_inverse=True)
+
+    resampled = {}
+    for field, column in values.items():
+        valid = ~np.isnan(column)
+        sums = np.bincount(inverse, weights=np.where(valid, column, 0.0), minlength=keys.size)
+        counts = np.bincount(inverse, weights=valid.astype(np.float64), minlength=keys.size)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            resampled[field] = np.where(counts > 0, sums / counts, np.nan)
+
+    return keys.astype('datetime64[D]') - offset, resampled
+
+
+def deltas(column):
+    """직전 값 대비 변화량 (첫 값은 NaN)"""
+    if column.size == 0:
+        return column.copy()
+    return np.concatenate(([np.nan], np.diff(column)))
+
+
+def rolling_stats(column, window=DEFAULT_WINDOW):
+    """
+    이동 평균 / 이동 표준편차 (결측값 제외)
+
+    창(window)이 채워지기 전 구간은 NaN을 반환합니다.
+    """
+    mean = np.full(column.shape, np.nan)
+    std = np.full(column.shape, np.nan)
+    if window < 1 or column.size < window:
+        return mean, std
+
+    windows = sliding_window_view(column, window)
+    with warnings.catch_warnings():
+        # 창 전체가 NaN인 경우의 RuntimeWarning 무시
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        mean[window - 1:] = np.nanmean(windows, axis=1)
+        std[window - 1:] = np.nanstd(windows, axis=1)
+    return mean, std
+
+
+def _to_list(column, decimals=3):
+    """NaN -> None 변환 후 JSON 직렬화 가능한 리스트로 변환"""
+    rounded = np.round(column, decimals)
+    return [None if np.isnan(value) else float(value) for value in rounded]
+
+
+def build_lab_trends(patient_id, bucket=DEFAULT_BUCKET, window=DEFAULT_WINDOW, fields=TREND_FIELDS):
+    """
+    환자별 검사 추이 데이터 생성 (컬럼 단위 포맷)
+
+    Returns:
+        {
+            'patient_id': ...,
+            'bucket': 'day',
+            'window': 3,
+            'count': N,
+            'dates': ['2024-01-01', ...],
+            'series': {
+                'afp': {'values': [...], 'delta': [...], 'rolling_mean': [...], 'rolling_std': [...]},
+                ...
+            }
+        }
+    """
+    dates, values = load_lab_arrays(patient_id, fields)
+    dates, values = resample(dates, values, bucket)
+
+    series = {}
+    for field in fields:
+        column = values[field]
+        rolling_mean, rolling_std = rolling_stats(column, window)
+        series[field] = {
+            'values': _to_list(column),
+            'delta': _to_list(deltas(column)),
+            'rolling_mean': _to_list(rolling_mean),
+            'rolling_std': _to_list(rolling_std),
+        }
+
+    return {
+        'patient_id': patient_id,
+        'bucket': bucket,
+        'window': window,
+        'count': int(dates.size),
+        'dates': [str(d) for d in dates],
+        'series': series,
+    }
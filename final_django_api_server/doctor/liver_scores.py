@@ -0,0 +1,172 @@
+# doctor/liver_scores.py
+"""
+간기능 점수 계산 유틸리티 (NumPy 벡터화)
+- MELD (UNOS 원본 공식)
+- ALBI score / ALBI grade
+- Child-Pugh class (검사 수치 기반)
+
+입력 단위:
+- bilirubin_total: mg/dL
+- albumin: g/dL
+- pt_inr: INR
+- creatinine: mg/dL
+
+모든 함수는 float64 배열을 받고, 계산할 수 없는 행(결측값)은 NaN / None으로 반환합니다.
+"""
+from decimal import Decimal
+
+import numpy as np
+
+
+# 점수 계산에 필요한 원본 컬럼
+SOURCE_FIELDS = ('bilirubin_total', 'albumin', 'pt_inr', 'creatinine')
+
+# 계산 결과 컬럼
+SCORE_FIELDS = ('child_pugh_class', 'meld_score', 'albi_score', 'albi_grade')
+
+# 단위 변환 계수
+BILIRUBIN_MG_DL_TO_UMOL_L = 17.1
+ALBUMIN_G_DL_TO_G_L = 10.0
+
+
+def to_float_array(values):
+    """Decimal/None 시퀀스 -> float64 배열 (None은 NaN)"""
+    return np.array(
+        [np.nan if value is None else float(value) for value in values],
+        dtype=np.float64
+    )
+
+
+def meld_scores(bilirubin, inr, creatinine):
+    """
+    MELD 점수 계산 (UNOS 원본 공식)
+
+    MELD = 3.78 * ln(bilirubin) + 11.2 * ln(INR) + 9.57 * ln(creatinine) + 6.43
+    - 1.0 미만 값은 1.0으로 보정
+    - creatinine은 최대 4.0으로 제한
+    - 결과는 6 ~ 40 범위의 정수로 반올림
+
+    Returns:
+        float64 배열 (결측 행은 NaN)
+    """
+    bili = np.maximum(bilirubin, 1.0)
+    inr_ = np.maximum(inr, 1.0)
+    cr = np.clip(creatinine, 1.0, 4.0)
+
+    with np.errstate(invalid='ignore'):
+        meld = 3.78 * np.log(bili) + 11.2 * np.log(inr_) + 9.57 * np.log(cr) + 6.43
+    return np.clip(np.round(meld), 6, 40)
+
+
+def albi_scores(bilirubin, albumin):
+    """
+    ALBI 점수 계산
+
+    ALBI = log10(bilirubin[umol/L]) * 0.66 + albumin[g/L] * (-0.085)
+
+    Returns:
+        float64 배열 (결측 행은 NaN)
+    """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        bili_umol = np.where(bilirubin > 0, bilirubin * BILIRUBIN_MG_DL_TO_UMOL_L, np.nan)
+        return np.log10(bili_umol) * 0.66 + (albumin * ALBUMIN_G_DL_TO_G_L) * -0.085
+
+
+def albi_grades(albi):
+    """
+    ALBI grade 분류
+    - 1: ALBI <= -2.60
+    - 2: -2.60 < ALBI <= -1.39
+    - 3: ALBI > -1.39
+
+    Returns:
+        object 배열 ('1' / '2' / '3' / None)
+    """
+    grades = np.select(
+        [albi <= -2.60, albi <= -1.39, albi > -1.39],
+        ['1', '2', '3'],
+        default=''
+    ).astype(object)
+    grades[np.isnan(albi)] = None
+    return grades
+
+
+def child_pugh_classes(bilirubin, albumin, inr):
+    """
+    Child-Pugh class 계산 (검사 수치 기반)
+
+    복수(ascites)와 간성뇌증(encephalopathy)은 검사 결과에 없으므로
+    '없음'(각 1점)으로 간주합니다. 임상 정보가 반영된 분류가 필요하면
+    의사가 직접 입력한 값을 우선 사용해야 합니다.
+
+    - bilirubin: < 2 (1점), 2 ~ 3 (2점), > 3 (3점)
+    - albumin: > 3.5 (1점), 2.8 ~ 3.5 (2점), < 2.8 (3점)
+    - INR: < 1.7 (1점), 1.7 ~ 2.3 (2점), > 2.3 (3점)
+    - 합계 5 ~ 6: A, 7 ~ 9: B, 10 ~ 15: C
+
+    Returns:
+        object 배열 ('A' / 'B' / 'C' / None)
+    """
+    bili_points = np.select([bilirubin < 2.0, bilirubin <= 3.0], [1, 2], default=3)
+    albumin_points = np.select([albumin > 3.5, albumin >= 2.8], [1, 2], default=3)
+    inr_points = np.select([inr < 1.7, inr <= 2.3], [1, 2], default=3)
+
+    # 복수 1점 + 간성뇌증 1점
+    total = bili_points + albumin_points + inr_points + 2
+
+    classes = np.select([total <= 6, total <= 9], ['A', 'B'], default='C').astype(object)
+    missing = np.isnan(bilirubin) | np.isnan(albumin) | np.isnan(inr)
+    classes[missing] = None
+    return classes
+
+
+def compute_scores(bilirubin, albumin, inr, creatinine):
+    """
+    원본 컬럼 배열로 전체 점수 계산
+
+    Returns:
+        dict[field] -> 배열
+        - child_pugh_class: object ('A'/'B'/'C'/None)
+        - meld_score: float64 (NaN = 계산 불가)
+        - albi_score: float64 (NaN = 계산 불가)
+        - albi_grade: object ('1'/'2'/'3'/None)
+    """
+    albi = albi_scores(bilirubin, albumin)
+    return {
+        'child_pugh_class': child_pugh_classes(bilirubin, albumin, inr),
+        'meld_score': meld_scores(bilirubin, inr, creatinine),
+        'albi_score': albi,
+        'albi_grade': albi_grades(albi),
+    }
+
+
+def to_model_value(field, value):
+    """계산 결과를 LabResult 필드 값으로 변환 (NaN -> None)"""
+    if value is None:
+        return None
+    if field == 'meld_score':
+        return None if np.isnan(value) else int(value)
+    if field == 'albi_score':
+        return None if np.isnan(value) else Decimal(f'{value:.3f}')
+    return value
+
+
+def scores_for_values(values):
+    """
+    단일 검사 결과(dict)의 점수 계산 (수집 시점용)
+
+    Args:
+        values: bilirubin_total, albumin, pt_inr, creatinine 키를 가진 dict
+
+    Returns:
+        dict: 계산 가능한 점수 필드만 포함
+    """
+    arrays = [to_float_array([values.get(field)]) for field in SOURCE_FIELDS]
+    scores = compute_scores(*arrays)
+
+    result = {}
+    for field in SCORE_FIELDS:
+        value = to_model_value(field, scores[field][0])
+        if value is not None:
+            result[field] = value
+    return result
@@ -0,0 +1,99 @@
+# doctor/management/commands/backfill_liver_scores.py
+"""
+기존 LabResult의 간기능 점수(Child-Pugh, MELD, ALBI) 일괄 계산
+
+사용 예:
+    python manage.py backfill_liver_scores
+    python manage.py backfill_liver_scores --chunk-size 5000 --overwrite
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from doctor.models import LabResult
+from doctor.liver_scores import SOURCE_FIELDS, SCORE_FIELDS, compute_scores, to_float_array, to_model_value
+
+
+class Command(BaseCommand):
+    help = 'LabResult의 Child-Pugh class, MELD, ALBI 점수를 원본 수치로 일괄 계산합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='한 번에 처리할 행 수 (기본값: 2000)'
+        )
+        parser.add_argument(
+            '--overwrite',
+            action='store_true',
+            help='이미 값이 있는 점수도 다시 계산하여 덮어씁니다.'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='DB에 저장하지 않고 대상 행 수만 출력합니다.'
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        overwrite = options['overwrite']
+        dry_run = options['dry_run']
+
+        queryset = LabResult.objects.all()
+        if not overwrite:
+            # 점수 중 하나라도 비어 있는 행만 대상
+            missing = Q()
+            for field in SCORE_FIELDS:
+                missing |= Q(**{f'{field}__isnull': True})
+            queryset = queryset.filter(missing)
+
+        queryset = queryset.order_by('lab_id')
+        total = queryset.count()
+        self.stdout.write(f'대상 검사 결과: {total}건')
+        if dry_run or total == 0:
+            return
+
+        processed = 0
+        updated = 0
+        last_id = 0
+
+        while True:
+            # lab_id 기준 keyset 페이지네이션 (OFFSET 없이 청크 조회)
+            rows = list(
+                queryset.filter(lab_id__gt=last_id)
+                .values_list('lab_id', *SOURCE_FIELDS, *SCORE_FIELDS)[:chunk_size]
+            )
+            if not rows:
+                break
+
+            columns = list(zip(*rows))
+            lab_ids = columns[0]
+            sources = [to_float_array(column) for column in columns[1:1 + len(SOURCE_FIELDS)]]
+            existing = dict(zip(SCORE_FIELDS, columns[1 + len(SOURCE_FIELDS):]))
+
+            scores = compute_scores(*sources)
+
+            objects = []
+            for index, lab_id in enumerate(lab_ids):
+                values = {}
+                for field in SCORE_FIELDS:
+                    current = existing[field][index]
+                    if not overwrite and current is not None:
+                        values[field] = current
+                    else:
+                        values[field] = to_model_value(field, scores[field][index])
+
+                if any(values[field] != existing[field][index] for field in SCORE_FIELDS):
+                    objects.append(LabResult(lab_id=lab_id, **values))
+
+            if objects:
+                with transaction.atomic():
+                    LabResult.objects.bulk_update(objects, list(SCORE_FIELDS), batch_size=chunk_size)
+
+            processed += len(rows)
+            updated += len(objects)
+            last_id = lab_ids[-1]
+            self.stdout.write(f'  {processed}/{total}건 처리 (갱신 {updated}건)')
+
+        self.stdout.write(self.style.SUCCESS(f'완료: {processed}건 처리, {updated}건 갱신'))
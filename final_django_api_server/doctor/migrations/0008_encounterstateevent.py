@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-19 06:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('doctor', '0007_alter_encounter_workflow_state'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EncounterStateEvent',
+            fields=[
+                ('event_id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('from_state', models.CharField(blank=True, max_length=30, null=True)),
+                ('to_state', models.CharField(max_length=30)),
+                ('entered_at', models.DateTimeField(blank=True, null=True)),
+                ('occurred_at', models.DateTimeField()),
+                ('duration_seconds', models.FloatField(blank=True, null=True)),
+                ('doctor', models.ForeignKey(blank=True, db_column='doctor_id', null=True, on_delete=django.db.models.deletion.SET_NULL, to='doctor.doctor')),
+                ('encounter', models.ForeignKey(db_column='encounter_id', on_delete=django.db.models.deletion.CASCADE, related_name='state_events', to='doctor.encounter')),
+            ],
+            options={
+                'db_table': 'hospital"."encounter_state_events',
+                'ordering': ['event_id'],
+                'indexes': [models.Index(fields=['from_state', 'occurred_at'], name='enc_state_evt_from_idx'), models.Index(fields=['encounter', 'event_id'], name='enc_state_evt_enc_idx')],
+            },
+        ),
+    ]
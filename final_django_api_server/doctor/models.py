@@ -184,6 +184,45 @@ class Encounter(models.Model):
         return f"{self.patient.name} - {self.get_workflow_state_display()}"
 
 
+class EncounterStateEvent(models.Model):
+    """
+    Encounter 상태 전이 이벤트 로그 (append-only)
+    - 전이마다 1행 추가, 수정/삭제하지 않음
+    - duration_seconds: 이전 상태(from_state)에 머문 시간 (대기/진료 시간 통계용)
+    """
+
+    event_id = models.BigAutoField(primary_key=True)
+    encounter = models.ForeignKey(
+        Encounter,
+        on_delete=models.CASCADE,
+        db_column='encounter_id',
+        related_name='state_events'
+    )
+    doctor = models.ForeignKey(
+        'Doctor',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        db_column='doctor_id'
+    )
+    from_state = models.CharField(max_length=30, blank=True, null=True)  # 신규 접수 시 NULL
+    to_state = models.CharField(max_length=30)
+    entered_at = models.DateTimeField(blank=True, null=True)      # from_state 진입 시간
+    occurred_at = models.DateTimeField()                          # 전이 시간 (= to_state 진입 시간)
+    duration_seconds = models.FloatField(blank=True, null=True)
+
+    class Meta:
+        db_table = 'hospital"."encounter_state_events'
+        ordering = ['event_id']
+        indexes = [
+            models.Index(fields=['from_state', 'occurred_at'], name='enc_state_evt_from_idx'),
+            models.Index(fields=['encounter', 'event_id'], name='enc_state_evt_enc_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.encounter_id}: {self.from_state} -> {self.to_state}"
+
+
 class MedicalRecord(models.Model):
     """진료 기록"""
 
@@ -185,3 +185,32 @@ class CreateDoctorToRadiologyOrderSerializer(serializers.ModelSerializer):
     class Meta:
         model = DoctorToRadiologyOrder
         fields = ['patient', 'encounter', 'doctor', 'modality', 'body_part', 'order_notes']
+
+
+class BulkLabOrderItemSerializer(serializers.ModelSerializer):
+    """일괄 오더 생성용 LabOrder 항목 Serializer (환자/방문/의사는 상위에서 지정)"""
+    class Meta:
+        model = LabOrder
+        fields = ['order_type', 'order_notes']
+
+
+class BulkImagingOrderItemSerializer(serializers.ModelSerializer):
+    """일괄 오더 생성용 영상 검사 오더 항목 Serializer"""
+    class Meta:
+        model = DoctorToRadiologyOrder
+        fields = ['modality', 'body_part', 'order_notes', 'priority']
+
+
+class BulkCreateOrdersSerializer(serializers.Serializer):
+    """검사/영상 오더 일괄 생성 Serializer"""
+    patient = serializers.PrimaryKeyRelatedField(queryset=Patient.objects.all())
+    encounter = serializers.PrimaryKeyRelatedField(queryset=Encounter.objects.all())
+    lab_orders = BulkLabOrderItemSerializer(many=True, required=False, default=list)
+    imaging_orders = BulkImagingOrderItemSerializer(many=True, required=False, default=list)
+
+    def validate(self, attrs):
+        if not attrs['lab_orders'] and not attrs['imaging_orders']:
+            raise serializers.ValidationError("생성할 오더가 없습니다.")
+        if attrs['encounter'].patient_id != attrs['patient'].patient_id:
+            raise serializers.ValidationError({'encounter': "해당 환자의 방문 기록이 아닙니다."})
+        return attrs
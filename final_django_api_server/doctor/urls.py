@@ -4,7 +4,8 @@ from .views import (
     DoctorListView, EncounterDetailView, PatientEncounterHistoryView,
     PatientLabResultsView, PatientDoctorToRadiologyOrdersView, PatientHCCDiagnosisView,
     DoctorInfoView, DoctorMedicalRecordListView, CreateLabOrderView, CreateDoctorToRadiologyOrderView,
-    PatientCTSeriesView, PatientGenomicDataView, PatientLabOrdersView
+    PatientCTSeriesView, PatientGenomicDataView, PatientLabOrdersView, PatientLabTrendsView,
+    BulkCreateOrdersView
 )
 
 urlpatterns = [
@@ -17,6 +18,7 @@ urlpatterns = [
     path('encounter/<int:encounter_id>/', EncounterDetailView.as_view(), name='encounter_detail'),
     path('patient/<str:patient_id>/encounters/', PatientEncounterHistoryView.as_view(), name='patient_encounter_history'),
     path('patient/<str:patient_id>/lab-results/', PatientLabResultsView.as_view(), name='patient_lab_results'),
+    path('patient/<str:patient_id>/lab-trends/', PatientLabTrendsView.as_view(), name='patient_lab_trends'),
     path('patient/<str:patient_id>/lab-orders/', PatientLabOrdersView.as_view(), name='patient_lab_orders'),
     path('patient/<str:patient_id>/doctor-to-radiology-orders/', PatientDoctorToRadiologyOrdersView.as_view(), name='patient_imaging_orders'),
     path('patient/<str:patient_id>/hcc-diagnosis/', PatientHCCDiagnosisView.as_view(), name='patient_hcc_diagnosis'),
@@ -24,5 +26,6 @@ urlpatterns = [
     path('patient/<str:patient_id>/ct-series/', PatientCTSeriesView.as_view(), name='patient_ct_series'),
     path('list/', DoctorListView.as_view(), name='doctor_list'),
     path('lab-orders/', CreateLabOrderView.as_view(), name='create_lab_order'),
+    path('orders/bulk/', BulkCreateOrdersView.as_view(), name='bulk_create_orders'),
     path('doctor-to-radiology-orders/', CreateDoctorToRadiologyOrderView.as_view(), name='create_imaging_order'),
 ]
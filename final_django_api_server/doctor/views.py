@@ -5,14 +5,18 @@ from rest_framework.permissions import IsAuthenticated
 from accounts.permissions import IsDoctor
 from .models import Encounter, MedicalRecord, Patient, Doctor, LabResult, DoctorToRadiologyOrder, HCCDiagnosis, GenomicData, LabOrder
 from radiology.models import DICOMStudy, DICOMSeries
+from administration.cache_manager import cache_manager
+from .encounter_workflow import transition_encounter, InvalidTransition, TransitionConflict
+from .lab_trends import build_lab_trends, BUCKET_UNITS, DEFAULT_BUCKET, DEFAULT_WINDOW
 from .serializers import (
     EncounterSerializer, MedicalRecordSerializer, UpdateEncounterStatusSerializer, DoctorListSerializer,
     MedicalRecordDetailSerializer, LabResultSerializer, DoctorToRadiologyOrderSerializer,
-    HCCDiagnosisSerializer, CreateLabOrderSerializer, CreateDoctorToRadiologyOrderSerializer, LabOrderSerializer
+    HCCDiagnosisSerializer, CreateLabOrderSerializer, CreateDoctorToRadiologyOrderSerializer, LabOrderSerializer,
+    BulkCreateOrdersSerializer
 )
 from datetime import date, datetime
-from django.utils import timezone
 from django.db.models import Q
+from django.db import transaction
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 
@@ -149,7 +153,7 @@ class UpdateEncounterStatusView(APIView):
     def patch(self, request, encounter_id):
         try:
             # 해당 Encounter 조회
-            encounter = Encounter.objects.get(encounter_id=encounter_id)
+            encounter = Encounter.objects.select_related('patient').get(encounter_id=encounter_id)
 
             # 요청 데이터 검증
             serializer = UpdateEncounterStatusSerializer(data=request.data)
@@ -157,32 +161,13 @@ class UpdateEncounterStatusView(APIView):
                 # 워크플로우 상태 변경 (backward compatibility: 'status' 필드도 허용)
                 new_workflow_state = serializer.validated_data.get('workflow_state') or serializer.validated_data.get('status')
 
-                if new_workflow_state:
-                    # 워크플로우 상태 설정
-                    encounter.workflow_state = new_workflow_state
-                    encounter.state_entered_at = timezone.now()
-
-                    # FHIR 레벨 status 자동 설정
-                    if new_workflow_state in [Encounter.WorkflowState.REQUESTED, Encounter.WorkflowState.REGISTERED]:
-                        encounter.status = Encounter.Status.PLANNED
-                    elif new_workflow_state in [Encounter.WorkflowState.WAITING_CLINIC, Encounter.WorkflowState.IN_CLINIC,
-                                                Encounter.WorkflowState.WAITING_IMAGING, Encounter.WorkflowState.IN_IMAGING,
-                                                Encounter.WorkflowState.WAITING_RESULTS]:
-                        encounter.status = Encounter.Status.IN_PROGRESS
-                    elif new_workflow_state == Encounter.WorkflowState.COMPLETED:
-                        encounter.status = Encounter.Status.COMPLETED
-                    elif new_workflow_state == Encounter.WorkflowState.CANCELLED:
-                        encounter.status = Encounter.Status.CANCELLED
-
-                    # 완료 시간 자동 설정
-                    if new_workflow_state == Encounter.WorkflowState.COMPLETED and not encounter.end_time:
-                        encounter.end_time = timezone.now()
-
                 # 위치 변경
+                location_kwargs = {}
                 if 'current_location' in serializer.validated_data:
-                    encounter.current_location = serializer.validated_data['current_location']
+                    location_kwargs['current_location'] = serializer.validated_data['current_location']
 
-                encounter.save()
+                # 상태 전이 엔진 (허용 전이 검증, 조건부 UPDATE, 카운트/캐시/알림)
+                transition_encounter(encounter, new_workflow_state, **location_kwargs)
 
                 # 업데이트된 데이터 반환
                 response_serializer = EncounterSerializer(encounter)
@@ -197,6 +182,14 @@ class UpdateEncounterStatusView(APIView):
             return Response({
                 'error': '해당 방문 기록을 찾을 수 없습니다.'
             }, status=status.HTTP_404_NOT_FOUND)
+        except InvalidTransition as e:
+            return Response({
+                'error': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+        except TransitionConflict as e:
+            return Response({
+                'error': str(e)
+            }, status=status.HTTP_409_CONFLICT)
         except Exception as e:
             return Response({
                 'error': str(e)
@@ -368,6 +361,47 @@ class PatientLabResultsView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class PatientLabTrendsView(APIView):
+    """특정 환자의 혈액 검사 추이 조회 API (서버 측 리샘플링/통계)"""
+    permission_classes = [IsDoctor]
+
+    def get(self, request, patient_id):
+        """
+        특정 환자의 검사 추이 조회 (필드별 배열 포맷)
+
+        Query params:
+        - bucket: raw | day | week | month (기본값: day)
+        - window: 이동 통계 창 크기 (기본값: 3)
+        """
+        try:
+            bucket = request.query_params.get('bucket', DEFAULT_BUCKET)
+            if bucket not in BUCKET_UNITS:
+                return Response({
+                    'error': f"bucket은 {', '.join(BUCKET_UNITS)} 중 하나여야 합니다."
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            try:
+                window = int(request.query_params.get('window', DEFAULT_WINDOW))
+            except ValueError:
+                return Response({'error': 'window는 정수여야 합니다.'}, status=status.HTTP_400_BAD_REQUEST)
+            if window < 1:
+                return Response({'error': 'window는 1 이상이어야 합니다.'}, status=status.HTTP_400_BAD_REQUEST)
+
+            # 다음 검사 결과 등록 전까지 환자별 캐시 사용
+            variant = f'{bucket}:{window}'
+            trends = cache_manager.get_lab_trends(patient_id, variant)
+            if trends is None:
+                trends = build_lab_trends(patient_id, bucket=bucket, window=window)
+                cache_manager.set_lab_trends(patient_id, variant, trends)
+
+            return Response(trends, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            return Response({
+                'error': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 
 class PatientDoctorToRadiologyOrdersView(APIView):
     """특정 환자의 영상 검사 오더 목록 조회 API (의사 -> 영상의학과)"""
@@ -599,6 +633,7 @@ class CreateLabOrderView(APIView):
             serializer = CreateLabOrderSerializer(data=data)
             if serializer.is_valid():
                 serializer.save()
+                cache_manager.invalidate_order_counts()
             
                 # WebSocket 알림 전송 (관리자에게)
                 try:
@@ -654,6 +689,7 @@ class CreateDoctorToRadiologyOrderView(APIView):
             serializer = CreateDoctorToRadiologyOrderSerializer(data=data)
             if serializer.is_valid():
                 serializer.save()
+                cache_manager.invalidate_order_counts()
 
                 # WebSocket 알림 전송 (관리자에게)
                 try:
@@ -681,6 +717,115 @@ class CreateDoctorToRadiologyOrderView(APIView):
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+class BulkCreateOrdersView(APIView):
+    """
+    검사/영상 오더 일괄 생성 API
+    - 한 번의 요청으로 LabOrder 여러 건 + 영상 검사 오더 여러 건 생성
+    - 하나의 트랜잭션에서 bulk_create
+    - 커밋 후 WebSocket 알림 1회 전송
+    """
+    permission_classes = [IsDoctor]
+
+    def post(self, request):
+        """
+        Request Body:
+        {
+            "patient_id": "P20241229ABCD",
+            "encounter_id": 1,
+            "patient_name": "홍길동",
+            "lab_orders": [
+                {"order_type": "BLOOD_LIVER", "order_notes": {}},
+                {"order_type": "GENOMIC"}
+            ],
+            "imaging_orders": [
+                {"modality": "CT", "body_part": "Abdomen", "order_notes": "..."}
+            ]
+        }
+        """
+        try:
+            data = request.data.copy()
+
+            # 1. Doctor handling
+            try:
+                doctor = Doctor.objects.get(user=request.user)
+            except Doctor.DoesNotExist:
+                if 'doctor_id' not in data:
+                    return Response({'error': '의사 정보를 찾을 수 없습니다.'}, status=status.HTTP_404_NOT_FOUND)
+                try:
+                    doctor = Doctor.objects.get(doctor_id=data['doctor_id'])
+                except Doctor.DoesNotExist:
+                    return Response({'error': '의사 정보를 찾을 수 없습니다.'}, status=status.HTTP_404_NOT_FOUND)
+
+            # 2. Map IDs
+            if 'patient_id' in data:
+                data['patient'] = data['patient_id']
+            if 'encounter_id' in data:
+                data['encounter'] = data['encounter_id']
+
+            serializer = BulkCreateOrdersSerializer(data=data)
+            if not serializer.is_valid():
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+            patient = serializer.validated_data['patient']
+            encounter = serializer.validated_data['encounter']
+
+            # 관계 객체를 직접 지정하여 응답 직렬화 시 추가 조회 방지
+            lab_orders = [
+                LabOrder(patient=patient, encounter=encounter, doctor=doctor, **item)
+                for item in serializer.validated_data['lab_orders']
+            ]
+            imaging_orders = [
+                DoctorToRadiologyOrder(patient=patient, encounter=encounter, doctor=doctor, **item)
+                for item in serializer.validated_data['imaging_orders']
+            ]
+
+            with transaction.atomic():
+                if lab_orders:
+                    LabOrder.objects.bulk_create(lab_orders)
+                if imaging_orders:
+                    DoctorToRadiologyOrder.objects.bulk_create(imaging_orders)
+
+                # 커밋 이후에만 캐시 무효화 및 알림 (롤백 시 알림 없음)
+                patient_name = data.get('patient_name') or patient.name
+                transaction.on_commit(lambda: _notify_bulk_orders(
+                    patient_name, patient.patient_id, doctor.doctor_id, lab_orders, imaging_orders
+                ))
+
+            return Response({
+                'message': f'오더 {len(lab_orders) + len(imaging_orders)}건이 성공적으로 생성되었습니다.',
+                'lab_orders': LabOrderSerializer(lab_orders, many=True).data,
+                'imaging_orders': DoctorToRadiologyOrderSerializer(imaging_orders, many=True).data,
+            }, status=status.HTTP_201_CREATED)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def _notify_bulk_orders(patient_name, patient_id, doctor_id, lab_orders, imaging_orders):
+    """일괄 생성된 오더에 대해 관리자에게 WebSocket 알림 1회 전송"""
+    cache_manager.invalidate_order_counts()
+
+    try:
+        channel_layer = get_channel_layer()
+        async_to_sync(channel_layer.group_send)(
+            "clinic_dashboard",
+            {
+                "type": "new_order",
+                "message": f"{patient_name}의 오더 {len(lab_orders) + len(imaging_orders)}건이 도착했습니다.",
+                "data": {
+                    "order_type": "BULK",
+                    "patient_id": patient_id,
+                    "doctor_id": doctor_id,
+                    "lab_order_ids": [order.order_id for order in lab_orders],
+                    "lab_order_types": [order.order_type for order in lab_orders],
+                    "imaging_order_ids": [order.order_id for order in imaging_orders],
+                    "imaging_modalities": [order.modality for order in imaging_orders],
+                }
+            }
+        )
+    except Exception as wse:
+        print(f"WebSocket send failed: {wse}")
+
+
 class PatientLabOrdersView(APIView):
     """특정 환자의 Lab Orde 목록 조회 API"""
     permission_classes = [IsAuthenticated]
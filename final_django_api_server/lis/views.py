@@ -4,6 +4,8 @@ from rest_framework import status
 from rest_framework.permissions import AllowAny
 from doctor.models import Patient
 from doctor.serializers import LabResultSerializer, GenomicDataSerializer
+from doctor.liver_scores import scores_for_values
+from administration.cache_manager import cache_manager
 
 
 class CreateLabResultView(APIView):
@@ -17,7 +19,15 @@ class CreateLabResultView(APIView):
             payload['patient'] = patient.patient_id
             serializer = LabResultSerializer(data=payload)
             if serializer.is_valid():
-                lab_result = serializer.save()
+                # 입력되지 않은 간기능 점수(Child-Pugh, MELD, ALBI)는 원본 수치로 계산
+                scores = {
+                    field: value
+                    for field, value in scores_for_values(serializer.validated_data).items()
+                    if serializer.validated_data.get(field) in (None, '')
+                }
+                lab_result = serializer.save(**scores)
+                # 새 결과가 들어왔으므로 환자별 추이 캐시 무효화
+                cache_manager.invalidate_lab_trends(patient.patient_id)
                 return Response(LabResultSerializer(lab_result).data, status=status.HTTP_201_CREATED)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         except Patient.DoesNotExist:
@@ -122,6 +122,19 @@ RABBITMQ_PASSWORD = os.environ.get('RABBITMQ_PASSWORD', 'admin123')
 RABBITMQ_VHOST = os.environ.get('RABBITMQ_VHOST', '/')
 
 
+# ------------------------------------------------------------------------------
+# 파일 업로드 (DICOM / ZIP)
+# 임계값을 넘는 업로드는 메모리 대신 임시 파일로 받음 (대용량 ZIP도 워커 메모리 사용량 일정)
+# ------------------------------------------------------------------------------
+FILE_UPLOAD_HANDLERS = [
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+FILE_UPLOAD_MAX_MEMORY_SIZE = int(os.environ.get('FILE_UPLOAD_MAX_MEMORY_SIZE', 2 * 1024 * 1024))
+# DICOM_INGEST_SPOOL_DIR와 같은 파일시스템이면 비동기 업로드 시 복사 없이 하드 링크로 spool
+FILE_UPLOAD_TEMP_DIR = os.environ.get('FILE_UPLOAD_TEMP_DIR') or None
+
+
 # ------------------------------------------------------------------------------
 # Celery Configuration
 # RabbitMQ를 브로커로 사용하도록 URL을 명시적으로 구성합니다.
@@ -145,6 +158,27 @@ CELERY_TIMEZONE = 'Asia/Seoul'
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 3600  # 1 hour
 
+# 주기 작업 (celery -A liverguard_api_server beat)
+CELERY_BEAT_SCHEDULE = {
+    # 대기열 아웃박스 안전망 (run_queue_outbox 워커가 주 처리기)
+    'dispatch-queue-outbox': {
+        'task': 'administration.dispatch_queue_outbox',
+        'schedule': 5.0,
+    },
+    'purge-queue-outbox': {
+        'task': 'administration.purge_queue_outbox',
+        'schedule': 60 * 60 * 24,
+    },
+    # Orthanc에 직접 들어온 Study/Series(C-STORE 등)를 DB에 반영
+    'sync-orthanc-changes': {
+        'task': 'orthanc_server.sync_orthanc_changes',
+        'schedule': 30.0,
+    },
+    'purge-upload-sessions': {
+        'task': 'orthanc_server.purge_upload_sessions',
+        'schedule': 60 * 60,
+    },
+}
 
 # Custom user 
 AUTH_USER_MODEL = 'accounts.CustomUser'
@@ -0,0 +1,186 @@
+# orthanc_server/change_feed.py
+"""
+Orthanc 변경 피드(/changes) 미러링
+- 저장된 커서(OrthancChangeCursor.last_seq)부터 변경 이벤트를 배치 단위로 조회
+- NewSeries / StableSeries 이벤트의 Series를 DICOMStudy / DICOMSeries / DICOMInstance에 upsert
+  (프록시 업로드뿐 아니라 C-STORE 등으로 Orthanc에 직접 들어온 Study도 DB에 반영)
+- 배치마다 Orthanc 조회를 먼저 끝낸 뒤 커서 행을 잠그고(select_for_update skip_locked),
+  커서 위치를 다시 확인해 같은 짧은 트랜잭션에서 upsert + 커서 갱신
+  → beat 작업이 겹쳐도 한 워커만 반영, 실패 시 커서가 진행되지 않아 다음 주기에 재처리
+- 삭제 이벤트는 반영하지 않음 (DB 기록은 진료 이력으로 유지)
+- StableSeries(인스턴스 수신 종료) 이벤트의 Series는 썸네일 생성 작업 등록 (최근 이벤트만)
+- RadiologyAIRun은 만들지 않음 (AI 서버가 올린 SEG / 과거 전체 재동기화로 실행되지 않을 대기 작업이 쌓이지 않도록)
+"""
+import os
+from datetime import datetime, timedelta
+
+from django.db import transaction
+
+from .client import fetch_concurrently, get_child_resources, orthanc_get
+from .ingest import instance_record, tags_from_simplified, upsert_series_records
+from .metadata_cache import invalidate_metadata
+from .models import OrthancChangeCursor
+from .thumbnails import queue_series_thumbnails
+
+
+CHANGE_CURSOR_NAME = 'orthanc-changes'
+
+# 1회 조회 변경 수 / 1회 실행 최대 배치 수
+ORTHANC_CHANGES_BATCH = int(os.getenv('ORTHANC_CHANGES_BATCH', 500))
+ORTHANC_CHANGES_MAX_BATCHES = int(os.getenv('ORTHANC_CHANGES_MAX_BATCHES', 20))
+
+# 미러링 대상 변경 종류 (StableSeries 시점의 Instance 수가 최종 값)
+SERIES_CHANGE_TYPES = ('NewSeries', 'StableSeries')
+
+# 이 시간(초) 안의 StableSeries 이벤트만 썸네일 등록 (처음부터 재동기화할 때 과거 전체를 생성하지 않도록)
+THUMBNAIL_CHANGE_MAX_AGE = int(os.getenv('THUMBNAIL_CHANGE_MAX_AGE', 24 * 60 * 60))
+
+
+def _series_ids(changes):
+    """변경 목록에서 대상 Series ID (중복 제거, 순서 유지)"""
+    series_ids = []
+    for change in changes:
+        if change.get('ResourceType') != 'Series' or change.get('ChangeType') not in SERIES_CHANGE_TYPES:
+            continue
+        if change.get('ID') and change['ID'] not in series_ids:
+            series_ids.append(change['ID'])
+    return series_ids
+
+
+def _recent_stable_series_ids(changes, max_age=None):
+    """최근 StableSeries 이벤트의 Series ID (Date는 Orthanc 서버 현지 시각 'YYYYMMDDTHHMMSS')"""
+    max_age = THUMBNAIL_CHANGE_MAX_AGE if max_age is None else max_age
+    cutoff = datetime.now() - timedelta(seconds=max_age)
+    series_ids = []
+    for change in changes:
+        if change.get('ResourceType') != 'Series' or change.get('ChangeType') != 'StableSeries':
+            continue
+        try:
+            changed_at = datetime.strptime(change.get('Date', ''), '%Y%m%dT%H%M%S')
+        except ValueError:
+            continue
+        if changed_at >= cutoff and change.get('ID'):
+            series_ids.append(change['ID'])
+    return series_ids
+
+
+def _fetch_series_record(series_id):
+    """
+    Series 상세 + Instance 목록(expand) + 첫 Instance 태그 -> upsert_series_records 입력 형식
+
+    Returns:
+        tuple: (series_uid, record), 태그를 얻을 수 없으면 None
+    """
+    series = orthanc_get(f'series/{series_id}')
+    instances = get_child_resources('series', series_id, 'instances')
+    if not instances:
+        return None
+
+    simplified = orthanc_get(f'instances/{instances[0]["ID"]}/tags', params={'simplify': ''}, operation='tags')
+    tags = tags_from_simplified(simplified)
+    series_uid = tags.get('SeriesInstanceUID')
+    if not series_uid:
+        return None
+
+    # Instance 인덱스 (SOPInstanceUID / InstanceNumber / ImagePositionPatient는 Orthanc 기본 태그)
+    instance_records = [
+        instance_record(instance.get('MainDicomTags', {}), instance['ID'])
+        for instance in instances
+    ]
+    return series_uid, {
+        'tags': tags,
+        'orthanc_series_id': series_id,
+        'orthanc_study_id': series.get('ParentStudy'),
+        'image_count': len(instances),
+        'instances': [record for record in instance_records if record],
+    }
+
+
+def _sync_batch(batch_limit):
+    """
+    변경 1배치 처리
+
+    Returns:
+        dict: {'changes', 'series', 'saved', 'last', 'done'},
+              다른 워커가 처리 중이거나 조회 중에 커서가 진행됐으면 None
+    """
+    # 1. Orthanc 조회 (트랜잭션 / 행 잠금 밖에서)
+    cursor, _ = OrthancChangeCursor.objects.get_or_create(name=CHANGE_CURSOR_NAME)
+    since = cursor.last_seq
+    feed = orthanc_get('changes', params={'since': since, 'limit': batch_limit})
+    changes = feed.get('Changes') or []
+    series_ids = _series_ids(changes)
+
+    records = {}
+    for result in fetch_concurrently(_fetch_series_record, series_ids):
+        if result:
+            series_uid, record = result
+            records[series_uid] = record
+
+    # 2. 커서 잠금 + 위치 재확인 후 반영 (짧은 트랜잭션)
+    with transaction.atomic():
+        cursor = (
+            OrthancChangeCursor.objects
+            .select_for_update(skip_locked=True)
+            .filter(name=CHANGE_CURSOR_NAME)
+            .first()
+        )
+        if cursor is None or cursor.last_seq != since:
+            return None
+
+        saved = upsert_series_records(records, create_ai_runs=False)
+
+        last_seq = feed.get('Last', cursor.last_seq)
+        if last_seq != cursor.last_seq:
+            cursor.last_seq = last_seq
+            cursor.save(update_fields=['last_seq', 'updated_at'])
+
+    # 업로드 프록시를 거치지 않고 바뀐 Series / Study의 메타데이터 캐시도 갱신
+    invalidate_metadata(
+        series_ids,
+        [record['orthanc_study_id'] for record in records.values()],
+    )
+    queue_series_thumbnails(_recent_stable_series_ids(changes))
+    return {
+        'changes': len(changes),
+        'series': len(series_ids),
+        'saved': len(saved),
+        'last': last_seq,
+        'done': bool(feed.get('Done', True)) or not changes,
+    }
+
+
+def sync_orthanc_changes(batch_limit=None, max_batches=None):
+    """
+    커서 이후의 Orthanc 변경을 DB에 반영
+
+    Returns:
+        dict: {'status', 'batches', 'changes', 'series', 'saved', 'last'}
+
+    Raises:
+        requests.exceptions.RequestException: Orthanc 조회 실패 (커서는 마지막 성공 배치 위치 유지)
+    """
+    batch_limit = batch_limit or ORTHANC_CHANGES_BATCH
+    max_batches = max_batches or ORTHANC_CHANGES_MAX_BATCHES
+
+    summary = {'status': 'success', 'batches': 0, 'changes': 0, 'series': 0, 'saved': 0, 'last': None}
+    for _ in range(max_batches):
+        result = _sync_batch(batch_limit)
+        if result is None:
+            summary['status'] = 'locked'
+            break
+
+        summary['batches'] += 1
+        for key in ('changes', 'series', 'saved'):
+            summary[key] += result[key]
+        summary['last'] = result['last']
+        if result['done']:
+            break
+    return summary
+
+
+def reset_change_cursor(last_seq=0):
+    """커서 위치 재설정 (0이면 처음부터 전체 재동기화)"""
+    OrthancChangeCursor.objects.update_or_create(
+        name=CHANGE_CURSOR_NAME, defaults={'last_seq': last_seq}
+    )
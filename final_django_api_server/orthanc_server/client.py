@@ -0,0 +1,356 @@
+# orthanc_server/client.py
+"""
+Orthanc HTTP 클라이언트
+- 프로세스 전역 OrthancClient 1개가 requests.Session + HTTPAdapter 연결 풀을 공유 (keep-alive 연결 재사용)
+- 작업(operation)별 타임아웃, 일시적 오류(연결 실패/타임아웃/502/503/504) 지수 백오프 + jitter 재시도
+- 서킷 브레이커: 연속 실패 시 일정 시간 동안 Orthanc 호출 없이 즉시 실패 (OrthancUnavailable)
+- 작업별 호출 수 / 오류 수 / 지연 시간(p50, p95) 메트릭
+- expand / tools/find 기반 조회 헬퍼 (리소스별 개별 호출 대신 1회 호출)
+"""
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# Orthanc 서버 설정
+ORTHANC_BASE_URL = os.getenv(
+    'ORTHANC_BASE_URL',
+    'http://34.67.62.238/orthanc'  # 기본값 (로컬 개발용)
+)
+
+# 연결 풀 크기 (업로드 워커 수 이상이어야 연결 대기가 생기지 않음)
+ORTHANC_POOL_SIZE = int(os.getenv('ORTHANC_POOL_SIZE', 16))
+
+# 일시적 오류 재시도 횟수 / 백오프 기준 시간 (초)
+ORTHANC_MAX_RETRIES = int(os.getenv('ORTHANC_MAX_RETRIES', 3))
+ORTHANC_RETRY_BACKOFF = float(os.getenv('ORTHANC_RETRY_BACKOFF', 0.3))
+
+# 서킷 브레이커: 연속 실패 횟수 기준 / 차단 유지 시간 (초)
+ORTHANC_BREAKER_THRESHOLD = int(os.getenv('ORTHANC_BREAKER_THRESHOLD', 5))
+ORTHANC_BREAKER_RESET = float(os.getenv('ORTHANC_BREAKER_RESET', 30))
+
+# 작업별 (연결, 읽기) 타임아웃 (초)
+ORTHANC_TIMEOUTS = {
+    'system': (3.05, 5),
+    'metadata': (3.05, 10),
+    'find': (3.05, 15),
+    'tags': (3.05, 5),
+    'upload': (3.05, 60),
+    'file': (3.05, 60),
+    'archive': (3.05, 300),
+}
+DEFAULT_TIMEOUT = (3.05, 30)
+
+# 재시도 대상 HTTP 상태
+RETRY_STATUSES = (502, 503, 504)
+
+
+class OrthancUnavailable(requests.exceptions.ConnectionError):
+    """서킷 브레이커가 열려 있어 Orthanc 호출을 생략한 경우"""
+
+
+class CircuitBreaker:
+    """
+    연속 실패 기반 서킷 브레이커
+
+    - closed: 정상 호출
+    - open: 연속 실패가 threshold에 도달하면 reset_timeout 동안 즉시 실패
+    - half-open: reset_timeout 경과 후 시험 호출 1건만 통과 (성공 시 closed, 실패 시 다시 open)
+    """
+
+    def __init__(self, threshold=ORTHANC_BREAKER_THRESHOLD, reset_timeout=ORTHANC_BREAKER_RESET):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def before_call(self):
+        """호출 가능 여부 확인 (차단 중이면 OrthancUnavailable)"""
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return
+            if state == 'half-open' and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return
+        raise OrthancUnavailable('Orthanc circuit breaker is open')
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.trial_in_flight = False
+            if self.opened_at is not None or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+    def snapshot(self):
+        return {'state': self.state, 'consecutive_failures': self.failures}
+
+
+class OperationMetrics:
+    """작업별 호출 수 / 오류 수 / 재시도 수 / 최근 지연 시간 (프로세스 단위)"""
+
+    def __init__(self, window=512):
+        self.window = window
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, operation, seconds, error=False, retries=0):
+        with self._lock:
+            stats = self._stats.get(operation)
+            if stats is None:
+                stats = self._stats[operation] = {
+                    'count': 0, 'errors': 0, 'retries': 0, 'latencies': deque(maxlen=self.window),
+                }
+            stats['count'] += 1
+            stats['errors'] += int(error)
+            stats['retries'] += retries
+            stats['latencies'].append(seconds)
+
+    def snapshot(self):
+        with self._lock:
+            items = [(operation, dict(stats, latencies=sorted(stats['latencies'])))
+                     for operation, stats in self._stats.items()]
+
+        result = {}
+        for operation, stats in items:
+            latencies = stats['latencies']
+
+            def percentile(ratio):
+                return round(latencies[min(int(len(latencies) * ratio), len(latencies) - 1)] * 1000, 1)
+
+            result[operation] = {
+                'count': stats['count'],
+                'errors': stats['errors'],
+                'retries': stats['retries'],
+                'p50_ms': percentile(0.5) if latencies else None,
+                'p95_ms': percentile(0.95) if latencies else None,
+                'max_ms': round(latencies[-1] * 1000, 1) if latencies else None,
+            }
+        return result
+
+
+class OrthancClient:
+    """
+    Orthanc REST 호출 공용 클라이언트
+
+    모든 호출은 request()를 거치며, 작업 이름(operation)으로 타임아웃과 메트릭을 구분합니다.
+    """
+
+    def __init__(self, base_url=ORTHANC_BASE_URL, pool_size=ORTHANC_POOL_SIZE,
+                 max_retries=ORTHANC_MAX_RETRIES, backoff=ORTHANC_RETRY_BACKOFF):
+        self.base_url = base_url.rstrip('/')
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.breaker = CircuitBreaker()
+        self.metrics = OperationMetrics()
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self):
+        """공유 Session (최초 사용 시 생성)"""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    # 재시도는 request()에서 jitter와 함께 직접 처리하므로 어댑터 재시도는 끔
+                    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size, max_retries=0)
+                    session = requests.Session()
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    self._session = session
+        return self._session
+
+    def _sleep_before_retry(self, attempt):
+        # full jitter: 0 ~ backoff * 2^attempt 사이 임의 대기 (동시 재시도 분산)
+        time.sleep(random.uniform(0, self.backoff * (2 ** attempt)))
+
+    def request(self, method, path, operation, timeout=None, stream=False, retry=True, **kwargs):
+        """
+        Orthanc 호출 (재시도 + 서킷 브레이커 + 메트릭)
+
+        Args:
+            method: 'GET', 'POST' ...
+            path: base URL 이후 경로 (예: 'instances/{id}/file')
+            operation: 작업 이름 (ORTHANC_TIMEOUTS 키, 메트릭 구분용)
+            timeout: 타임아웃 직접 지정 (기본값: 작업별 타임아웃)
+            stream: 응답 본문 스트리밍 여부
+            retry: 일시적 오류 재시도 여부
+            **kwargs: requests에 그대로 전달 (params, json, data, headers)
+
+        Returns:
+            requests.Response (상태 코드 검사는 호출자 책임)
+
+        Raises:
+            OrthancUnavailable: 서킷 브레이커 차단 중
+            requests.exceptions.RequestException: 재시도 후에도 연결 실패 / 타임아웃
+        """
+        self.breaker.before_call()
+
+        url = f'{self.base_url}/{path.lstrip("/")}'
+        timeout = timeout or ORTHANC_TIMEOUTS.get(operation, DEFAULT_TIMEOUT)
+        attempts = self.max_retries + 1 if retry else 1
+        data = kwargs.get('data')
+        started = time.perf_counter()
+
+        for attempt in range(attempts):
+            if attempt:
+                self._sleep_before_retry(attempt - 1)
+                # 파일 객체 본문은 처음부터 다시 전송
+                if hasattr(data, 'seek'):
+                    data.seek(0)
+            try:
+                response = self.session.request(method, url, timeout=timeout, stream=stream, **kwargs)
+            except requests.exceptions.RequestException as e:
+                transient = isinstance(e, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+                if transient and attempt + 1 < attempts:
+                    continue
+                self.breaker.record_failure()
+                self.metrics.record(operation, time.perf_counter() - started, error=True, retries=attempt)
+                raise
+
+            if response.status_code in RETRY_STATUSES and attempt + 1 < attempts:
+                response.close()
+                continue
+            break
+
+        failed = response.status_code in RETRY_STATUSES
+        if failed:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        self.metrics.record(
+            operation, time.perf_counter() - started, error=failed or response.status_code >= 400, retries=attempt
+        )
+        return response
+
+    def get(self, path, operation='metadata', **kwargs):
+        return self.request('GET', path, operation, **kwargs)
+
+    def post(self, path, operation, **kwargs):
+        return self.request('POST', path, operation, **kwargs)
+
+    def get_json(self, path, operation='metadata', params=None, timeout=None):
+        """GET -> JSON (200이 아니면 requests.HTTPError)"""
+        response = self.get(path, operation, params=params, timeout=timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def post_json(self, path, payload, operation='find', timeout=None):
+        """POST (JSON body) -> JSON (200이 아니면 requests.HTTPError)"""
+        response = self.post(path, operation, json=payload, timeout=timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def stats(self):
+        """메트릭 스냅샷 (작업별 지연 시간 + 서킷 브레이커 상태)"""
+        return {
+            'base_url': self.base_url,
+            'circuit_breaker': self.breaker.snapshot(),
+            'operations': self.metrics.snapshot(),
+        }
+
+
+# 프로세스 전역 클라이언트
+orthanc_client = OrthancClient()
+
+
+def get_session():
+    """프로세스 전역 Orthanc Session"""
+    return orthanc_client.session
+
+
+# ========================================
+# 조회 헬퍼 (expand / tools/find로 왕복 횟수 최소화)
+# ========================================
+
+# 남은 개별 조회(SEG 태그 등)를 동시에 보낼 최대 개수
+ORTHANC_FANOUT_WORKERS = int(os.getenv('ORTHANC_FANOUT_WORKERS', 8))
+
+
+def orthanc_get(path, params=None, timeout=None, operation='metadata'):
+    """GET {ORTHANC_BASE_URL}/{path} -> JSON (200이 아니면 requests.HTTPError)"""
+    return orthanc_client.get_json(path, operation, params=params, timeout=timeout)
+
+
+def orthanc_post(path, payload, timeout=None, operation='find'):
+    """POST {ORTHANC_BASE_URL}/{path} (JSON body) -> JSON (200이 아니면 requests.HTTPError)"""
+    return orthanc_client.post_json(path, payload, operation, timeout=timeout)
+
+
+def list_resources(level, since=0, limit=None):
+    """
+    리소스 목록 + 상세 정보를 1회 호출로 조회
+
+    GET /{level}?expand&since=&limit=
+
+    Args:
+        level: 'patients', 'studies', 'series', 'instances'
+    """
+    params = {'expand': '', 'since': since}
+    if limit is not None:
+        params['limit'] = limit
+    return orthanc_get(level, params=params, operation='find')
+
+
+def find_resources(level, query, since=0, limit=None):
+    """
+    DICOM 태그 조건 검색 + 상세 정보를 1회 호출로 조회
+
+    POST /tools/find {"Level", "Query", "Expand": true, "Since", "Limit"}
+    """
+    payload = {'Level': level, 'Query': query, 'Expand': True, 'Since': since}
+    if limit is not None:
+        payload['Limit'] = limit
+    return orthanc_post('tools/find', payload)
+
+
+def get_child_resources(level, orthanc_id, child):
+    """
+    하위 리소스 상세 목록 1회 조회 (예: GET /studies/{id}/series?expand)
+    """
+    return orthanc_get(f'{level}/{orthanc_id}/{child}', params={'expand': ''}, operation='find')
+
+
+def fetch_concurrently(func, items, max_workers=None):
+    """
+    개별 조회를 제한된 동시성으로 실행 (입력 순서대로 결과 반환, 실패한 항목은 None)
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    def run(item):
+        try:
+            return func(item)
+        except requests.exceptions.RequestException as e:
+            print(f"[WARN] Orthanc request failed for {item}: {e}")
+            return None
+
+    workers = min(max_workers or ORTHANC_FANOUT_WORKERS, len(items))
+    if workers == 1:
+        return [run(item) for item in items]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(run, items))
@@ -0,0 +1,674 @@
+# orthanc_server/ingest.py
+"""
+DICOM 업로드 파이프라인
+- 업로드 파일은 임계값 이상이면 디스크(임시 파일 / spool 디렉터리)에 있고, 메모리에 통째로 올리지 않음
+- ZIP 멤버는 호출 스레드에서 순서대로 스트림(ZipMemberStream)으로 열고,
+  압축 해제 + 헤더 파싱 + Orthanc 전송은 워커 풀에서 병렬 처리 (같은 ZipFile 멤버 동시 읽기 가능)
+- 동시에 열려 있는 멤버 스트림 수는 워커 수의 2배로 제한
+- 결과는 입력 순서대로 집계
+"""
+import io
+import os
+import tempfile
+import uuid
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+import pydicom
+import requests
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+from pydicom.multival import MultiValue
+
+from doctor.models import Patient
+from radiology.models import DICOMInstance, DICOMSeries, DICOMStudy, RadiologyAIRun
+from .client import fetch_concurrently, find_resources, orthanc_client, orthanc_get
+from .metadata_cache import invalidate_metadata
+
+
+# 업로드 병렬 워커 수
+ORTHANC_UPLOAD_WORKERS = int(os.getenv('ORTHANC_UPLOAD_WORKERS', 8))
+
+# 백그라운드 업로드용 임시 저장 디렉터리 (API 서버와 Celery 워커가 같이 접근 가능해야 함)
+DICOM_INGEST_SPOOL_DIR = os.getenv(
+    'DICOM_INGEST_SPOOL_DIR',
+    os.path.join(tempfile.gettempdir(), 'liverguard_dicom_ingest')
+)
+
+DICOM_EXTENSIONS = ('.dcm', '.dicom')
+
+# 저장 여부 확인 시 /tools/find 1회에 묶는 SOPInstanceUID 수
+STORED_LOOKUP_BATCH = int(os.getenv('STORED_LOOKUP_BATCH', 200))
+
+
+def _collect_tags(get_value, referenced_series_uid=None) -> dict:
+    """업로드 / 미러링 공용 태그 추출 (get_value: 태그 이름 -> 문자열 또는 None)"""
+    return {
+        'PatientID': get_value('PatientID'),
+        'PatientName': get_value('PatientName'),
+        'PatientBirthDate': get_value('PatientBirthDate'),
+        'PatientSex': get_value('PatientSex'),
+        'StudyInstanceUID': get_value('StudyInstanceUID'),
+        'SeriesInstanceUID': get_value('SeriesInstanceUID'),
+        'SOPInstanceUID': get_value('SOPInstanceUID'),
+        'InstanceNumber': get_value('InstanceNumber'),
+        'ImagePositionPatient': get_value('ImagePositionPatient'),
+        'Modality': get_value('Modality'),
+        'StudyDescription': get_value('StudyDescription'),
+        'InstitutionName': get_value('InstitutionName'),
+        'SeriesNumber': get_value('SeriesNumber'),
+        'SeriesDescription': get_value('SeriesDescription'),
+        'ProtocolName': get_value('ProtocolName'),
+        'AccessionNumber': get_value('AccessionNumber'),
+        'BodyPartExamined': get_value('BodyPartExamined'),
+        'StudyDate': get_value('StudyDate'),
+        'StudyTime': get_value('StudyTime'),
+        'AcquisitionDate': get_value('AcquisitionDate') or get_value('SeriesDate'),
+        'AcquisitionTime': get_value('AcquisitionTime') or get_value('SeriesTime'),
+        'SliceThickness': get_value('SliceThickness'),
+        'PixelSpacing': get_value('PixelSpacing'),
+        # SEG: 원본 시리즈 (ReferencedSeriesSequence 첫 항목)
+        'ReferencedSeriesInstanceUID': referenced_series_uid,
+    }
+
+
+def _extract_dicom_tags(source) -> dict:
+    """
+    DICOM 헤더 태그 추출 (픽셀 데이터 전까지만 읽음)
+
+    Args:
+        source: bytes 또는 seek 가능한 파일 객체 (읽은 뒤 처음 위치로 되돌림)
+    """
+    fileobj = io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+    try:
+        dataset = pydicom.dcmread(
+            fileobj,
+            stop_before_pixels=True,
+            force=True,
+        )
+    except Exception as exc:
+        print(f"Failed to read DICOM metadata: {exc}")
+        return {}
+    finally:
+        if fileobj is source:
+            fileobj.seek(0)
+
+    def get_value(attr: str):
+        value = getattr(dataset, attr, None)
+        if value is None:
+            return None
+        # 다중값(PixelSpacing 등)은 DICOM 표기대로 '\\'로 연결
+        if isinstance(value, MultiValue):
+            return '\\'.join(str(item) for item in value)
+        return str(value)
+
+    referenced_series_uid = None
+    referenced_series = getattr(dataset, 'ReferencedSeriesSequence', None)
+    if referenced_series:
+        referenced_series_uid = str(referenced_series[0].get('SeriesInstanceUID', '')) or None
+
+    return _collect_tags(get_value, referenced_series_uid)
+
+
+def tags_from_simplified(simplified: dict) -> dict:
+    """Orthanc /instances/{id}/tags?simplify 응답 -> 업로드와 같은 형식의 태그"""
+    def get_value(attr: str):
+        value = simplified.get(attr)
+        # 시퀀스 등 문자열이 아닌 값은 사용하지 않음
+        return value if isinstance(value, str) and value != '' else None
+
+    referenced_series_uid = None
+    referenced_series = simplified.get('ReferencedSeriesSequence')
+    if isinstance(referenced_series, list) and referenced_series and isinstance(referenced_series[0], dict):
+        referenced_series_uid = referenced_series[0].get('SeriesInstanceUID') or None
+
+    return _collect_tags(get_value, referenced_series_uid)
+
+
+def _dicom_datetime(date_value, time_value=None):
+    """DICOM DA/TM ('20250101', '101500.123') -> aware datetime (없거나 형식 오류면 None)"""
+    if not date_value:
+        return None
+    try:
+        parsed = datetime.strptime(date_value[:8], '%Y%m%d')
+        if time_value:
+            time_text = time_value.split('.')[0].ljust(6, '0')[:6]
+            parsed = parsed.replace(
+                hour=int(time_text[0:2]), minute=int(time_text[2:4]), second=int(time_text[4:6])
+            )
+    except ValueError:
+        return None
+    return timezone.make_aware(parsed)
+
+
+def _decimal_or_none(value, places=4):
+    try:
+        return Decimal(value).quantize(Decimal(1).scaleb(-places)) if value else None
+    except (InvalidOperation, ValueError):
+        return None
+
+
+def _int_or_none(value):
+    try:
+        return int(value) if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _position_z(image_position):
+    """ImagePositionPatient ('x\\y\\z') -> z 좌표 (없거나 형식 오류면 None)"""
+    try:
+        return float(image_position.split('\\')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def instance_record(tags, orthanc_instance_id):
+    """DICOMInstance 인덱스 항목 (SOPInstanceUID가 없으면 None)"""
+    if not tags.get('SOPInstanceUID'):
+        return None
+    return {
+        'sop_instance_uid': tags['SOPInstanceUID'],
+        'orthanc_instance_id': orthanc_instance_id,
+        'instance_number': _int_or_none(tags.get('InstanceNumber')),
+        'image_position_z': _position_z(tags.get('ImagePositionPatient')),
+    }
+
+
+def collect_series_records(uploaded):
+    """
+    업로드 결과를 SeriesInstanceUID별로 집계
+
+    Args:
+        uploaded: [(tags, Orthanc 응답), ...]
+
+    Returns:
+        dict: {series_uid: {'tags', 'orthanc_series_id', 'orthanc_study_id', 'instances'}}
+              (tags는 시리즈의 첫 번째 파일 기준, instances는 instance_record() 목록)
+              image_count는 이번 업로드의 파일 수라 넣지 않음 (upsert 시 DICOMInstance 기준으로 계산)
+    """
+    records = {}
+    for tags, payload in uploaded:
+        series_uid = tags.get('SeriesInstanceUID')
+        if not series_uid:
+            continue
+        record = records.get(series_uid)
+        if record is None:
+            record = records[series_uid] = {
+                'tags': tags,
+                'orthanc_series_id': payload.get('ParentSeries'),
+                'orthanc_study_id': payload.get('ParentStudy'),
+                'instances': [],
+            }
+        instance = instance_record(tags, payload.get('ID'))
+        if instance:
+            record['instances'].append(instance)
+    return records
+
+
+def upsert_instance_records(instances):
+    """
+    DICOMInstance 인덱스 일괄 upsert (INSERT ... ON CONFLICT DO UPDATE)
+
+    Args:
+        instances: [(series_uid, instance_record()), ...] - 시리즈는 DB에 등록돼 있어야 함
+    """
+    DICOMInstance.objects.bulk_create(
+        [DICOMInstance(series_id=series_uid, **instance) for series_uid, instance in instances],
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=['sop_instance_uid'],
+        update_fields=['series', 'orthanc_instance_id', 'instance_number', 'image_position_z', 'updated_at'],
+    )
+
+
+def upsert_series_records(records, create_ai_runs=True):
+    """
+    업로드된 Study / Series / RadiologyAIRun을 한 트랜잭션에서 일괄 upsert
+
+    - DICOMStudy, DICOMSeries: INSERT ... ON CONFLICT DO UPDATE (1문장씩)
+    - DICOMInstance: record['instances']가 있으면 INSERT ... ON CONFLICT DO UPDATE
+    - image_count: record에 있으면(Orthanc 기준, 변경 피드) 그 값으로, 없으면(업로드) DICOMInstance 수로 갱신
+      (일부 파일만 다시 올려도 줄어들지 않도록 기존 값보다 작아지지 않음)
+    - RadiologyAIRun: create_ai_runs이면 아직 없는 시리즈만 bulk_create
+      (SEG는 AI 결과 자체이므로 제외, 변경 피드 미러링은 create_ai_runs=False)
+    - 등록되지 않은 환자(PatientID)의 시리즈는 건너뜀
+
+    Returns:
+        list: 저장한 series_uid 목록
+    """
+    if not records:
+        return []
+
+    patient_ids = {record['tags'].get('PatientID') for record in records.values()}
+    known_patients = set(
+        Patient.objects.filter(patient_id__in=patient_ids - {None}).values_list('patient_id', flat=True)
+    )
+
+    studies = {}
+    series_list = []
+    for series_uid, record in records.items():
+        tags = record['tags']
+        patient_id = tags.get('PatientID')
+        study_uid = tags.get('StudyInstanceUID')
+        if patient_id not in known_patients:
+            print(f"Series {series_uid} skipped: patient {patient_id} not registered")
+            continue
+        if not study_uid:
+            print(f"Series {series_uid} skipped: study tag missing")
+            continue
+
+        if study_uid not in studies:
+            studies[study_uid] = DICOMStudy(
+                study_uid=study_uid,
+                patient_id=patient_id,
+                orthanc_study_id=record['orthanc_study_id'],
+                accession_number=tags.get('AccessionNumber'),
+                modality=tags.get('Modality'),
+                body_part=tags.get('BodyPartExamined'),
+                study_description=tags.get('StudyDescription'),
+                study_datetime=_dicom_datetime(tags.get('StudyDate'), tags.get('StudyTime')),
+                institution_name=tags.get('InstitutionName'),
+            )
+
+        series_list.append(DICOMSeries(
+            series_uid=series_uid,
+            study_id=study_uid,
+            orthanc_series_id=record['orthanc_series_id'],
+            modality=tags.get('Modality'),
+            series_number=_int_or_none(tags.get('SeriesNumber')),
+            series_description=tags.get('SeriesDescription'),
+            protocol_name=tags.get('ProtocolName'),
+            acquisition_datetime=_dicom_datetime(tags.get('AcquisitionDate'), tags.get('AcquisitionTime')),
+            image_count=record.get('image_count'),
+            slice_thickness=_decimal_or_none(tags.get('SliceThickness')),
+            pixel_spacing=(tags.get('PixelSpacing') or '')[:64] or None,
+            referenced_series_uid=tags.get('ReferencedSeriesInstanceUID'),
+        ))
+
+    if not series_list:
+        return []
+
+    series_uids = [series.series_uid for series in series_list]
+    counted = all('image_count' in records[series_uid] for series_uid in series_uids)
+    with transaction.atomic():
+        # Study의 modality는 최초 등록 값 유지 (같은 Study에 SEG 등이 추가돼도 덮어쓰지 않음)
+        DICOMStudy.objects.bulk_create(
+            studies.values(),
+            update_conflicts=True,
+            unique_fields=['study_uid'],
+            update_fields=[
+                'orthanc_study_id', 'accession_number', 'body_part', 'study_description',
+                'study_datetime', 'institution_name', 'updated_at',
+            ],
+        )
+        DICOMSeries.objects.bulk_create(
+            series_list,
+            update_conflicts=True,
+            unique_fields=['series_uid'],
+            update_fields=[
+                'orthanc_series_id', 'modality', 'series_number', 'series_description', 'protocol_name',
+                'acquisition_datetime', 'slice_thickness', 'pixel_spacing',
+                'referenced_series_uid', 'updated_at',
+            ] + (['image_count'] if counted else []),
+        )
+
+        upsert_instance_records([
+            (series_uid, instance)
+            for series_uid in series_uids
+            for instance in records[series_uid].get('instances', ())
+        ])
+
+        if not counted:
+            instance_count = (
+                DICOMInstance.objects.filter(series=OuterRef('pk'))
+                .order_by().values('series').annotate(count=Count('pk')).values('count')
+            )
+            DICOMSeries.objects.filter(series_uid__in=series_uids).update(
+                image_count=Greatest(Coalesce(F('image_count'), 0), Coalesce(Subquery(instance_count), 0))
+            )
+
+        if create_ai_runs:
+            run_series_uids = [
+                series_uid for series_uid in series_uids
+                if records[series_uid]['tags'].get('Modality') != 'SEG'
+            ]
+            existing_runs = set(
+                RadiologyAIRun.objects.filter(series_id__in=run_series_uids).values_list('series_id', flat=True)
+            )
+            RadiologyAIRun.objects.bulk_create([
+                RadiologyAIRun(series_id=series_uid)
+                for series_uid in run_series_uids
+                if series_uid not in existing_runs
+            ])
+
+    return series_uids
+
+
+class ZipMemberStream(io.RawIOBase):
+    """
+    ZIP 멤버를 압축 해제하면서 읽는 스트림 (Orthanc 전송 본문용)
+
+    - len: 압축 해제 크기 -> requests가 Content-Length로 사용
+      (끝까지 seek해서 길이를 재지 않으므로 멤버를 두 번 압축 해제하지 않음)
+    - seek(0): 헤더 파싱 후 / 전송 재시도 시 처음부터 다시 읽기
+    - 같은 ZipFile의 멤버를 여러 스레드에서 동시에 읽을 수 있음 (zipfile 내부 잠금)
+    """
+
+    def __init__(self, zip_ref, entry):
+        super().__init__()
+        self.len = entry.file_size
+        self._member = zip_ref.open(entry)
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def read(self, size=-1):
+        return self._member.read(size)
+
+    def readinto(self, buffer):
+        data = self._member.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        return self._member.seek(offset, whence)
+
+    def tell(self):
+        return self._member.tell()
+
+    def close(self):
+        self._member.close()
+        super().close()
+
+
+def zip_dicom_entries(zip_ref):
+    """ZIP 안의 DICOM 파일 목록 (디렉터리 제외)"""
+    return [
+        entry for entry in zip_ref.infolist()
+        if not entry.is_dir()
+        and entry.filename.lower().endswith(DICOM_EXTENSIONS)
+    ]
+
+
+def store_instance(file_content) -> dict:
+    """
+    DICOM 파일 1개를 Orthanc에 저장
+
+    Args:
+        file_content: bytes 또는 파일 객체 (파일 객체는 청크 단위로 스트리밍 전송,
+                      재시도 시 클라이언트가 seek(0) 후 다시 전송)
+
+    Returns:
+        dict: Orthanc 응답 (ID, ParentSeries, ParentStudy, Status ...)
+
+    Raises:
+        requests.HTTPError: Orthanc가 200 이외로 응답한 경우
+    """
+    response = orthanc_client.post(
+        'instances',
+        'upload',
+        data=file_content,
+        headers={
+            'Content-Type': 'application/dicom'
+        }
+    )
+    if response.status_code != 200:
+        raise requests.HTTPError(response.text or f'HTTP {response.status_code}', response=response)
+    return response.json()
+
+
+def _close(file_content):
+    if hasattr(file_content, 'close'):
+        file_content.close()
+
+
+def _scan_file(name, file_content):
+    """워커: 헤더 태그만 읽음 (기존 저장 여부 확인용)"""
+    try:
+        return {'file': name, 'tags': _extract_dicom_tags(file_content)}
+    finally:
+        _close(file_content)
+
+
+def _process_file(name, file_content, tags=None):
+    """워커: 헤더 파싱(이미 읽은 태그가 없을 때만) + Orthanc 전송 (파일 객체는 처리 후 닫음)"""
+    try:
+        if tags is None:
+            tags = _extract_dicom_tags(file_content)
+        payload = store_instance(file_content)
+        return {'file': name, 'tags': tags, 'payload': payload}
+    except Exception as exc:
+        error = exc.response.text if getattr(exc, 'response', None) is not None else str(exc)
+        return {'file': name, 'error': error}
+    finally:
+        _close(file_content)
+
+
+def _map_files(executor, workers, names, indexes, read_file, func, on_result):
+    """
+    파일을 호출 스레드에서 순서대로 열고 func(index, name, file_content)를 워커에서 실행
+
+    동시 상한: 대기 중인 작업이 workers * 2개를 넘으면 가장 오래된 작업부터 회수
+    """
+    in_flight = deque()
+
+    def collect():
+        future, index = in_flight.popleft()
+        on_result(index, future.result())
+
+    for index in indexes:
+        name = names[index]
+        try:
+            file_content = read_file(name)
+        except Exception as exc:
+            on_result(index, {'file': name, 'error': str(exc)})
+            continue
+
+        in_flight.append((executor.submit(func, index, name, file_content), index))
+        if len(in_flight) >= workers * 2:
+            collect()
+
+    while in_flight:
+        collect()
+
+
+def find_stored_instances(sop_instance_uids):
+    """
+    이미 Orthanc에 저장된 Instance 조회 (SOPInstanceUID 목록을 묶어서 /tools/find)
+
+    조회에 실패한 묶음은 저장되지 않은 것으로 간주합니다 (다시 전송해도 Orthanc가 AlreadyStored로 응답).
+
+    Returns:
+        dict: {sop_instance_uid: Orthanc 응답 형식 payload ('ID', 'ParentSeries', 'ParentStudy', 'Status')}
+    """
+    uids = sorted(filter(None, set(sop_instance_uids)))
+    batches = [uids[start:start + STORED_LOOKUP_BATCH] for start in range(0, len(uids), STORED_LOOKUP_BATCH)]
+    # Orthanc 태그 검색은 '\\'로 구분한 값 목록을 OR 조건으로 처리
+    found = {}
+    for instances in fetch_concurrently(
+        lambda batch: find_resources('Instance', {'SOPInstanceUID': '\\'.join(batch)}),
+        batches,
+    ):
+        for instance in instances or []:
+            sop_instance_uid = instance.get('MainDicomTags', {}).get('SOPInstanceUID')
+            if sop_instance_uid:
+                found[sop_instance_uid] = {
+                    'ID': instance['ID'],
+                    'Path': f"/instances/{instance['ID']}",
+                    'ParentSeries': instance.get('ParentSeries'),
+                    'Status': 'AlreadyStored',
+                }
+    if not found:
+        return found
+
+    # Instance 조회 결과에는 ParentStudy가 없으므로 Series 단위로 한 번씩 조회
+    series_ids = sorted({payload['ParentSeries'] for payload in found.values() if payload['ParentSeries']})
+    parent_studies = dict(zip(series_ids, fetch_concurrently(
+        lambda series_id: orthanc_get(f'series/{series_id}').get('ParentStudy'),
+        series_ids,
+    )))
+    for payload in found.values():
+        payload['ParentStudy'] = parent_studies.get(payload['ParentSeries'])
+    return found
+
+
+def ingest_dicom_files(names, read_file, workers=None, progress_callback=None, skip_existing=True):
+    """
+    DICOM 파일 여러 개를 병렬로 Orthanc에 업로드
+
+    skip_existing이면 먼저 헤더만 읽어 SOPInstanceUID로 저장 여부를 묶어서 확인하고,
+    이미 저장된 Instance는 전송하지 않습니다 (재업로드 시 남은 파일만 전송).
+
+    Args:
+        names: 업로드할 파일 이름 목록 (결과 순서 기준)
+        read_file: name -> bytes 또는 파일 객체 (호출 스레드에서 순서대로 호출)
+        workers: 워커 수 (기본값: ORTHANC_UPLOAD_WORKERS)
+        progress_callback: (완료 수, 전체 수) -> None
+        skip_existing: 이미 저장된 Instance 전송 생략 여부
+
+    Returns:
+        dict: {
+            'successes': [Orthanc 응답, ...]  (입력 순서, 생략한 Instance는 Status 'AlreadyStored'),
+            'skipped': 전송을 생략한 Instance 수,
+            'errors': [{'file', 'error'}, ...],
+            'series_records': collect_series_records() 결과
+        }
+    """
+    workers = max(1, workers or ORTHANC_UPLOAD_WORKERS)
+    total = len(names)
+    results = [None] * total
+    scanned_tags = {}
+    done = 0
+
+    def finish(index, result):
+        nonlocal done
+        results[index] = result
+        done += 1
+        if progress_callback:
+            progress_callback(done, total)
+
+    def scanned(index, result):
+        if 'error' in result:
+            finish(index, result)
+        else:
+            scanned_tags[index] = result['tags']
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='dicom-upload') as executor:
+        pending = range(total)
+        if skip_existing:
+            # 1단계: 헤더만 읽어 SOPInstanceUID 수집 -> 저장된 Instance 일괄 조회
+            _map_files(
+                executor, workers, names, pending, read_file,
+                lambda index, name, file_content: _scan_file(name, file_content),
+                scanned,
+            )
+            stored = find_stored_instances(tags.get('SOPInstanceUID') for tags in scanned_tags.values())
+            for index, tags in scanned_tags.items():
+                payload = stored.get(tags.get('SOPInstanceUID'))
+                if payload:
+                    finish(index, {'file': names[index], 'tags': tags, 'payload': dict(payload), 'skipped': True})
+            pending = [index for index in sorted(scanned_tags) if results[index] is None]
+
+        # 2단계: 나머지만 전송 (이미 읽은 태그 재사용)
+        _map_files(
+            executor, workers, names, pending, read_file,
+            lambda index, name, file_content: _process_file(name, file_content, scanned_tags.get(index)),
+            finish,
+        )
+
+    successes = []
+    errors = []
+    uploaded = []
+    skipped = 0
+    for result in results:
+        if 'error' in result:
+            errors.append({'file': result['file'], 'error': result['error']})
+            continue
+
+        successes.append(result['payload'])
+        uploaded.append((result['tags'], result['payload']))
+        skipped += bool(result.get('skipped'))
+
+    return {
+        'successes': successes,
+        'skipped': skipped,
+        'errors': errors,
+        'series_records': collect_series_records(uploaded),
+    }
+
+
+def ingest_zip_archive(archive, workers=None, progress_callback=None):
+    """
+    ZIP 아카이브 업로드 + DB 반영 (동기 업로드 / 백그라운드 작업 공용)
+
+    Args:
+        archive: ZIP 파일 경로 또는 파일 객체
+
+    Returns:
+        dict: 업로드 응답 ({'Status', 'Count', 'Uploaded', 'Skipped', 'Instances', 'Errors'}),
+              DICOM 파일이 없으면 None
+    """
+    with zipfile.ZipFile(archive) as zip_ref:
+        dicom_entries = zip_dicom_entries(zip_ref)
+        if not dicom_entries:
+            return None
+
+        # 멤버를 bytes로 읽지 않고 스트림으로 열어 전송 (메모리 사용량이 ZIP 크기와 무관)
+        entries_by_name = {entry.filename: entry for entry in dicom_entries}
+        result = ingest_dicom_files(
+            list(entries_by_name),
+            lambda name: ZipMemberStream(zip_ref, entries_by_name[name]),
+            workers=workers,
+            progress_callback=progress_callback,
+        )
+
+    records = result['series_records']
+    invalidate_metadata(
+        [record['orthanc_series_id'] for record in records.values()],
+        [record['orthanc_study_id'] for record in records.values()],
+    )
+    upsert_series_records(records)
+
+    errors = result['errors']
+    return {
+        'Status': 'Success' if not errors else 'PartialSuccess',
+        'Count': len(result['successes']),
+        'Uploaded': len(result['successes']) - result['skipped'],
+        'Skipped': result['skipped'],
+        'Instances': result['successes'],
+        'Errors': errors
+    }
+
+
+def spool_upload(uploaded_file):
+    """
+    업로드 파일을 spool 디렉터리에 저장
+
+    디스크에 받은 업로드(TemporaryUploadedFile)는 같은 파일시스템이면 하드 링크로 옮기고
+    (요청 종료 시 Django가 임시 파일을 지워도 spool 파일은 남음), 그 외에는 청크 단위로 복사합니다.
+
+    Returns:
+        str: 저장된 파일 경로
+    """
+    os.makedirs(DICOM_INGEST_SPOOL_DIR, exist_ok=True)
+    path = os.path.join(DICOM_INGEST_SPOOL_DIR, f'{uuid.uuid4().hex}.zip')
+    if hasattr(uploaded_file, 'temporary_file_path'):
+        try:
+            os.link(uploaded_file.temporary_file_path(), path)
+            return path
+        except OSError:
+            pass
+    with open(path, 'wb') as spool_file:
+        for chunk in uploaded_file.chunks():
+            spool_file.write(chunk)
+    return path
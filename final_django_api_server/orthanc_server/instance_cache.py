@@ -0,0 +1,235 @@
+# orthanc_server/instance_cache.py
+"""
+DICOM Instance 파일 로컬 디스크 LRU 캐시
+- 키: Orthanc Instance ID (저장된 Instance는 변하지 않으므로 무효화 불필요)
+- 쓰기: 같은 디렉터리의 임시 파일에 스트리밍 저장 후 os.replace (다른 프로세스가 반쯤 쓴 파일을 읽지 않음)
+- 용량 초과 시 마지막 사용 시간(mtime) 기준으로 오래된 파일부터 삭제
+- 읽기는 열린 파일 핸들 / 하드 링크로 (경로를 받은 뒤 다른 워커의 정리로 지워져도 읽을 수 있음)
+- 조회 적중/실패 메트릭 (프로세스 단위)
+"""
+import os
+import re
+import shutil
+import tempfile
+import threading
+
+import requests
+
+from .client import orthanc_client
+
+
+DICOM_INSTANCE_CACHE_DIR = os.getenv(
+    'DICOM_INSTANCE_CACHE_DIR',
+    os.path.join(tempfile.gettempdir(), 'liverguard_instance_cache')
+)
+
+# 캐시 최대 용량 (바이트, 기본 2GB) - 0이면 캐시 사용 안 함
+DICOM_INSTANCE_CACHE_MAX_BYTES = int(os.getenv('DICOM_INSTANCE_CACHE_MAX_BYTES', 2 * 1024 ** 3))
+
+# 정리 시 이 비율까지 줄임 (매 쓰기마다 정리하지 않도록 여유 확보)
+EVICT_TARGET_RATIO = 0.9
+
+_COPY_CHUNK_SIZE = 256 * 1024
+
+# 캐시 파일이 열기 전에 정리(evict)된 경우 다시 받는 횟수
+_FETCH_ATTEMPTS = 3
+
+# Orthanc ID 형식 (경로 조작 방지)
+_INSTANCE_ID_PATTERN = re.compile(r'^[0-9a-fA-F-]{8,64}$')
+
+_lock = threading.Lock()
+_state = {
+    'approx_bytes': None,  # 최초 사용 시 디렉터리 스캔으로 채움
+    'hits': 0,
+    'misses': 0,
+    'evictions': 0,
+    'bytes_fetched': 0,
+}
+
+
+def cache_enabled():
+    return DICOM_INSTANCE_CACHE_MAX_BYTES > 0
+
+
+def is_cacheable(instance_id):
+    return cache_enabled() and bool(_INSTANCE_ID_PATTERN.match(instance_id or ''))
+
+
+def _cache_path(instance_id):
+    # 디렉터리당 파일 수를 줄이기 위해 ID 앞 2글자로 분산
+    return os.path.join(DICOM_INSTANCE_CACHE_DIR, instance_id[:2], f'{instance_id}.dcm')
+
+
+def _iter_cache_files():
+    if not os.path.isdir(DICOM_INSTANCE_CACHE_DIR):
+        return
+    for shard in os.scandir(DICOM_INSTANCE_CACHE_DIR):
+        if not shard.is_dir():
+            continue
+        for entry in os.scandir(shard.path):
+            if entry.name.endswith('.dcm'):
+                yield entry
+
+
+def evict(max_bytes=None):
+    """
+    용량 초과 시 오래 사용하지 않은 파일부터 삭제
+
+    Returns:
+        int: 삭제한 파일 수
+    """
+    max_bytes = DICOM_INSTANCE_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    files = []
+    for entry in _iter_cache_files():
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:
+            continue
+        files.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total = sum(size for _, size, _ in files)
+    removed = 0
+    if total > max_bytes:
+        target = max_bytes * EVICT_TARGET_RATIO
+        for _, size, path in sorted(files):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+
+    with _lock:
+        _state['approx_bytes'] = total
+        _state['evictions'] += removed
+    return removed
+
+
+def _record_write(size):
+    with _lock:
+        _state['bytes_fetched'] += size
+        if _state['approx_bytes'] is not None:
+            _state['approx_bytes'] += size
+        over_budget = _state['approx_bytes'] is None or _state['approx_bytes'] > DICOM_INSTANCE_CACHE_MAX_BYTES
+    # 최초 1회 / 용량 초과 시 실제 디렉터리 기준으로 크기를 다시 계산하고 정리
+    # (다른 프로세스가 쓴 파일도 반영)
+    if over_budget:
+        evict()
+
+
+def _download(instance_id, path):
+    """Orthanc에서 파일을 받아 임시 파일에 쓴 뒤 원자적으로 교체"""
+    response = orthanc_client.get(
+        f'instances/{instance_id}/file', 'file', stream=True, headers={'Accept-Encoding': 'identity'}
+    )
+    try:
+        if response.status_code != 200:
+            raise requests.HTTPError(f'HTTP {response.status_code}', response=response)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.part')
+        size = 0
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                for chunk in response.iter_content(chunk_size=_COPY_CHUNK_SIZE):
+                    temp_file.write(chunk)
+                    size += len(chunk)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+    finally:
+        response.close()
+    return size
+
+
+def fetch_instance_file(instance_id):
+    """
+    Instance 파일의 로컬 경로 (없으면 Orthanc에서 받아 캐시에 저장)
+
+    Raises:
+        ValueError: 캐시에 쓸 수 없는 ID (캐시 비활성화 / 형식 오류)
+        requests.HTTPError: Orthanc가 200 이외로 응답한 경우
+    """
+    if not is_cacheable(instance_id):
+        raise ValueError(f'Instance {instance_id} cannot be cached')
+
+    path = _cache_path(instance_id)
+    try:
+        # 사용 시간 갱신 (noatime 마운트에서도 LRU가 동작하도록 mtime 사용)
+        os.utime(path)
+        with _lock:
+            _state['hits'] += 1
+        return path
+    except FileNotFoundError:
+        pass
+
+    with _lock:
+        _state['misses'] += 1
+    _record_write(_download(instance_id, path))
+    return path
+
+
+def open_instance_file(instance_id):
+    """
+    Instance 캐시 파일을 열어 반환 (바이너리 읽기 모드)
+
+    fetch_instance_file()의 경로는 열기 전에 다른 워커 / 프로세스의 evict()로 지워질 수 있으므로
+    열 때 파일이 없으면 다시 받습니다. 열린 핸들은 이후 파일이 지워져도 끝까지 읽을 수 있습니다.
+
+    Raises:
+        ValueError, requests.HTTPError: fetch_instance_file()과 같음
+    """
+    for attempt in range(_FETCH_ATTEMPTS):
+        path = fetch_instance_file(instance_id)
+        try:
+            return open(path, 'rb')
+        except FileNotFoundError:
+            if attempt == _FETCH_ATTEMPTS - 1:
+                raise
+
+
+def link_instance_file(instance_id, dest_path):
+    """
+    Instance 캐시 파일을 dest_path에 하드 링크 (다른 파일시스템이면 복사)
+
+    경로를 나중에 여는 외부 라이브러리(SimpleITK 등)에 넘길 때 사용 - 캐시에서 정리돼도 dest_path는 남음
+    """
+    for attempt in range(_FETCH_ATTEMPTS):
+        path = fetch_instance_file(instance_id)
+        try:
+            os.link(path, dest_path)
+            return dest_path
+        except FileNotFoundError:
+            if attempt == _FETCH_ATTEMPTS - 1:
+                raise
+        except OSError:
+            # 하드 링크 불가 (다른 파일시스템 등) -> 열린 핸들에서 복사
+            with open_instance_file(instance_id) as source, open(dest_path, 'wb') as dest:
+                shutil.copyfileobj(source, dest, _COPY_CHUNK_SIZE)
+            return dest_path
+
+
+def read_instance_bytes(instance_id):
+    """Instance 파일 내용 (캐시 우선, 캐시할 수 없는 ID는 Orthanc에서 직접 조회)"""
+    if is_cacheable(instance_id):
+        with open_instance_file(instance_id) as cached_file:
+            return cached_file.read()
+
+    response = orthanc_client.get(f'instances/{instance_id}/file', 'file')
+    response.raise_for_status()
+    return response.content
+
+
+def stats():
+    """캐시 메트릭 스냅샷"""
+    with _lock:
+        snapshot = dict(_state)
+    lookups = snapshot['hits'] + snapshot['misses']
+    snapshot['hit_ratio'] = round(snapshot['hits'] / lookups, 3) if lookups else None
+    snapshot['max_bytes'] = DICOM_INSTANCE_CACHE_MAX_BYTES
+    snapshot['directory'] = DICOM_INSTANCE_CACHE_DIR
+    return snapshot
@@ -0,0 +1,58 @@
+# orthanc_server/management/commands/sync_orthanc_changes.py
+"""
+Orthanc 변경 피드 미러링 (수동 실행 / 초기 동기화)
+
+사용 예:
+    python manage.py sync_orthanc_changes
+    python manage.py sync_orthanc_changes --reset
+    python manage.py sync_orthanc_changes --batch-size 1000 --max-batches 100
+"""
+import requests
+from django.core.management.base import BaseCommand
+
+from orthanc_server.change_feed import reset_change_cursor, sync_orthanc_changes
+
+
+class Command(BaseCommand):
+    help = 'Orthanc /changes 피드를 커서 위치부터 읽어 DICOMStudy/DICOMSeries에 반영합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='한 번에 조회할 변경 수 (기본값: 500)'
+        )
+        parser.add_argument(
+            '--max-batches',
+            type=int,
+            default=1000,
+            help='최대 배치 수 (기본값: 1000)'
+        )
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='커서를 0으로 되돌려 처음부터 다시 동기화합니다.'
+        )
+
+    def handle(self, *args, **options):
+        if options['reset']:
+            reset_change_cursor()
+            self.stdout.write('[OK] Change cursor reset')
+
+        try:
+            summary = sync_orthanc_changes(
+                batch_limit=options['batch_size'],
+                max_batches=options['max_batches'],
+            )
+        except requests.exceptions.RequestException as e:
+            self.stderr.write(f'!!! Orthanc 변경 피드 조회 실패: {e}')
+            return
+
+        if summary['status'] == 'locked':
+            self.stdout.write('다른 워커가 동기화 중입니다.')
+            return
+        self.stdout.write(
+            f"[OK] {summary['batches']}배치, 변경 {summary['changes']}건, "
+            f"Series {summary['series']}건 중 {summary['saved']}건 저장 (last={summary['last']})"
+        )
@@ -0,0 +1,122 @@
+# orthanc_server/metadata_cache.py
+"""
+Orthanc 메타데이터 read-through 캐시 (Redis)
+- 키: Orthanc 리소스 경로 (예: 'orthanc_meta:instances/{id}')
+- Instance는 저장 후 변하지 않으므로 긴 TTL
+- Series / Study는 하위 목록(Instances, Series)이 업로드로 바뀌므로 짧은 TTL +
+  업로드 시 ParentSeries / ParentStudy 기준으로 즉시 무효화
+- 응답 본문의 SHA-1을 ETag로 사용 (If-None-Match 일치 시 304)
+"""
+import hashlib
+import json
+import os
+
+from rest_framework import status
+from rest_framework.response import Response
+
+from administration.cache_manager import cache_manager
+from .client import orthanc_client
+
+
+# 리소스 종류별 TTL (초)
+INSTANCE_TTL = int(os.getenv('ORTHANC_INSTANCE_CACHE_TTL', 7 * 24 * 60 * 60))
+SERIES_TTL = int(os.getenv('ORTHANC_SERIES_CACHE_TTL', 10 * 60))
+STUDY_TTL = int(os.getenv('ORTHANC_STUDY_CACHE_TTL', 10 * 60))
+
+# 브라우저 캐시 max-age (초) - Series/Study는 업로드 직후 변경될 수 있으므로 재검증 위주
+INSTANCE_MAX_AGE = 24 * 60 * 60
+MEMBERSHIP_MAX_AGE = 0
+
+_TTL_BY_LEVEL = {
+    'instances': INSTANCE_TTL,
+    'series': SERIES_TTL,
+    'studies': STUDY_TTL,
+}
+
+
+def cache_key(path):
+    """캐시 키 (예: 'orthanc_meta:series/{id}/instances')"""
+    return f'orthanc_meta:{path}'
+
+
+def _make_etag(body):
+    return '"' + hashlib.sha1(body.encode('utf-8')).hexdigest() + '"'
+
+
+def _cache_get(key):
+    if not cache_manager.redis_client:
+        return None
+    try:
+        return cache_manager.redis_client.get(key)
+    except Exception as e:
+        print(f"[WARN] Orthanc metadata cache read failed: {e}")
+        return None
+
+
+def _cache_set(key, body, ttl):
+    if not cache_manager.redis_client:
+        return
+    try:
+        cache_manager.redis_client.setex(key, ttl, body)
+    except Exception as e:
+        print(f"[WARN] Orthanc metadata cache write failed: {e}")
+
+
+def get_metadata(path, timeout=None):
+    """
+    Orthanc 메타데이터 조회 (캐시 우선)
+
+    Args:
+        path: Orthanc 리소스 경로 (예: 'instances/{id}', 'series/{id}/instances')
+
+    Returns:
+        tuple: (data, etag)
+
+    Raises:
+        requests.HTTPError: Orthanc 응답이 200이 아닌 경우 (캐시하지 않음)
+        requests.exceptions.RequestException: 연결 실패
+    """
+    key = cache_key(path)
+    body = _cache_get(key)
+    if body is None:
+        response = orthanc_client.get(path, 'metadata', timeout=timeout)
+        response.raise_for_status()
+        body = response.text
+        _cache_set(key, body, _TTL_BY_LEVEL.get(path.split('/', 1)[0], SERIES_TTL))
+    return json.loads(body), _make_etag(body)
+
+
+def invalidate_metadata(series_ids=(), study_ids=()):
+    """
+    업로드로 하위 목록이 바뀐 Series / Study 캐시 삭제
+
+    Instance 캐시는 내용이 변하지 않으므로 유지합니다.
+    """
+    keys = []
+    for series_id in filter(None, set(series_ids)):
+        keys += [cache_key(f'series/{series_id}'), cache_key(f'series/{series_id}/instances')]
+    for study_id in filter(None, set(study_ids)):
+        keys.append(cache_key(f'studies/{study_id}'))
+    if not keys or not cache_manager.redis_client:
+        return
+    try:
+        cache_manager.redis_client.delete(*keys)
+    except Exception as e:
+        print(f"[WARN] Orthanc metadata cache invalidation failed: {e}")
+
+
+def cached_response(request, data, etag, max_age):
+    """
+    ETag / Cache-Control을 붙인 응답 (If-None-Match 일치 시 304)
+    """
+    if etag in [value.strip() for value in request.headers.get('If-None-Match', '').split(',')]:
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(data, status=status.HTTP_200_OK)
+
+    response['ETag'] = etag
+    if max_age:
+        response['Cache-Control'] = f'private, max-age={max_age}, immutable'
+    else:
+        response['Cache-Control'] = 'private, no-cache'
+    return response
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.8 on 2026-10-19 07:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrthancChangeCursor',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('last_seq', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Orthanc 변경 피드 커서',
+                'verbose_name_plural': 'Orthanc 변경 피드 커서',
+                'db_table': 'hospital"."orthanc_change_cursors',
+            },
+        ),
+    ]
@@ -1,3 +1,20 @@
 from django.db import models
 
-# Create your models here.
+
+class OrthancChangeCursor(models.Model):
+    """
+    Orthanc /changes 피드 처리 위치
+    - last_seq: 마지막으로 반영한 변경 번호 (다음 조회는 since=last_seq)
+    """
+
+    name = models.CharField(max_length=50, primary_key=True)
+    last_seq = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'hospital"."orthanc_change_cursors'
+        verbose_name = 'Orthanc 변경 피드 커서'
+        verbose_name_plural = 'Orthanc 변경 피드 커서'
+
+    def __str__(self):
+        return f"{self.name} @ {self.last_seq}"
@@ -0,0 +1,197 @@
+# orthanc_server/streaming.py
+"""
+Orthanc 파일 / 아카이브 스트리밍 프록시
+- Orthanc 응답을 iter_content 청크 단위로 그대로 흘려보냄 (워커 메모리에 전체 파일을 올리지 않음)
+- Content-Length 전달, HTTP Range 요청 지원 (이어받기)
+  - Orthanc가 206으로 응답하면 그대로 전달
+  - Orthanc가 Range를 무시하고 200으로 응답하면 앞부분을 건너뛰고 206으로 잘라서 전달
+- 로컬 캐시 파일은 FileResponse로 응답 (전체 파일은 wsgi.file_wrapper / sendfile 사용 가능)
+"""
+import os
+import re
+
+import requests
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+
+from .client import orthanc_client
+
+
+# 스트리밍 청크 크기 (바이트)
+STREAM_CHUNK_SIZE = 256 * 1024
+
+_RANGE_PATTERN = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeNotSatisfiable(Exception):
+    """요청한 Range가 파일 크기를 벗어난 경우"""
+
+
+def parse_range(header, total):
+    """
+    단일 바이트 범위 Range 헤더 해석
+
+    Args:
+        header: 'bytes=0-99', 'bytes=100-', 'bytes=-500'
+        total: 전체 크기 (모르면 None)
+
+    Returns:
+        tuple: (start, end) 포함 범위, Range를 적용할 수 없으면 None (전체 응답)
+
+    Raises:
+        RangeNotSatisfiable: 시작 위치가 파일 크기 이상인 경우
+    """
+    match = _RANGE_PATTERN.match((header or '').strip())
+    if not match or match.groups() == ('', ''):
+        # 다중 범위 등 지원하지 않는 형식은 무시 (전체 응답은 RFC상 허용)
+        return None
+
+    start, end = match.groups()
+    if total is None:
+        # 전체 크기를 모르면 Content-Range를 만들 수 없음
+        return None
+    if not start:
+        # 마지막 N바이트
+        length = int(end)
+        if length == 0:
+            raise RangeNotSatisfiable()
+        return max(total - length, 0), total - 1
+
+    start = int(start)
+    end = min(int(end), total - 1) if end else total - 1
+    if start >= total or start > end:
+        raise RangeNotSatisfiable()
+    return start, end
+
+
+def _iter_upstream(upstream, skip=0, limit=None):
+    """upstream 응답 본문을 청크 단위로 전달 (skip바이트 건너뛰고 limit바이트까지), 끝나면 연결 반환"""
+    try:
+        for chunk in upstream.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+            if skip:
+                if len(chunk) <= skip:
+                    skip -= len(chunk)
+                    continue
+                chunk = chunk[skip:]
+                skip = 0
+            if limit is not None:
+                if len(chunk) >= limit:
+                    yield chunk[:limit]
+                    return
+                limit -= len(chunk)
+            yield chunk
+    finally:
+        upstream.close()
+
+
+def range_not_satisfiable(total):
+    response = HttpResponse(status=416)
+    response['Content-Range'] = f'bytes */{total}'
+    return response
+
+
+def stream_orthanc_file(request, path, operation, content_type, filename):
+    """
+    Orthanc 파일 다운로드를 스트리밍 응답으로 프록시
+
+    Returns:
+        StreamingHttpResponse (200 / 206) 또는 HttpResponse (416)
+
+    Raises:
+        requests.HTTPError: Orthanc가 그 외 오류로 응답한 경우
+    """
+    range_header = request.headers.get('Range')
+    # 압축 전송이면 Content-Length가 실제 본문 길이와 달라지므로 원본 그대로 요청
+    headers = {'Accept-Encoding': 'identity'}
+    if range_header:
+        headers['Range'] = range_header
+    upstream = orthanc_client.get(path, operation, stream=True, headers=headers)
+
+    if upstream.status_code == 416:
+        upstream.close()
+        return range_not_satisfiable(upstream.headers.get('Content-Range', '*/*').split('/')[-1])
+    if upstream.status_code not in (200, 206):
+        upstream.close()
+        raise requests.HTTPError(f'HTTP {upstream.status_code}', response=upstream)
+
+    content_length = upstream.headers.get('Content-Length')
+    response_status = upstream.status_code
+    response_headers = {}
+    body = None
+
+    if upstream.status_code == 206:
+        # Orthanc가 Range를 직접 처리한 경우
+        response_headers['Content-Range'] = upstream.headers.get('Content-Range', '')
+    elif range_header:
+        total = int(content_length) if content_length else None
+        try:
+            byte_range = parse_range(range_header, total)
+        except RangeNotSatisfiable:
+            upstream.close()
+            return range_not_satisfiable(total)
+        if byte_range:
+            start, end = byte_range
+            body = _iter_upstream(upstream, skip=start, limit=end - start + 1)
+            response_status = 206
+            content_length = str(end - start + 1)
+            response_headers['Content-Range'] = f'bytes {start}-{end}/{total}'
+
+    response = StreamingHttpResponse(
+        body if body is not None else _iter_upstream(upstream),
+        status=response_status,
+        content_type=content_type,
+    )
+    if content_length:
+        response['Content-Length'] = content_length
+        response['Accept-Ranges'] = 'bytes'
+    for name, value in response_headers.items():
+        response[name] = value
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def _iter_file_range(source, start, length):
+    with source:
+        source.seek(start)
+        while length > 0:
+            chunk = source.read(min(STREAM_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def local_file_response(request, source, content_type, filename):
+    """
+    로컬 파일 응답 (Range 지원)
+
+    Args:
+        source: 파일 경로 또는 바이너리 모드로 열린 파일 (응답이 끝나면 닫힘)
+            - 크기 확인과 전송을 같은 핸들로 하므로 중간에 파일이 지워져도 끝까지 전송
+
+    Returns:
+        FileResponse (200 / 206) 또는 HttpResponse (416)
+    """
+    if isinstance(source, (str, os.PathLike)):
+        source = open(source, 'rb')
+    total = os.fstat(source.fileno()).st_size
+    try:
+        byte_range = parse_range(request.headers.get('Range'), total)
+    except RangeNotSatisfiable:
+        source.close()
+        return range_not_satisfiable(total)
+
+    if byte_range:
+        start, end = byte_range
+        response = FileResponse(
+            _iter_file_range(source, start, end - start + 1),
+            status=206,
+            content_type=content_type,
+            as_attachment=True,
+            filename=filename,
+        )
+        response['Content-Length'] = str(end - start + 1)
+        response['Content-Range'] = f'bytes {start}-{end}/{total}'
+    else:
+        response = FileResponse(source, content_type=content_type, as_attachment=True, filename=filename)
+    response['Accept-Ranges'] = 'bytes'
+    return response
@@ -0,0 +1,194 @@
+from celery import shared_task
+import os
+import zipfile
+
+from .change_feed import sync_orthanc_changes as sync_changes
+from .ingest import ingest_zip_archive
+from .thumbnails import build_series_thumbnails
+from .upload_sessions import (
+    delete_session, finish_ingest, purge_expired_sessions, release_session,
+)
+from .volumes import build_ct_volume, build_seg_nifti
+
+
+@shared_task(bind=True, name='orthanc_server.ingest_dicom_archive', max_retries=0)
+def ingest_dicom_archive(self, archive_path, file_name=None, workers=None, session_id=None):
+    """
+    spool 디렉터리에 저장된 ZIP 아카이브를 Orthanc에 업로드
+
+    Args:
+        archive_path: spool 파일 경로 (처리 후 삭제) 또는 분할 업로드 세션의 아카이브 경로
+        file_name: 원본 파일 이름
+        workers: 업로드 병렬 워커 수
+        session_id: 분할 업로드 세션 ID - 모두 성공 / 재시도 불가한 경우에만 세션 삭제,
+            Orthanc 장애 / 일부 실패 시 세션을 남겨 완료 요청으로 재시도
+
+    Returns:
+        업로드 결과 ({'Status', 'Count', 'Uploaded', 'Skipped', 'Instances', 'Errors'})
+    """
+    last_progress = -1
+
+    def report(processed, total):
+        nonlocal last_progress
+        progress = int(processed * 100 / total) if total else 100
+        # 1% 단위로만 상태 갱신 (결과 백엔드 쓰기 최소화)
+        if progress == last_progress and processed != total:
+            return
+        last_progress = progress
+        self.update_state(
+            state='PROGRESS',
+            meta={
+                'step': 'Uploading instances to Orthanc',
+                'file': file_name,
+                'processed': processed,
+                'total': total,
+                'progress': progress
+            }
+        )
+
+    result = None
+    try:
+        self.update_state(
+            state='PROGRESS',
+            meta={
+                'step': 'Reading archive',
+                'file': file_name,
+                'processed': 0,
+                'total': None,
+                'progress': 0
+            }
+        )
+
+        result = ingest_zip_archive(archive_path, workers=workers, progress_callback=report)
+        if result is None:
+            return {
+                'Status': 'Failed',
+                'file': file_name,
+                'error': 'No DICOM files found in ZIP archive'
+            }
+
+        result['file'] = file_name
+        return result
+
+    except zipfile.BadZipFile:
+        if session_id:
+            delete_session(session_id)
+            session_id = None
+        raise
+    except Exception:
+        if session_id:
+            release_session(session_id)
+            session_id = None
+        raise
+
+    finally:
+        if session_id:
+            finish_ingest(session_id, result)
+        else:
+            try:
+                os.remove(archive_path)
+            except OSError:
+                pass
+
+
+@shared_task(bind=True, name='orthanc_server.convert_series_nifti', max_retries=0)
+def convert_series_nifti(self, series_id):
+    """
+    SEG Series -> NIfTI 변환 (대용량 Series용 백그라운드 작업)
+
+    결과 파일은 NIfTI 캐시에 저장되며, 완료 후 같은 변환 API를 다시 호출하면 캐시에서 바로 응답합니다.
+
+    Args:
+        series_id: Orthanc Series ID
+
+    Returns:
+        {'status', 'series_id', 'size'}
+    """
+    def report(processed, total):
+        self.update_state(
+            state='PROGRESS',
+            meta={
+                'step': 'Decoding instances',
+                'series_id': series_id,
+                'processed': processed,
+                'total': total,
+                'progress': int(processed * 100 / total) if total else 100
+            }
+        )
+
+    nifti_path = build_seg_nifti(series_id, progress_callback=report)
+    return {
+        'status': 'success',
+        'series_id': series_id,
+        'size': os.path.getsize(nifti_path)
+    }
+
+
+@shared_task(bind=True, name='orthanc_server.export_ct_volume', max_retries=0)
+def export_ct_volume(self, series_id, spacing=None, dtype='int16'):
+    """
+    CT Series 볼륨 내보내기 (백그라운드 작업)
+
+    결과 파일은 볼륨 캐시에 저장되며, 완료 후 같은 API를 다시 호출하면 캐시에서 바로 응답합니다.
+
+    Returns:
+        {'status', 'series_id', 'size'}
+    """
+    def report(step, progress):
+        self.update_state(
+            state='PROGRESS',
+            meta={
+                'step': step,
+                'series_id': series_id,
+                'progress': progress
+            }
+        )
+
+    volume_path = build_ct_volume(series_id, spacing=spacing, dtype=dtype, progress_callback=report)
+    return {
+        'status': 'success',
+        'series_id': series_id,
+        'size': os.path.getsize(volume_path)
+    }
+
+
+@shared_task(name='orthanc_server.sync_orthanc_changes')
+def sync_orthanc_changes():
+    """
+    Orthanc 변경 피드 미러링 (beat 주기 작업)
+
+    다른 워커가 처리 중이면 바로 종료합니다 ({'status': 'locked'}).
+    """
+    return sync_changes()
+
+
+@shared_task(name='orthanc_server.generate_series_thumbnails', max_retries=0)
+def generate_series_thumbnails(series_ids):
+    """
+    Series 썸네일 생성 (middle / mip PNG) - 변경 피드의 StableSeries 이벤트 / 썸네일 조회 시 등록
+
+    Args:
+        series_ids: Orthanc Series ID 목록
+
+    Returns:
+        {'status', 'generated', 'failed'}
+    """
+    generated, failed = [], []
+    for series_id in series_ids:
+        try:
+            if build_series_thumbnails(series_id):
+                generated.append(series_id)
+        except Exception as e:
+            print(f"[WARN] Thumbnail generation failed for series {series_id}: {e}")
+            failed.append(series_id)
+    return {
+        'status': 'success' if not failed else 'partial',
+        'generated': generated,
+        'failed': failed
+    }
+
+
+@shared_task(name='orthanc_server.purge_upload_sessions')
+def purge_upload_sessions():
+    """완료되지 않고 방치된 분할 업로드 세션 정리"""
+    return {'deleted': purge_expired_sessions()}
@@ -0,0 +1,277 @@
+# orthanc_server/thumbnails.py
+"""
+Series 미리보기 썸네일 (PNG)
+- middle: 슬라이스 위치 기준 가운데 슬라이스 (CT는 복부 연부조직 창, 그 외는 1~99 백분위 창)
+- mip: 관상면 최대값 투영 (슬라이스마다 행 방향 최댓값만 남겨 누적 - 볼륨 전체를 메모리에 올리지 않음)
+- 인스턴스 파일은 디스크 캐시(instance_cache)에서 병렬로 읽음
+- 결과는 SeriesInstanceUID + 인스턴스 수 기준 파일명으로 캐시 (인스턴스 수가 바뀌면 새로 생성)
+  (인스턴스 수는 조회 API / 생성 작업 모두 Orthanc 실시간 값 기준)
+- 생성 작업은 인스턴스 수신이 끝난(Orthanc StableSeries) Series만, 같은 Series / 인스턴스 수에 대해 한 번만 등록
+  (변경 피드의 StableSeries 이벤트 / 조회 API에서 등록, Redis SET NX로 중복 방지)
+  → 파일이 하나씩 올라오는 동안 슬라이스마다 전체 Series를 다시 디코딩하지 않음
+"""
+import hashlib
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from administration.cache_manager import cache_manager
+from .client import fetch_concurrently, orthanc_get
+from .volumes import VOLUME_WORKERS, EmptySeries, _read_instance, _slice_position
+
+
+THUMBNAIL_CACHE_DIR = os.getenv(
+    'THUMBNAIL_CACHE_DIR',
+    os.path.join(tempfile.gettempdir(), 'liverguard_thumbnail_cache')
+)
+
+# 긴 변 기준 최대 크기 (픽셀)
+THUMBNAIL_SIZE = int(os.getenv('THUMBNAIL_SIZE', 256))
+
+THUMBNAIL_KINDS = ('middle', 'mip')
+
+# CT 창 설정 (center, width) - middle: 복부 연부조직, mip: 조영 혈관 / 뼈
+CT_WINDOWS = {
+    'middle': (40, 400),
+    'mip': (300, 1500),
+}
+
+# 픽셀 영상이 없는 Modality (썸네일 생성 안 함)
+NON_IMAGE_MODALITIES = ('SEG', 'SR', 'RTSTRUCT', 'PR', 'KO')
+
+# 생성 작업 중복 등록 방지 키 TTL (초) - 작업이 실패해도 이 시간이 지나면 다시 등록 가능
+THUMBNAIL_JOB_TTL = int(os.getenv('THUMBNAIL_JOB_TTL', 10 * 60))
+
+
+def thumbnail_cache_path(series_uid, instance_count, kind):
+    """SeriesInstanceUID + 인스턴스 수 + 종류 기준 캐시 파일 경로"""
+    digest = hashlib.sha1(series_uid.encode('utf-8')).hexdigest()
+    return os.path.join(THUMBNAIL_CACHE_DIR, f'{kind}_{digest}_{instance_count}.png')
+
+
+def thumbnail_paths(series):
+    """Orthanc Series 상세(JSON, orthanc_get 실시간 조회 결과) -> {kind: 캐시 파일 경로}"""
+    series_uid = series.get('MainDicomTags', {}).get('SeriesInstanceUID') or series['ID']
+    instance_count = len(series.get('Instances', []))
+    return {kind: thumbnail_cache_path(series_uid, instance_count, kind) for kind in THUMBNAIL_KINDS}
+
+
+def has_thumbnail_image(series):
+    """썸네일을 만들 수 있는 Series인지 (인스턴스가 있고 픽셀 영상 Modality)"""
+    return bool(series.get('Instances')) and series.get('MainDicomTags', {}).get('Modality') not in NON_IMAGE_MODALITIES
+
+
+def _job_key(series):
+    # 캐시 파일명과 같은 기준 (SeriesInstanceUID 해시 + 인스턴스 수)
+    return 'thumbnail_job:' + os.path.basename(thumbnail_paths(series)['middle'])[len('middle_'):-len('.png')]
+
+
+def is_stable(series):
+    """인스턴스 수신이 끝난 Series인지 (Orthanc StableAge 동안 새 인스턴스 없음)"""
+    return series.get('IsStable', True) is not False
+
+
+def claim_thumbnail_job(series):
+    """
+    썸네일 생성 작업 등록 권한 획득
+
+    Returns:
+        bool: 생성이 필요하고(안정된 Series, 캐시 없음) 같은 Series / 인스턴스 수로 등록된 작업이 없으면 True
+              (Redis를 쓸 수 없으면 중복 방지 없이 True)
+    """
+    if not has_thumbnail_image(series) or not is_stable(series):
+        return False
+    if all(os.path.exists(path) for path in thumbnail_paths(series).values()):
+        return False
+    if not cache_manager.redis_client:
+        return True
+    try:
+        return bool(cache_manager.redis_client.set(_job_key(series), 1, nx=True, ex=THUMBNAIL_JOB_TTL))
+    except Exception as e:
+        print(f"[WARN] Thumbnail job lock failed: {e}")
+        return True
+
+
+def release_thumbnail_job(series):
+    """작업 등록 실패 시 권한 반환 (다음 요청에서 다시 등록)"""
+    if not cache_manager.redis_client:
+        return
+    try:
+        cache_manager.redis_client.delete(_job_key(series))
+    except Exception as e:
+        print(f"[WARN] Thumbnail job unlock failed: {e}")
+
+
+def _modality_pixels(dataset):
+    """저장 값 -> Modality 값 (CT는 HU, rescale slope / intercept 적용)"""
+    pixels = dataset.pixel_array
+    # 다중 프레임은 첫 프레임, 컬러는 채널 평균만 사용
+    if int(getattr(dataset, 'NumberOfFrames', 1) or 1) > 1:
+        pixels = pixels[0]
+    if int(getattr(dataset, 'SamplesPerPixel', 1) or 1) > 1:
+        pixels = pixels.mean(axis=-1)
+    pixels = pixels.astype(np.float32)
+    slope = float(getattr(dataset, 'RescaleSlope', 1) or 1)
+    intercept = float(getattr(dataset, 'RescaleIntercept', 0) or 0)
+    return pixels * slope + intercept
+
+
+def _apply_window(image, window=None):
+    """창 설정 적용 -> uint8 (window가 없으면 1~99 백분위 기준)"""
+    if window:
+        center, width = window
+        low, high = center - width / 2, center + width / 2
+    else:
+        low, high = np.percentile(image, (1, 99))
+    if high <= low:
+        return np.zeros(image.shape, dtype=np.uint8)
+    scaled = (np.clip(image, low, high) - low) * (255.0 / (high - low))
+    return np.rint(scaled).astype(np.uint8)
+
+
+def _resize(image, row_spacing=1.0, column_spacing=1.0, size=None):
+    """물리 종횡비를 유지해 긴 변이 size 이하가 되도록 최근접 이웃 리샘플링"""
+    size = size or THUMBNAIL_SIZE
+    height_mm = image.shape[0] * row_spacing
+    width_mm = image.shape[1] * column_spacing
+    scale = size / max(height_mm, width_mm)
+    height = max(int(round(height_mm * scale)), 1)
+    width = max(int(round(width_mm * scale)), 1)
+    rows = np.minimum((np.arange(height) + 0.5) * image.shape[0] / height, image.shape[0] - 1).astype(int)
+    columns = np.minimum((np.arange(width) + 0.5) * image.shape[1] / width, image.shape[1] - 1).astype(int)
+    return image[np.ix_(rows, columns)]
+
+
+def _write_png(pixels, path):
+    """uint8 2D 배열을 PNG로 저장 (임시 파일에 쓴 뒤 원자적으로 교체)"""
+    import SimpleITK as sitk
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.png')
+    os.close(fd)
+    try:
+        sitk.WriteImage(sitk.GetImageFromArray(np.ascontiguousarray(pixels)), temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def _remove_stale(path):
+    """같은 Series / 종류의 이전 버전(인스턴스 수가 다른 파일) 삭제"""
+    prefix = os.path.basename(path).rsplit('_', 1)[0] + '_'
+    for name in os.listdir(os.path.dirname(path)):
+        if name.startswith(prefix) and name != os.path.basename(path):
+            try:
+                os.remove(os.path.join(os.path.dirname(path), name))
+            except OSError:
+                pass
+
+
+def _read_slice(instance_id):
+    """
+    슬라이스 1장 디코딩 -> 위치 / 관상면 투영 행 / 간격 (픽셀 배열은 바로 해제)
+    """
+    dataset = _read_instance(instance_id)
+    pixels = _modality_pixels(dataset)
+    pixel_spacing = getattr(dataset, 'PixelSpacing', None) or (1, 1)
+    return {
+        'instance_id': instance_id,
+        'position': _slice_position({
+            'header': dataset,
+            'instance_number': int(getattr(dataset, 'InstanceNumber', 0) or 0),
+        }),
+        'mip_row': pixels.max(axis=0),
+        'shape': pixels.shape,
+        'row_spacing': float(pixel_spacing[0]),
+        'column_spacing': float(pixel_spacing[1]),
+        'slice_thickness': float(getattr(dataset, 'SliceThickness', 0) or 0),
+        'modality': str(getattr(dataset, 'Modality', '') or ''),
+    }
+
+
+def queue_series_thumbnails(series_ids):
+    """
+    Series 썸네일 생성 작업 등록 (브로커 장애로 호출한 쪽이 실패하지 않도록 오류는 로그만 남김)
+
+    - 아직 인스턴스를 받는 중이거나, 현재 인스턴스 수 기준으로 썸네일이 있거나 작업이 등록된 Series는 건너뜀
+    """
+    series_ids = sorted(filter(None, set(series_ids)))
+    if not series_ids:
+        return
+    # tasks 모듈이 thumbnails를 import하므로 호출 시점에 import
+    from .tasks import generate_series_thumbnails
+
+    claimed = [
+        series for series in fetch_concurrently(lambda series_id: orthanc_get(f'series/{series_id}'), series_ids)
+        if series and claim_thumbnail_job(series)
+    ]
+    if not claimed:
+        return
+    try:
+        generate_series_thumbnails.delay([series['ID'] for series in claimed])
+    except Exception as e:
+        for series in claimed:
+            release_thumbnail_job(series)
+        print(f"[WARN] Failed to queue thumbnail generation: {e}")
+
+
+def build_series_thumbnails(series_id, workers=None):
+    """
+    Series 썸네일(middle, mip) 생성 (캐시가 있으면 그대로 반환)
+
+    Returns:
+        dict: {kind: PNG 파일 경로}, 픽셀 영상이 없는 Series는 빈 dict
+
+    Raises:
+        EmptySeries: 인스턴스가 없는 경우
+        requests.HTTPError: Orthanc 조회 실패
+    """
+    series = orthanc_get(f'series/{series_id}')
+    instance_ids = series.get('Instances', [])
+    if not instance_ids:
+        raise EmptySeries(f'No instances found in series {series_id}')
+    if not has_thumbnail_image(series):
+        return {}
+
+    paths = thumbnail_paths(series)
+    if all(os.path.exists(path) for path in paths.values()):
+        return paths
+
+    workers = min(workers or VOLUME_WORKERS, len(instance_ids))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        slices = list(executor.map(_read_slice, instance_ids))
+
+    # 크기가 다른 슬라이스(로컬라이저 등)는 가장 많은 크기 기준으로 제외
+    shapes = [item['shape'] for item in slices]
+    main_shape = max(set(shapes), key=shapes.count)
+    slices = sorted((item for item in slices if item['shape'] == main_shape), key=lambda item: item['position'])
+    first = slices[0]
+    is_ct = first['modality'] == 'CT'
+
+    # middle: 가운데 슬라이스만 다시 디코딩 (인스턴스 파일은 디스크 캐시에 있음)
+    middle = _modality_pixels(_read_instance(slices[len(slices) // 2]['instance_id']))
+    middle_image = _resize(
+        _apply_window(middle, CT_WINDOWS['middle'] if is_ct else None),
+        first['row_spacing'], first['column_spacing'],
+    )
+
+    # mip: (슬라이스, 열) 관상면 투영, 위쪽이 머리 방향이 되도록 뒤집음
+    mip = np.stack([item['mip_row'] for item in slices])[::-1]
+    if len(slices) > 1:
+        slice_spacing = abs(slices[-1]['position'] - first['position']) / (len(slices) - 1)
+    else:
+        slice_spacing = first['slice_thickness']
+    mip_image = _resize(
+        _apply_window(mip, CT_WINDOWS['mip'] if is_ct else None),
+        slice_spacing or first['slice_thickness'] or 1.0, first['column_spacing'],
+    )
+
+    _write_png(middle_image, paths['middle'])
+    _write_png(mip_image, paths['mip'])
+    for path in paths.values():
+        _remove_stale(path)
+    return paths
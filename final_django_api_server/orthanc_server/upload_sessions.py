@@ -0,0 +1,318 @@
+# orthanc_server/upload_sessions.py
+"""
+이어받기 가능한 분할 업로드 세션 (대용량 ZIP)
+- 세션 = 로컬 디스크 디렉터리 (meta.json + data.part), 현재 오프셋 = data.part 크기
+  → API 서버가 재시작돼도 이어서 업로드 가능
+- 청크는 현재 오프셋 위치에만 이어 쓰기 (다르면 OffsetMismatch, 클라이언트는 오프셋 조회 후 재전송)
+- 같은 세션에 동시에 들어온 청크 / 완료 요청은 파일 잠금(flock)으로 직렬화
+- 완료(finalize) 시 세션의 data.part를 그대로 기존 ZIP 업로드 경로(동기 / Celery 작업)로 처리
+  - 처리 중 표시(ingest_started_at)로 동시 완료 요청은 하나만 진행
+  - Orthanc 업로드가 모두 성공했거나 다시 시도해도 소용없는 경우(ZIP 오류 / DICOM 없음)에만 세션 삭제,
+    Orthanc 장애 / 일부 실패 시 세션을 남겨 완료 요청만 다시 보내면 재시도 (이미 저장된 Instance는 건너뜀)
+"""
+import fcntl
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+import uuid
+
+from .ingest import DICOM_INGEST_SPOOL_DIR
+
+
+UPLOAD_SESSION_DIR = os.getenv(
+    'UPLOAD_SESSION_DIR',
+    os.path.join(DICOM_INGEST_SPOOL_DIR, 'sessions')
+)
+
+# 세션 최대 크기 (바이트, 기본 20GB)
+UPLOAD_SESSION_MAX_BYTES = int(os.getenv('UPLOAD_SESSION_MAX_BYTES', 20 * 1024 ** 3))
+
+# 마지막 청크 이후 이 시간(초)이 지난 세션은 정리 대상 (기본 24시간)
+UPLOAD_SESSION_TTL = int(os.getenv('UPLOAD_SESSION_TTL', 24 * 60 * 60))
+
+# 클라이언트 권장 청크 크기 (바이트)
+UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', 8 * 1024 * 1024))
+
+# 처리 중 표시 유효 시간 (초) - 워커가 비정상 종료해 표시가 남아도 이후 다시 완료 요청 가능
+UPLOAD_SESSION_INGEST_TIMEOUT = int(os.getenv('UPLOAD_SESSION_INGEST_TIMEOUT', 2 * 60 * 60))
+
+_COPY_CHUNK_SIZE = 1024 * 1024
+
+_SESSION_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+
+class UploadSessionNotFound(Exception):
+    """없는 / 만료된 세션"""
+
+
+class OffsetMismatch(Exception):
+    """청크 시작 위치가 현재 오프셋과 다른 경우"""
+
+    def __init__(self, offset):
+        super().__init__(f'Upload offset is {offset}')
+        self.offset = offset
+
+
+class IncompleteUpload(Exception):
+    """전체 크기를 다 받기 전에 완료 요청한 경우"""
+
+
+class SessionBusy(Exception):
+    """다른 요청이 이미 완료 처리(Orthanc 업로드) 중인 경우"""
+
+
+def _session_dir(session_id):
+    # 경로 조작 방지
+    if not _SESSION_ID_PATTERN.match(session_id or ''):
+        raise UploadSessionNotFound(session_id)
+    return os.path.join(UPLOAD_SESSION_DIR, session_id)
+
+
+def _data_path(session_id):
+    return os.path.join(_session_dir(session_id), 'data.part')
+
+
+def _read_meta(session_id):
+    try:
+        with open(os.path.join(_session_dir(session_id), 'meta.json'), encoding='utf-8') as meta_file:
+            return json.load(meta_file)
+    except FileNotFoundError:
+        raise UploadSessionNotFound(session_id)
+
+
+def _write_meta(session_id, meta):
+    """meta.json 원자적 교체"""
+    session_dir = _session_dir(session_id)
+    fd, temp_path = tempfile.mkstemp(dir=session_dir, suffix='.json')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as meta_file:
+            json.dump(meta, meta_file)
+        os.replace(temp_path, os.path.join(session_dir, 'meta.json'))
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def _is_ingesting(meta):
+    started_at = meta.get('ingest_started_at')
+    return bool(started_at) and time.time() - started_at < UPLOAD_SESSION_INGEST_TIMEOUT
+
+
+def _open_locked(session_id):
+    """
+    data.part를 열고 배타 잠금 (잠금을 기다리는 동안 다른 요청이 완료 처리해 옮겼으면 UploadSessionNotFound)
+
+    Returns:
+        file: 잠긴 data.part (r+b), 닫으면 잠금 해제
+    """
+    path = _data_path(session_id)
+    try:
+        data_file = open(path, 'r+b')
+    except FileNotFoundError:
+        raise UploadSessionNotFound(session_id)
+
+    fcntl.flock(data_file, fcntl.LOCK_EX)
+    try:
+        current = os.stat(path)
+    except FileNotFoundError:
+        current = None
+    if current is None or current.st_ino != os.fstat(data_file.fileno()).st_ino:
+        data_file.close()
+        raise UploadSessionNotFound(session_id)
+    return data_file
+
+
+def create_session(file_name, total_size):
+    """
+    업로드 세션 생성
+
+    Returns:
+        dict: get_session()과 같은 형식
+
+    Raises:
+        ValueError: 크기가 0 이하 / 최대 크기 초과
+    """
+    if total_size <= 0:
+        raise ValueError('total_size는 0보다 커야 합니다.')
+    if total_size > UPLOAD_SESSION_MAX_BYTES:
+        raise ValueError(f'total_size는 {UPLOAD_SESSION_MAX_BYTES}바이트 이하여야 합니다.')
+
+    session_id = uuid.uuid4().hex
+    session_dir = _session_dir(session_id)
+    os.makedirs(session_dir)
+    with open(os.path.join(session_dir, 'meta.json'), 'w', encoding='utf-8') as meta_file:
+        json.dump({'file_name': file_name, 'total_size': total_size, 'created_at': time.time()}, meta_file)
+    open(_data_path(session_id), 'wb').close()
+    return get_session(session_id)
+
+
+def get_session(session_id):
+    """
+    세션 상태
+
+    Returns:
+        dict: {'session_id', 'file_name', 'total_size', 'offset', 'complete', 'ingesting'}
+
+    Raises:
+        UploadSessionNotFound
+    """
+    meta = _read_meta(session_id)
+    try:
+        offset = os.path.getsize(_data_path(session_id))
+    except FileNotFoundError:
+        raise UploadSessionNotFound(session_id)
+    return {
+        'session_id': session_id,
+        'file_name': meta['file_name'],
+        'total_size': meta['total_size'],
+        'offset': offset,
+        'complete': offset == meta['total_size'],
+        'ingesting': _is_ingesting(meta),
+    }
+
+
+def write_chunk(session_id, offset, stream, length=None):
+    """
+    청크 이어 쓰기 (stream에서 청크 단위로 읽어 바로 기록)
+
+    Args:
+        offset: 클라이언트가 보낸 청크 시작 위치
+        stream: read(size)를 지원하는 본문 스트림
+        length: 본문 길이 (Content-Length, 모르면 None)
+
+    Returns:
+        int: 기록 후 오프셋
+
+    Raises:
+        UploadSessionNotFound
+        OffsetMismatch: offset이 현재 오프셋과 다른 경우
+        ValueError: 전체 크기를 넘는 청크
+    """
+    meta = _read_meta(session_id)
+    with _open_locked(session_id) as data_file:
+        current = data_file.seek(0, os.SEEK_END)
+        if offset != current:
+            raise OffsetMismatch(current)
+        remaining = meta['total_size'] - current
+        if length is not None and length > remaining:
+            raise ValueError(f'청크가 전체 크기를 넘습니다 (남은 크기: {remaining}바이트).')
+
+        try:
+            written = 0
+            while True:
+                chunk = stream.read(_COPY_CHUNK_SIZE)
+                if not chunk:
+                    break
+                if written + len(chunk) > remaining:
+                    raise ValueError(f'청크가 전체 크기를 넘습니다 (남은 크기: {remaining}바이트).')
+                data_file.write(chunk)
+                written += len(chunk)
+            data_file.flush()
+        except ValueError:
+            # 초과분이 섞인 청크는 통째로 버림 (오프셋은 청크 시작 위치로 유지)
+            data_file.truncate(current)
+            raise
+        # 연결이 끊겨 일부만 받은 경우 받은 만큼은 유지 (클라이언트는 오프셋 조회 후 이어서 전송)
+        return data_file.tell()
+
+
+def finalize_session(session_id):
+    """
+    업로드 완료 -> 처리 중으로 표시하고 아카이브 경로 반환 (데이터는 세션에 그대로 둠)
+
+    처리 결과에 따라 finish_ingest() / release_session()을 호출해야 합니다.
+
+    Returns:
+        tuple: (아카이브 파일 경로, 원본 파일 이름)
+
+    Raises:
+        UploadSessionNotFound
+        IncompleteUpload: 전체 크기를 다 받지 못한 경우
+        SessionBusy: 다른 요청이 이미 처리 중인 경우
+    """
+    # 청크 쓰기와 같은 잠금 안에서 확인 + 표시 (동시 완료 요청은 하나만 진행)
+    with _open_locked(session_id) as data_file:
+        meta = _read_meta(session_id)
+        offset = data_file.seek(0, os.SEEK_END)
+        if offset != meta['total_size']:
+            raise IncompleteUpload(f"Received {offset} of {meta['total_size']} bytes")
+        if _is_ingesting(meta):
+            raise SessionBusy(session_id)
+
+        meta['ingest_started_at'] = time.time()
+        _write_meta(session_id, meta)
+    return _data_path(session_id), meta['file_name']
+
+
+def release_session(session_id):
+    """처리 중 표시 해제 (다시 완료 요청 가능, 세션이 이미 없으면 무시)"""
+    try:
+        with _open_locked(session_id):
+            meta = _read_meta(session_id)
+            meta.pop('ingest_started_at', None)
+            _write_meta(session_id, meta)
+    except UploadSessionNotFound:
+        pass
+
+
+def finish_ingest(session_id, result):
+    """
+    ZIP 업로드 결과에 따라 세션 정리
+
+    - 모두 성공 / DICOM 파일 없음(result None): 세션 삭제
+    - 일부 실패(Errors): 세션 유지 + 처리 중 표시 해제 (완료 요청으로 재시도)
+
+    Returns:
+        bool: 세션을 삭제했으면 True
+    """
+    if result is None or not result.get('Errors'):
+        try:
+            delete_session(session_id)
+        except UploadSessionNotFound:
+            pass
+        return True
+    release_session(session_id)
+    return False
+
+
+def delete_session(session_id):
+    """세션 취소"""
+    session_dir = _session_dir(session_id)
+    if not os.path.isdir(session_dir):
+        raise UploadSessionNotFound(session_id)
+    shutil.rmtree(session_dir, ignore_errors=True)
+
+
+def purge_expired_sessions(ttl=None):
+    """
+    마지막 청크 이후 ttl초가 지난 세션 삭제
+
+    Returns:
+        int: 삭제한 세션 수
+    """
+    ttl = UPLOAD_SESSION_TTL if ttl is None else ttl
+    if not os.path.isdir(UPLOAD_SESSION_DIR):
+        return 0
+
+    cutoff = time.time() - ttl
+    removed = 0
+    for entry in os.scandir(UPLOAD_SESSION_DIR):
+        if not entry.is_dir() or not _SESSION_ID_PATTERN.match(entry.name):
+            continue
+        try:
+            if _is_ingesting(_read_meta(entry.name)):
+                continue
+        except (UploadSessionNotFound, ValueError):
+            pass
+        try:
+            last_write = os.path.getmtime(os.path.join(entry.path, 'data.part'))
+        except FileNotFoundError:
+            last_write = entry.stat().st_mtime
+        if last_write < cutoff:
+            shutil.rmtree(entry.path, ignore_errors=True)
+            removed += 1
+    return removed
@@ -1,25 +1,41 @@
 from django.urls import path
 from .views import (
     UploadDicomView,
+    DicomIngestTaskStatusView,
+    UploadSessionCreateView,
+    UploadSessionView,
+    UploadSessionFinalizeView,
     OrthancSystemInfoView,
+    OrthancClientMetricsView,
     OrthancStudyView,
     OrthancInstanceView,
     OrthancSeriesListView,
     OrthancSeriesView,
     OrthancSeriesInstancesView,
+    OrthancSeriesSlicesView,
     OrthancInstanceFileView,
     OrthancSeriesArchiveView,
     OrthancPatientStudiesView,
     OrthancStudySeriesView,
     OrthancSeriesNiftiView,
+    OrthancSeriesVolumeView,
+    OrthancSeriesThumbnailView,
 )
 
 urlpatterns = [
     # DICOM 파일 업로드
     path('upload/', UploadDicomView.as_view(), name='upload_dicom'),
+    path('upload/jobs/<str:task_id>/', DicomIngestTaskStatusView.as_view(), name='dicom_ingest_status'),
+
+    # 이어받기 가능한 분할 업로드 (대용량 ZIP)
+    path('upload/sessions/', UploadSessionCreateView.as_view(), name='upload_session_create'),
+    path('upload/sessions/<str:session_id>/', UploadSessionView.as_view(), name='upload_session'),
+    path('upload/sessions/<str:session_id>/finalize/', UploadSessionFinalizeView.as_view(), name='upload_session_finalize'),
+    path('jobs/<str:task_id>/', DicomIngestTaskStatusView.as_view(), name='orthanc_task_status'),
 
     # Orthanc 시스템 정보
     path('system/', OrthancSystemInfoView.as_view(), name='orthanc_system'),
+    path('client-metrics/', OrthancClientMetricsView.as_view(), name='orthanc_client_metrics'),
 
     # 환자의 Studies 목록 조회 (새 API)
     path('patients/<str:patient_id>/studies/', OrthancPatientStudiesView.as_view(), name='orthanc_patient_studies'),
@@ -30,7 +46,10 @@ urlpatterns = [
 
     # Series 관련 - 더 구체적인 패턴을 먼저 배치
     path('series/<str:series_id>/instances/', OrthancSeriesInstancesView.as_view(), name='orthanc_series_instances'),
+    path('series/<str:series_id>/slices/', OrthancSeriesSlicesView.as_view(), name='orthanc_series_slices'),
     path('series/<str:series_id>/nifti/', OrthancSeriesNiftiView.as_view(), name='orthanc_series_nifti'),
+    path('series/<str:series_id>/volume/', OrthancSeriesVolumeView.as_view(), name='orthanc_series_volume'),
+    path('series/<str:series_id>/thumbnail/', OrthancSeriesThumbnailView.as_view(), name='orthanc_series_thumbnail'),
     path('series/<str:series_id>/archive/', OrthancSeriesArchiveView.as_view(), name='orthanc_series_archive'),
     path('series/<str:series_id>/', OrthancSeriesView.as_view(), name='orthanc_series'),
     path('series/', OrthancSeriesListView.as_view(), name='orthanc_series_list'),
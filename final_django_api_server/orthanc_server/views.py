@@ -3,110 +3,64 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny
 from rest_framework.parsers import MultiPartParser, FormParser
+from django.db.models import F
+from django.http import FileResponse, HttpResponse
 import requests
 import io
-import pydicom
-import nibabel as nib
-import numpy as np
 import os
-import tempfile
 import zipfile
-from django.http import FileResponse
-from radiology.models import DICOMSeries, DICOMStudy, RadiologyAIRun
+from .client import (
+    fetch_concurrently, find_resources, get_child_resources, list_resources, orthanc_client, orthanc_get,
+)
+from .ingest import (
+    _extract_dicom_tags, collect_series_records, ingest_zip_archive, instance_record, spool_upload,
+    store_instance, upsert_instance_records, upsert_series_records,
+)
+from .metadata_cache import (
+    INSTANCE_MAX_AGE, MEMBERSHIP_MAX_AGE, cached_response, get_metadata, invalidate_metadata,
+)
+from .instance_cache import is_cacheable, open_instance_file, stats as instance_cache_stats
+from .streaming import local_file_response, stream_orthanc_file
+from .tasks import convert_series_nifti, export_ct_volume, generate_series_thumbnails, ingest_dicom_archive
+from .thumbnails import (
+    THUMBNAIL_KINDS, claim_thumbnail_job, has_thumbnail_image, is_stable, release_thumbnail_job, thumbnail_paths,
+)
+from .upload_sessions import (
+    UPLOAD_CHUNK_SIZE, IncompleteUpload, OffsetMismatch, SessionBusy, UploadSessionNotFound, create_session,
+    delete_session, finalize_session, finish_ingest, get_session, release_session, write_chunk,
+)
+from .volumes import (
+    VOLUME_OUTPUT_FORMATS, EmptySeries, VolumeTooLarge, build_ct_volume, build_seg_nifti, normalize_spacing,
+)
+from radiology.models import DICOMInstance, DICOMSeries
 
 
-# Orthanc 서버 설정
-ORTHANC_BASE_URL = os.getenv(
-    'ORTHANC_BASE_URL',
-    'http://34.67.62.238/orthanc'  # 기본값 (로컬 개발용)
-)
+# 목록 조회 최대 페이지 크기
+MAX_PAGE_LIMIT = 500
 
 
-def _extract_dicom_tags(file_content: bytes) -> dict:
+def _paging_params(request, default_limit):
+    """since / limit 쿼리 파라미터 (형식 오류 시 ValueError)"""
     try:
-        dataset = pydicom.dcmread(
-            io.BytesIO(file_content),
-            stop_before_pixels=True,
-            force=True,
-        )
-    except Exception as exc:
-        print(f"Failed to read DICOM metadata: {exc}")
-        return {}
-
-    def get_value(attr: str):
-        value = getattr(dataset, attr, None)
-        return str(value) if value is not None else None
-
-    return {
-        'PatientID': get_value('PatientID'),
-        'PatientName': get_value('PatientName'),
-        'PatientBirthDate': get_value('PatientBirthDate'),
-        'PatientSex': get_value('PatientSex'),
-        'StudyInstanceUID': get_value('StudyInstanceUID'),
-        'SeriesInstanceUID': get_value('SeriesInstanceUID'),
-        'Modality': get_value('Modality'),
-        'StudyDescription': get_value('StudyDescription'),
-        'InstitutionName': get_value('InstitutionName'),
-        'SeriesNumber': get_value('SeriesNumber'),
-        'SeriesDescription': get_value('SeriesDescription'),
-        'ProtocolName': get_value('ProtocolName'),
-    }
-
-
-def _get_or_create_study(tags: dict, patient_id: str) -> DICOMStudy | None:
-    study_uid = tags.get('StudyInstanceUID')
-    if not study_uid:
-        return None
-    defaults = {
-        'patient_id': patient_id,
-        'modality': tags.get('Modality'),
-        'study_description': tags.get('StudyDescription'),
-        'institution_name': tags.get('InstitutionName'),
-    }
-    study, _ = DICOMStudy.objects.get_or_create(study_uid=study_uid, defaults=defaults)
-    return study
-
-
-def _get_or_create_series(tags: dict, parent_series_id: str | None, study: DICOMStudy) -> DICOMSeries | None:
-    series_uid = tags.get('SeriesInstanceUID')
-    if not series_uid:
-        return None
-    defaults = {
-        'study': study,
-        'orthanc_series_id': parent_series_id,
-        'modality': tags.get('Modality'),
-        'series_number': int(tags.get('SeriesNumber')) if tags.get('SeriesNumber') else None,
-        'series_description': tags.get('SeriesDescription'),
-        'protocol_name': tags.get('ProtocolName'),
-    }
-    series, created = DICOMSeries.objects.get_or_create(series_uid=series_uid, defaults=defaults)
-    if not created and parent_series_id and not series.orthanc_series_id:
-        series.orthanc_series_id = parent_series_id
-        series.save(update_fields=['orthanc_series_id'])
-    return series
-
-
-def _ensure_series_and_run(tags: dict, parent_series_id: str | None, created_series: set) -> None:
-    patient_id = tags.get('PatientID')
-    if not patient_id:
-        print("RadiologyAIRun skipped: patient_id tag missing")
-        return
-
-    study = _get_or_create_study(tags, patient_id)
-    if not study:
-        print("RadiologyAIRun skipped: study tag missing")
-        return
-
-    series = _get_or_create_series(tags, parent_series_id, study)
-    if not series:
-        print("RadiologyAIRun skipped: series tag missing")
-        return
-
-    if series.series_uid in created_series:
-        return
-    created_series.add(series.series_uid)
-    if not RadiologyAIRun.objects.filter(series=series).exists():
-        RadiologyAIRun.objects.create(series=series)
+        since = int(request.query_params.get('since', 0))
+        limit = int(request.query_params.get('limit', default_limit))
+    except ValueError:
+        raise ValueError('since와 limit는 정수여야 합니다.')
+    if since < 0 or limit < 1:
+        raise ValueError('since는 0 이상, limit는 1 이상이어야 합니다.')
+    return since, min(limit, MAX_PAGE_LIMIT)
+
+
+def _paged_response(items, since, limit):
+    """
+    limit + 1개까지 조회한 목록을 잘라서 응답
+    - 본문은 기존과 같은 배열, 다음 페이지가 있으면 X-Next-Since 헤더로 다음 since 전달
+    """
+    response = Response(items[:limit], status=status.HTTP_200_OK)
+    if len(items) > limit:
+        response['X-Next-Since'] = str(since + limit)
+    return response
+
 
 class UploadDicomView(APIView):
     """DICOM 파일을 Orthanc 서버에 업로드하는 프록시 API"""
@@ -120,6 +74,10 @@ class UploadDicomView(APIView):
         Request:
         - multipart/form-data로 DICOM 파일 전송
         - 파일 필드명: 'file'
+        - async=1 (ZIP만): 백그라운드 처리, 202 + task_id 반환
+          (진행 상태: GET /orthanc/upload/jobs/{task_id}/)
+        - ZIP 안의 이미 저장된 Instance(SOPInstanceUID 기준)는 다시 전송하지 않음
+          (응답의 Uploaded / Skipped로 구분, Instances에는 Status 'AlreadyStored'로 포함)
 
         Response:
         {
@@ -144,100 +102,258 @@ class UploadDicomView(APIView):
                 'error': 'Only DICOM files (.dcm, .dicom) or ZIP archives (.zip) are allowed'
             }, status=status.HTTP_400_BAD_REQUEST)
 
+        # ZIP 병렬 처리 워커 수 (업로드 처리 전에 검증)
+        try:
+            workers = request.query_params.get('workers') or request.data.get('workers')
+            workers = min(int(workers), 32) if workers else None
+        except (TypeError, ValueError):
+            return Response({'error': 'workers는 정수여야 합니다.'}, status=status.HTTP_400_BAD_REQUEST)
+
         try:
             if file_name.endswith('.zip'):
-                with zipfile.ZipFile(uploaded_file) as zip_ref:
-                    dicom_entries = [
-                        entry for entry in zip_ref.infolist()
-                        if not entry.is_dir()
-                        and entry.filename.lower().endswith(('.dcm', '.dicom'))
-                    ]
-
-                    if not dicom_entries:
-                        return Response({
-                            'error': 'No DICOM files found in ZIP archive'
-                        }, status=status.HTTP_400_BAD_REQUEST)
-
-                    successes = []
-                    errors = []
-
-                    created_series = set()
-                    series_candidates = []
-                    seen_candidates = set()
-                    for entry in dicom_entries:
-                        try:
-                            with zip_ref.open(entry) as dicom_file:
-                                file_content = dicom_file.read()
-                            tags = _extract_dicom_tags(file_content)
-
-                            orthanc_response = requests.post(
-                                f'{ORTHANC_BASE_URL}/instances',
-                                data=file_content,
-                                headers={
-                                    'Content-Type': 'application/dicom'
-                                },
-                                timeout=30
-                            )
-
-                            if orthanc_response.status_code == 200:
-                                payload = orthanc_response.json()
-                                successes.append(payload)
-                                parent_series_id = payload.get('ParentSeries')
-                                series_uid = tags.get('SeriesInstanceUID') or parent_series_id
-                                if series_uid and series_uid not in seen_candidates:
-                                    series_candidates.append((tags, parent_series_id))
-                                    seen_candidates.add(series_uid)
-                            else:
-                                errors.append({
-                                    'file': entry.filename,
-                                    'error': orthanc_response.text
-                                })
-                        except Exception as exc:
-                            errors.append({
-                                'file': entry.filename,
-                                'error': str(exc)
-                            })
-
-                    for tags, parent_series_id in series_candidates:
-                        _ensure_series_and_run(tags, parent_series_id, created_series)
-
-                    response_payload = {
-                        'Status': 'Success' if not errors else 'PartialSuccess',
-                        'Count': len(successes),
-                        'Instances': successes,
-                        'Errors': errors
-                    }
-                    return Response(
-                        response_payload,
-                        status=status.HTTP_200_OK if not errors else status.HTTP_207_MULTI_STATUS
-                    )
+                # 백그라운드 모드: 디스크에 저장 후 Celery 작업으로 처리 (202 + 작업 ID)
+                if str(request.query_params.get('async') or request.data.get('async', '')).lower() in ('1', 'true'):
+                    archive_path = spool_upload(uploaded_file)
+                    try:
+                        task = ingest_dicom_archive.delay(archive_path, uploaded_file.name, workers)
+                    except Exception:
+                        os.remove(archive_path)
+                        raise
+
+                    return Response({
+                        'task_id': task.id,
+                        'status': 'pending',
+                        'message': 'DICOM ingest task started',
+                        'file': uploaded_file.name
+                    }, status=status.HTTP_202_ACCEPTED)
+
+                # 헤더 파싱 + Orthanc 전송 병렬 처리 (결과는 ZIP 순서대로, 멤버는 스트림으로 전송)
+                response_payload = ingest_zip_archive(uploaded_file, workers=workers)
+                if response_payload is None:
+                    return Response({
+                        'error': 'No DICOM files found in ZIP archive'
+                    }, status=status.HTTP_400_BAD_REQUEST)
+
+                return Response(
+                    response_payload,
+                    status=status.HTTP_200_OK if not response_payload['Errors'] else status.HTTP_207_MULTI_STATUS
+                )
 
-            # 파일 내용 읽기
-            file_content = uploaded_file.read()
-            tags = _extract_dicom_tags(file_content)
+            # 헤더만 읽은 뒤 파일 객체 그대로 Orthanc 서버로 스트리밍 전송
+            # (임계값 이상 업로드는 임시 파일이므로 전체 내용을 메모리에 올리지 않음)
+            tags = _extract_dicom_tags(uploaded_file)
 
             # Orthanc 서버로 전송
-            orthanc_response = requests.post(
-                f'{ORTHANC_BASE_URL}/instances',
-                data=file_content,
-                headers={
-                    'Content-Type': 'application/dicom'
-                },
-                timeout=30
+            try:
+                payload = store_instance(uploaded_file)
+            except requests.HTTPError as e:
+                return Response({
+                    'error': 'Orthanc upload failed',
+                    'details': e.response.text
+                }, status=e.response.status_code)
+
+            invalidate_metadata([payload.get('ParentSeries')], [payload.get('ParentStudy')])
+            upsert_series_records(collect_series_records([(tags, payload)]))
+            return Response(payload, status=status.HTTP_200_OK)
+
+        except requests.exceptions.RequestException as e:
+            return Response({
+                'error': 'Failed to connect to Orthanc server',
+                'details': str(e)
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        except Exception as e:
+            return Response({
+                'error': 'Internal server error',
+                'details': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def _session_not_found(session_id):
+    return Response({
+        'error': f'Upload session {session_id} not found'
+    }, status=status.HTTP_404_NOT_FOUND)
+
+
+class UploadSessionCreateView(APIView):
+    """이어받기 가능한 분할 업로드 세션 생성 API (대용량 ZIP)"""
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        """
+        업로드 세션 생성
+        POST /orthanc/upload/sessions/
+
+        Request: {"file_name": "study.zip", "total_size": 123456789}
+
+        이후 절차:
+        1. PUT /orthanc/upload/sessions/{session_id}/ (본문: 청크, 헤더 Upload-Offset 또는 ?offset=)
+        2. 연결이 끊기면 GET /orthanc/upload/sessions/{session_id}/ 로 offset 확인 후 이어서 전송
+        3. POST /orthanc/upload/sessions/{session_id}/finalize/ (async=1이면 백그라운드 처리)
+        """
+        file_name = str(request.data.get('file_name') or '')
+        if not file_name.lower().endswith('.zip'):
+            return Response({
+                'error': 'Only ZIP archives (.zip) can be uploaded in chunks'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            total_size = int(request.data.get('total_size'))
+        except (TypeError, ValueError):
+            return Response({'error': 'total_size는 정수여야 합니다.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            session = create_session(file_name, total_size)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        session['chunk_size'] = UPLOAD_CHUNK_SIZE
+        return Response(session, status=status.HTTP_201_CREATED)
+
+
+class UploadSessionView(APIView):
+    """분할 업로드 세션 조회 / 청크 전송 / 취소 API"""
+    permission_classes = [AllowAny]
+
+    def get(self, request, session_id):
+        """
+        현재 오프셋 조회 (이어서 보낼 위치)
+        GET /orthanc/upload/sessions/{session_id}/
+        """
+        try:
+            session = get_session(session_id)
+        except UploadSessionNotFound:
+            return _session_not_found(session_id)
+
+        response = Response(session, status=status.HTTP_200_OK)
+        response['Upload-Offset'] = str(session['offset'])
+        return response
+
+    def put(self, request, session_id):
+        """
+        청크 전송 (현재 오프셋 위치에만 이어 쓰기)
+        PUT /orthanc/upload/sessions/{session_id}/
+
+        - 본문: 청크 바이트 (Content-Type: application/octet-stream)
+        - 청크 시작 위치: Upload-Offset 헤더 또는 ?offset=
+        - 오프셋이 다르면 409 + 현재 오프셋 반환
+        """
+        try:
+            offset = int(request.headers.get('Upload-Offset') or request.query_params.get('offset'))
+        except (TypeError, ValueError):
+            return Response({
+                'error': 'Upload-Offset 헤더 또는 offset 파라미터가 필요합니다.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        content_length = request.headers.get('Content-Length')
+        try:
+            # request.data를 거치지 않고 본문을 청크 단위로 바로 디스크에 기록
+            new_offset = write_chunk(
+                session_id,
+                offset,
+                request.stream or io.BytesIO(),
+                int(content_length) if content_length else None,
             )
+        except UploadSessionNotFound:
+            return _session_not_found(session_id)
+        except OffsetMismatch as e:
+            response = Response({
+                'error': 'Upload offset mismatch',
+                'offset': e.offset
+            }, status=status.HTTP_409_CONFLICT)
+            response['Upload-Offset'] = str(e.offset)
+            return response
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        session = get_session(session_id)
+        response = Response(session, status=status.HTTP_200_OK)
+        response['Upload-Offset'] = str(new_offset)
+        return response
+
+    def delete(self, request, session_id):
+        """
+        업로드 취소 (받은 데이터 삭제)
+        DELETE /orthanc/upload/sessions/{session_id}/
+        """
+        try:
+            delete_session(session_id)
+        except UploadSessionNotFound:
+            return _session_not_found(session_id)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UploadSessionFinalizeView(APIView):
+    """분할 업로드 완료 API (ZIP 업로드 경로로 처리)"""
+    permission_classes = [AllowAny]
+
+    def post(self, request, session_id):
+        """
+        업로드 완료 후 Orthanc 업로드
+        POST /orthanc/upload/sessions/{session_id}/finalize/
+
+        - 응답은 POST /orthanc/upload/ 의 ZIP 업로드와 같음
+        - async=1: 백그라운드 처리, 202 + task_id 반환
+          (진행 상태: GET /orthanc/upload/jobs/{task_id}/)
+        - 모두 업로드되면 세션 삭제, Orthanc 장애 / 일부 실패 시 세션이 남아 같은 요청으로 재시도
+          (데이터를 다시 보낼 필요 없음, 이미 저장된 Instance는 건너뜀)
+        """
+        try:
+            workers = request.query_params.get('workers') or request.data.get('workers')
+            workers = min(int(workers), 32) if workers else None
+        except (TypeError, ValueError):
+            return Response({'error': 'workers는 정수여야 합니다.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            archive_path, file_name = finalize_session(session_id)
+        except UploadSessionNotFound:
+            return _session_not_found(session_id)
+        except IncompleteUpload as e:
+            return Response({
+                'error': 'Upload is not complete',
+                'details': str(e)
+            }, status=status.HTTP_409_CONFLICT)
+        except SessionBusy:
+            return Response({
+                'error': f'Upload session {session_id} is already being ingested'
+            }, status=status.HTTP_409_CONFLICT)
+
+        try:
+            if str(request.query_params.get('async') or request.data.get('async', '')).lower() in ('1', 'true'):
+                try:
+                    task = ingest_dicom_archive.delay(archive_path, file_name, workers, session_id=session_id)
+                except Exception:
+                    release_session(session_id)
+                    raise
 
-            # Orthanc 응답 확인
-            if orthanc_response.status_code == 200:
-                payload = orthanc_response.json()
-                parent_series_id = payload.get('ParentSeries')
-                created_series = set()
-                _ensure_series_and_run(tags, parent_series_id, created_series)
-                return Response(payload, status=status.HTTP_200_OK)
-            else:
                 return Response({
-                    'error': 'Orthanc upload failed',
-                    'details': orthanc_response.text
-                }, status=orthanc_response.status_code)
+                    'task_id': task.id,
+                    'status': 'pending',
+                    'message': 'DICOM ingest task started',
+                    'file': file_name
+                }, status=status.HTTP_202_ACCEPTED)
+
+            try:
+                response_payload = ingest_zip_archive(archive_path, workers=workers)
+            except zipfile.BadZipFile:
+                # 다시 시도해도 같은 결과이므로 세션 삭제
+                delete_session(session_id)
+                return Response({
+                    'error': 'Invalid ZIP archive'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            except Exception:
+                # Orthanc 장애 등: 세션을 남겨 다시 완료 요청 가능
+                release_session(session_id)
+                raise
+            finish_ingest(session_id, response_payload)
+            if response_payload is None:
+                return Response({
+                    'error': 'No DICOM files found in ZIP archive'
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            return Response(
+                response_payload,
+                status=status.HTTP_200_OK if not response_payload['Errors'] else status.HTTP_207_MULTI_STATUS
+            )
 
         except requests.exceptions.RequestException as e:
             return Response({
@@ -251,6 +367,51 @@ class UploadDicomView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class DicomIngestTaskStatusView(APIView):
+    """백그라운드 작업(DICOM 업로드 / NIfTI 변환) 상태 조회 API"""
+    permission_classes = [AllowAny]
+
+    def get(self, request, task_id):
+        """
+        Task ID로 작업 상태 조회
+
+        Response:
+        {
+            "task_id": "task-id",
+            "status": "PENDING|PROGRESS|SUCCESS|FAILURE",
+            "progress": {"step", "processed", "total", "progress"} or "result": {...}
+        }
+        """
+        try:
+            from celery.result import AsyncResult
+
+            task_result = AsyncResult(task_id)
+
+            response_data = {
+                'task_id': task_id,
+                'status': task_result.state,
+            }
+
+            if task_result.state == 'PENDING':
+                response_data['message'] = 'Task is waiting to be processed'
+            elif task_result.state == 'PROGRESS':
+                response_data['progress'] = task_result.info
+            elif task_result.state == 'SUCCESS':
+                response_data['result'] = task_result.result
+            elif task_result.state == 'FAILURE':
+                response_data['error'] = str(task_result.info)
+            else:
+                response_data['message'] = f'Task state: {task_result.state}'
+
+            return Response(response_data, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            return Response({
+                'error': 'Failed to fetch task status',
+                'details': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 class OrthancSystemInfoView(APIView):
     """Orthanc 시스템 정보 조회 API"""
     permission_classes = [AllowAny]
@@ -261,10 +422,7 @@ class OrthancSystemInfoView(APIView):
         GET /system
         """
         try:
-            response = requests.get(
-                f'{ORTHANC_BASE_URL}/system',
-                timeout=10
-            )
+            response = orthanc_client.get('system', 'system')
 
             if response.status_code == 200:
                 return Response(
@@ -283,6 +441,21 @@ class OrthancSystemInfoView(APIView):
             }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
 
 
+class OrthancClientMetricsView(APIView):
+    """Orthanc 클라이언트 메트릭 조회 API (현재 워커 프로세스 기준)"""
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        """
+        작업별 호출 수 / 오류 수 / 재시도 수 / 지연 시간(p50, p95, max) + 서킷 브레이커 상태
+        + Instance 파일 디스크 캐시 적중률
+        GET /orthanc/client-metrics/
+        """
+        data = orthanc_client.stats()
+        data['instance_cache'] = instance_cache_stats()
+        return Response(data, status=status.HTTP_200_OK)
+
+
 class OrthancStudyView(APIView):
     """Orthanc Study 정보 조회 API"""
     permission_classes = [AllowAny]
@@ -293,20 +466,13 @@ class OrthancStudyView(APIView):
         GET /studies/{study_id}
         """
         try:
-            response = requests.get(
-                f'{ORTHANC_BASE_URL}/studies/{study_id}',
-                timeout=10
-            )
+            data, etag = get_metadata(f'studies/{study_id}')
+            return cached_response(request, data, etag, max_age=MEMBERSHIP_MAX_AGE)
 
-            if response.status_code == 200:
-                return Response(
-                    response.json(),
-                    status=status.HTTP_200_OK
-                )
-            else:
-                return Response({
-                    'error': f'Study {study_id} not found'
-                }, status=response.status_code)
+        except requests.HTTPError as e:
+            return Response({
+                'error': f'Study {study_id} not found'
+            }, status=e.response.status_code)
 
         except requests.exceptions.RequestException as e:
             return Response({
@@ -325,20 +491,13 @@ class OrthancInstanceView(APIView):
         GET /instances/{instance_id}
         """
         try:
-            response = requests.get(
-                f'{ORTHANC_BASE_URL}/instances/{instance_id}',
-                timeout=10
-            )
+            data, etag = get_metadata(f'instances/{instance_id}')
+            return cached_response(request, data, etag, max_age=INSTANCE_MAX_AGE)
 
-            if response.status_code == 200:
-                return Response(
-                    response.json(),
-                    status=status.HTTP_200_OK
-                )
-            else:
-                return Response({
-                    'error': f'Instance {instance_id} not found'
-                }, status=response.status_code)
+        except requests.HTTPError as e:
+            return Response({
+                'error': f'Instance {instance_id} not found'
+            }, status=e.response.status_code)
 
         except requests.exceptions.RequestException as e:
             return Response({
@@ -353,40 +512,31 @@ class OrthancSeriesListView(APIView):
 
     def get(self, request):
         """
-        모든 Series 목록 조회
-        GET /series
+        Series 목록 조회 (상세 정보 포함, 1회 호출)
+        GET /series?expand&since=&limit=
+
+        Query params:
+        - since: 건너뛸 개수 (기본값: 0)
+        - limit: 페이지 크기 (기본값: 50, 최대 500)
         """
         try:
-            response = requests.get(
-                f'{ORTHANC_BASE_URL}/series',
-                timeout=10
-            )
-
-            if response.status_code == 200:
-                series_ids = response.json()
+            since, limit = _paging_params(request, default_limit=50)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-                # 각 series의 상세 정보 가져오기
-                series_list = []
-                for series_id in series_ids[:50]:  # 최대 50개만 가져오기
-                    try:
-                        series_response = requests.get(
-                            f'{ORTHANC_BASE_URL}/series/{series_id}',
-                            timeout=5
-                        )
-                        if series_response.status_code == 200:
-                            series_data = series_response.json()
-                            series_list.append({
-                                'id': series_id,
-                                'data': series_data
-                            })
-                    except:
-                        continue
-
-                return Response(series_list, status=status.HTTP_200_OK)
-            else:
-                return Response({
-                    'error': 'Failed to fetch series list'
-                }, status=response.status_code)
+        try:
+            # 다음 페이지 존재 여부 확인을 위해 1개 더 조회
+            series_data_list = list_resources('series', since=since, limit=limit + 1)
+            series_list = [
+                {'id': series_data['ID'], 'data': series_data}
+                for series_data in series_data_list
+            ]
+            return _paged_response(series_list, since, limit)
+
+        except requests.HTTPError as e:
+            return Response({
+                'error': 'Failed to fetch series list'
+            }, status=e.response.status_code)
 
         except requests.exceptions.RequestException as e:
             return Response({
@@ -405,20 +555,13 @@ class OrthancSeriesView(APIView):
         GET /series/{series_id}
         """
         try:
-            response = requests.get(
-                f'{ORTHANC_BASE_URL}/series/{series_id}',
-                timeout=10
-            )
+            data, etag = get_metadata(f'series/{series_id}')
+            return cached_response(request, data, etag, max_age=MEMBERSHIP_MAX_AGE)
 
-            if response.status_code == 200:
-                return Response(
-                    response.json(),
-                    status=status.HTTP_200_OK
-                )
-            else:
-                return Response({
-                    'error': f'Series {series_id} not found'
-                }, status=response.status_code)
+        except requests.HTTPError as e:
+            return Response({
+                'error': f'Series {series_id} not found'
+            }, status=e.response.status_code)
 
         except requests.exceptions.RequestException as e:
             return Response({
@@ -437,20 +580,13 @@ class OrthancSeriesInstancesView(APIView):
         GET /series/{series_id}/instances
         """
         try:
-            response = requests.get(
-                f'{ORTHANC_BASE_URL}/series/{series_id}/instances',
-                timeout=10
-            )
+            data, etag = get_metadata(f'series/{series_id}/instances')
+            return cached_response(request, data, etag, max_age=MEMBERSHIP_MAX_AGE)
 
-            if response.status_code == 200:
-                return Response(
-                    response.json(),
-                    status=status.HTTP_200_OK
-                )
-            else:
-                return Response({
-                    'error': f'Instances for series {series_id} not found'
-                }, status=response.status_code)
+        except requests.HTTPError as e:
+            return Response({
+                'error': f'Instances for series {series_id} not found'
+            }, status=e.response.status_code)
 
         except requests.exceptions.RequestException as e:
             return Response({
@@ -465,28 +601,31 @@ class OrthancInstanceFileView(APIView):
 
     def get(self, request, instance_id):
         """
-        특정 Instance의 DICOM 파일 다운로드
+        특정 Instance의 DICOM 파일 다운로드 (스트리밍, Range 지원)
         GET /instances/{instance_id}/file
         """
         try:
-            response = requests.get(
-                f'{ORTHANC_BASE_URL}/instances/{instance_id}/file',
-                timeout=30
-            )
-
-            if response.status_code == 200:
-                from django.http import HttpResponse
-                return HttpResponse(
-                    response.content,
+            # 로컬 디스크 캐시 우선 (캐시할 수 없는 ID는 Orthanc 스트리밍 프록시)
+            if is_cacheable(instance_id):
+                return local_file_response(
+                    request,
+                    open_instance_file(instance_id),
                     content_type='application/dicom',
-                    headers={
-                        'Content-Disposition': f'attachment; filename="{instance_id}.dcm"'
-                    }
+                    filename=f'{instance_id}.dcm',
                 )
-            else:
-                return Response({
-                    'error': f'File for instance {instance_id} not found'
-                }, status=response.status_code)
+
+            return stream_orthanc_file(
+                request,
+                f'instances/{instance_id}/file',
+                'file',
+                content_type='application/dicom',
+                filename=f'{instance_id}.dcm',
+            )
+
+        except requests.HTTPError as e:
+            return Response({
+                'error': f'File for instance {instance_id} not found'
+            }, status=e.response.status_code)
 
         except requests.exceptions.RequestException as e:
             return Response({
@@ -501,29 +640,22 @@ class OrthancSeriesArchiveView(APIView):
 
     def get(self, request, series_id):
         """
-        특정 Series의 모든 DICOM 파일을 ZIP으로 다운로드
+        특정 Series의 모든 DICOM 파일을 ZIP으로 다운로드 (스트리밍, Range 지원)
         GET /series/{series_id}/archive
         """
         try:
-            response = requests.get(
-                f'{ORTHANC_BASE_URL}/series/{series_id}/archive',
-                timeout=60,
-                stream=True
+            return stream_orthanc_file(
+                request,
+                f'series/{series_id}/archive',
+                'archive',
+                content_type='application/zip',
+                filename=f'series_{series_id}.zip',
             )
 
-            if response.status_code == 200:
-                from django.http import HttpResponse
-                return HttpResponse(
-                    response.content,
-                    content_type='application/zip',
-                    headers={
-                        'Content-Disposition': f'attachment; filename="series_{series_id}.zip"'
-                    }
-                )
-            else:
-                return Response({
-                    'error': f'Archive for series {series_id} not found'
-                }, status=response.status_code)
+        except requests.HTTPError as e:
+            return Response({
+                'error': f'Archive for series {series_id} not found'
+            }, status=e.response.status_code)
 
         except requests.exceptions.RequestException as e:
             return Response({
@@ -538,69 +670,46 @@ class OrthancPatientStudiesView(APIView):
 
     def get(self, request, patient_id):
         """
-        특정 환자의 모든 Studies 조회
+        특정 환자의 Studies 조회 (tools/find + Expand, 1회 호출)
         GET /orthanc/patients/{patient_id}/studies/
+
+        Query params:
+        - since: 건너뛸 개수 (기본값: 0)
+        - limit: 페이지 크기 (기본값: 100, 최대 500)
         """
         try:
-            # PatientID로 환자 검색
-            search_response = requests.post(
-                f'{ORTHANC_BASE_URL}/tools/find',
-                json={
-                    "Level": "Patient",
-                    "Query": {
-                        "PatientID": patient_id
-                    }
-                },
-                timeout=10
-            )
+            since, limit = _paging_params(request, default_limit=100)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-            if search_response.status_code != 200:
+        try:
+            try:
+                study_data_list = find_resources(
+                    'Study', {'PatientID': patient_id}, since=since, limit=limit + 1
+                )
+            except requests.HTTPError as e:
                 return Response({
                     'error': 'Failed to search for patient'
-                }, status=search_response.status_code)
+                }, status=e.response.status_code)
 
-            patient_uuids = search_response.json()
-            if not patient_uuids:
+            # Orthanc에는 Study가 없는 환자가 존재하지 않으므로 첫 페이지가 비어 있으면 미등록 환자
+            if not study_data_list and since == 0:
                 return Response({
                     'error': f'Patient {patient_id} not found'
                 }, status=status.HTTP_404_NOT_FOUND)
 
-            # 첫 번째 매칭되는 환자의 정보 가져오기
-            patient_uuid = patient_uuids[0]
-            patient_response = requests.get(
-                f'{ORTHANC_BASE_URL}/patients/{patient_uuid}',
-                timeout=10
-            )
-
-            if patient_response.status_code != 200:
-                return Response({
-                    'error': f'Patient {patient_id} not found'
-                }, status=patient_response.status_code)
-
-            patient_data = patient_response.json()
-            study_ids = patient_data.get('Studies', [])
-
-            # 각 Study의 상세 정보 가져오기
             studies = []
-            for study_id in study_ids:
-                try:
-                    study_response = requests.get(
-                        f'{ORTHANC_BASE_URL}/studies/{study_id}',
-                        timeout=5
-                    )
-                    if study_response.status_code == 200:
-                        study_data = study_response.json()
-                        studies.append({
-                            'ID': study_id,
-                            'PatientID': study_data.get('PatientMainDicomTags', {}).get('PatientID', ''),
-                            'StudyDate': study_data.get('MainDicomTags', {}).get('StudyDate', ''),
-                            'StudyDescription': study_data.get('MainDicomTags', {}).get('StudyDescription', ''),
-                            'StudyInstanceUID': study_data.get('MainDicomTags', {}).get('StudyInstanceUID', ''),
-                        })
-                except:
-                    continue
-
-            return Response(studies, status=status.HTTP_200_OK)
+            for study_data in study_data_list:
+                main_tags = study_data.get('MainDicomTags', {})
+                studies.append({
+                    'ID': study_data['ID'],
+                    'PatientID': study_data.get('PatientMainDicomTags', {}).get('PatientID', ''),
+                    'StudyDate': main_tags.get('StudyDate', ''),
+                    'StudyDescription': main_tags.get('StudyDescription', ''),
+                    'StudyInstanceUID': main_tags.get('StudyInstanceUID', ''),
+                })
+
+            return _paged_response(studies, since, limit)
 
         except requests.exceptions.RequestException as e:
             return Response({
@@ -615,69 +724,174 @@ class OrthancStudySeriesView(APIView):
 
     def get(self, request, study_id):
         """
-        특정 Study의 모든 Series 조회
+        특정 Study의 Series 조회 (GET /studies/{id}/series?expand, 1회 호출)
         GET /orthanc/studies/{study_id}/series/
+
+        SEG 시리즈의 참조 시리즈는 DB(DICOMSeries.referenced_series_uid)에서 읽고,
+        DB에 없는 SEG만 첫 번째 인스턴스 태그를 병렬로 조회한 뒤 DB에 채워 둡니다.
+
+        Query params:
+        - since: 건너뛸 개수 (기본값: 0)
+        - limit: 페이지 크기 (기본값: 500, 최대 500)
         """
         try:
-            # 먼저 Study 정보 조회
-            study_response = requests.get(
-                f'{ORTHANC_BASE_URL}/studies/{study_id}',
-                timeout=10
-            )
+            since, limit = _paging_params(request, default_limit=500)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-            if study_response.status_code != 200:
+        try:
+            try:
+                series_data_list = get_child_resources('studies', study_id, 'series')
+            except requests.HTTPError as e:
                 return Response({
                     'error': f'Study {study_id} not found'
-                }, status=study_response.status_code)
+                }, status=e.response.status_code)
 
-            study_data = study_response.json()
-            series_ids = study_data.get('Series', [])
+            # Orthanc는 하위 목록 since/limit를 지원하지 않으므로 받은 목록에서 자름
+            series_data_list = series_data_list[since:since + limit + 1]
 
-            # 각 Series의 상세 정보 가져오기
             series_list = []
-            for series_id in series_ids:
-                try:
-                    series_response = requests.get(
-                        f'{ORTHANC_BASE_URL}/series/{series_id}',
-                        timeout=5
-                    )
-                    if series_response.status_code == 200:
-                        series_data = series_response.json()
-                        modality = series_data.get('MainDicomTags', {}).get('Modality', '')
-
-                        series_info = {
-                            'ID': series_id,
-                            'SeriesNumber': series_data.get('MainDicomTags', {}).get('SeriesNumber', ''),
-                            'Modality': modality,
-                            'SeriesDescription': series_data.get('MainDicomTags', {}).get('SeriesDescription', ''),
-                            'SeriesInstanceUID': series_data.get('MainDicomTags', {}).get('SeriesInstanceUID', ''),
-                        }
-
-                        # SEG인 경우 참조하는 시리즈 정보 추출
-                        if modality == 'SEG':
-                            try:
-                                # 첫 번째 인스턴스의 태그 가져오기
-                                instances = series_data.get('Instances', [])
-                                if instances:
-                                    instance_id = instances[0]
-                                    tags_response = requests.get(
-                                        f'{ORTHANC_BASE_URL}/instances/{instance_id}/tags?simplify',
-                                        timeout=5
-                                    )
-                                    if tags_response.status_code == 200:
-                                        tags = tags_response.json()
-                                        # ReferencedSeriesSequence에서 참조하는 시리즈 찾기
-                                        ref_series_seq = tags.get('ReferencedSeriesSequence', [])
-                                        if ref_series_seq and len(ref_series_seq) > 0:
-                                            series_info['ReferencedSeriesInstanceUID'] = ref_series_seq[0].get('SeriesInstanceUID', '')
-                            except:
-                                pass
-
-                        series_list.append(series_info)
-                except:
-                    continue
-
-            return Response(series_list, status=status.HTTP_200_OK)
+            seg_series = []
+            for series_data in series_data_list:
+                main_tags = series_data.get('MainDicomTags', {})
+                modality = main_tags.get('Modality', '')
+
+                series_info = {
+                    'ID': series_data['ID'],
+                    'SeriesNumber': main_tags.get('SeriesNumber', ''),
+                    'Modality': modality,
+                    'SeriesDescription': main_tags.get('SeriesDescription', ''),
+                    'SeriesInstanceUID': main_tags.get('SeriesInstanceUID', ''),
+                }
+                series_list.append(series_info)
+
+                # SEG인 경우 첫 번째 인스턴스 태그에서 참조 시리즈 추출 (다음 페이지 확인용 항목 제외)
+                instances = series_data.get('Instances', [])
+                if modality == 'SEG' and instances and len(series_list) <= limit:
+                    seg_series.append((series_info, instances[0]))
+
+            known_references = dict(
+                DICOMSeries.objects.filter(
+                    series_uid__in=[series_info['SeriesInstanceUID'] for series_info, _ in seg_series],
+                    referenced_series_uid__isnull=False,
+                ).values_list('series_uid', 'referenced_series_uid')
+            )
+            missing = []
+            for series_info, instance_id in seg_series:
+                referenced_uid = known_references.get(series_info['SeriesInstanceUID'])
+                if referenced_uid:
+                    series_info['ReferencedSeriesInstanceUID'] = referenced_uid
+                else:
+                    missing.append((series_info, instance_id))
+
+            seg_tags = fetch_concurrently(
+                lambda instance_id: orthanc_get(
+                    f'instances/{instance_id}/tags', params={'simplify': ''}, operation='tags'
+                ),
+                [instance_id for _, instance_id in missing],
+            )
+            for (series_info, _), tags in zip(missing, seg_tags):
+                # ReferencedSeriesSequence에서 참조하는 시리즈 찾기
+                ref_series_seq = (tags or {}).get('ReferencedSeriesSequence', [])
+                if ref_series_seq:
+                    referenced_uid = ref_series_seq[0].get('SeriesInstanceUID', '')
+                    series_info['ReferencedSeriesInstanceUID'] = referenced_uid
+                    if referenced_uid and series_info['SeriesInstanceUID']:
+                        # 다음 요청부터 DB에서 응답 (DB에 등록된 시리즈만 갱신)
+                        DICOMSeries.objects.filter(series_uid=series_info['SeriesInstanceUID']).update(
+                            referenced_series_uid=referenced_uid
+                        )
+
+            return _paged_response(series_list, since, limit)
+
+        except requests.exceptions.RequestException as e:
+            return Response({
+                'error': 'Failed to connect to Orthanc server',
+                'details': str(e)
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
+class OrthancSeriesSlicesView(APIView):
+    """Series 슬라이스 순서 목록 API (DICOMInstance 인덱스)"""
+    permission_classes = [AllowAny]
+
+    def get(self, request, series_id):
+        """
+        Series의 Instance를 슬라이스 순서대로 조회
+        GET /orthanc/series/{series_id}/slices/
+
+        - 정렬: ImagePositionPatient z 오름차순, 같거나 없으면 InstanceNumber 순
+        - DB 인덱스에 없으면 Orthanc Instance 목록(expand 1회)으로 응답하고 인덱스를 채워 둠
+
+        Response:
+        {
+            "series_id": "...",
+            "count": 120,
+            "source": "db" | "orthanc",
+            "slices": [{"ID", "SOPInstanceUID", "InstanceNumber", "ImagePositionZ"}, ...]
+        }
+        """
+        slices = [
+            {
+                'ID': orthanc_instance_id,
+                'SOPInstanceUID': sop_instance_uid,
+                'InstanceNumber': instance_number,
+                'ImagePositionZ': image_position_z,
+            }
+            for sop_instance_uid, orthanc_instance_id, instance_number, image_position_z in (
+                DICOMInstance.objects
+                .filter(series__orthanc_series_id=series_id)
+                .order_by(F('image_position_z').asc(nulls_last=True), F('instance_number').asc(nulls_last=True))
+                .values_list('sop_instance_uid', 'orthanc_instance_id', 'instance_number', 'image_position_z')
+            )
+        ]
+        if slices:
+            return Response({
+                'series_id': series_id,
+                'count': len(slices),
+                'source': 'db',
+                'slices': slices
+            }, status=status.HTTP_200_OK)
+
+        try:
+            try:
+                instances = get_child_resources('series', series_id, 'instances')
+            except requests.HTTPError as e:
+                return Response({
+                    'error': f'Series {series_id} not found'
+                }, status=e.response.status_code)
+
+            records = [
+                record for record in (
+                    instance_record(instance.get('MainDicomTags', {}), instance['ID']) for instance in instances
+                ) if record
+            ]
+            records.sort(key=lambda record: (
+                record['image_position_z'] is None, record['image_position_z'] or 0,
+                record['instance_number'] is None, record['instance_number'] or 0,
+            ))
+
+            # DB에 등록된 시리즈면 다음 요청부터 DB에서 응답
+            series_uid = (
+                DICOMSeries.objects.filter(orthanc_series_id=series_id).values_list('series_uid', flat=True).first()
+            )
+            if series_uid and records:
+                upsert_instance_records([(series_uid, record) for record in records])
+
+            return Response({
+                'series_id': series_id,
+                'count': len(records),
+                'source': 'orthanc',
+                'slices': [
+                    {
+                        'ID': record['orthanc_instance_id'],
+                        'SOPInstanceUID': record['sop_instance_uid'],
+                        'InstanceNumber': record['instance_number'],
+                        'ImagePositionZ': record['image_position_z'],
+                    }
+                    for record in records
+                ]
+            }, status=status.HTTP_200_OK)
 
         except requests.exceptions.RequestException as e:
             return Response({
@@ -694,137 +908,180 @@ class OrthancSeriesNiftiView(APIView):
         """
         SEG Series를 NIfTI로 변환하여 다운로드
         GET /orthanc/series/{series_id}/nifti/
+
+        - 변환 결과는 SeriesInstanceUID 기준으로 캐시되어 이후 요청은 바로 응답
+        - async=1: 백그라운드 변환, 202 + task_id 반환
+          (진행 상태: GET /orthanc/jobs/{task_id}/, 완료 후 같은 URL로 다시 요청)
         """
         try:
-            # Step 1: Series의 모든 instances 가져오기
-            instances_response = requests.get(
-                f'{ORTHANC_BASE_URL}/series/{series_id}/instances',
-                timeout=10
+            if str(request.query_params.get('async', '')).lower() in ('1', 'true'):
+                task = convert_series_nifti.delay(series_id)
+                return Response({
+                    'task_id': task.id,
+                    'status': 'pending',
+                    'message': 'NIfTI conversion task started',
+                    'series_id': series_id
+                }, status=status.HTTP_202_ACCEPTED)
+
+            nifti_path = build_seg_nifti(series_id)
+            return local_file_response(
+                request,
+                nifti_path,
+                content_type='application/gzip',
+                filename=f'{series_id}.nii.gz',
             )
 
-            if instances_response.status_code != 200:
-                return Response({
-                    'error': f'Failed to fetch instances for series {series_id}'
-                }, status=instances_response.status_code)
+        except EmptySeries as e:
+            return Response({
+                'error': str(e)
+            }, status=status.HTTP_404_NOT_FOUND)
+        except requests.HTTPError as e:
+            return Response({
+                'error': f'Failed to fetch instances for series {series_id}'
+            }, status=e.response.status_code)
+        except requests.exceptions.RequestException as e:
+            return Response({
+                'error': 'Failed to connect to Orthanc server',
+                'details': str(e)
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        except Exception as e:
+            return Response({
+                'error': 'Failed to convert to NIfTI',
+                'details': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-            instances = instances_response.json()
 
-            if not instances:
-                return Response({
-                    'error': 'No instances found in series'
-                }, status=status.HTTP_404_NOT_FOUND)
+class OrthancSeriesThumbnailView(APIView):
+    """Series 미리보기 썸네일 API (PNG)"""
+    permission_classes = [AllowAny]
 
-            # Step 2: 각 instance 다운로드 및 정렬
-            dicom_slices = []
-            for instance_data in instances:
-                instance_id = instance_data.get('ID')
+    # 썸네일은 같은 인스턴스 구성에서 변하지 않으므로 브라우저에 오래 캐시 (ETag로 재검증)
+    THUMBNAIL_MAX_AGE = 7 * 24 * 60 * 60
 
-                # DICOM 파일 다운로드
-                file_response = requests.get(
-                    f'{ORTHANC_BASE_URL}/instances/{instance_id}/file',
-                    timeout=30
-                )
+    def get(self, request, series_id):
+        """
+        Series 썸네일 조회
+        GET /orthanc/series/{series_id}/thumbnail/?kind=middle|mip
+
+        - middle: 가운데 슬라이스 (기본값), mip: 관상면 최대값 투영
+        - 아직 생성되지 않았으면 생성 작업을 등록하고 202 반환 (Retry-After 후 다시 요청)
+          (아직 인스턴스를 받는 중이거나 이미 등록된 작업이 있으면 등록하지 않음, task_id는 null)
+        """
+        kind = request.query_params.get('kind', 'middle')
+        if kind not in THUMBNAIL_KINDS:
+            return Response({
+                'error': f"kind는 {', '.join(THUMBNAIL_KINDS)} 중 하나여야 합니다."
+            }, status=status.HTTP_400_BAD_REQUEST)
 
-                if file_response.status_code == 200:
-                    # pydicom으로 파일 읽기
-                    dcm = pydicom.dcmread(pydicom.filebase.DicomBytesIO(file_response.content))
-                    dicom_slices.append(dcm)
+        try:
+            # 인스턴스 수(캐시 파일명)는 생성 작업과 같은 실시간 조회 기준 (메타데이터 캐시는 최대 TTL만큼 늦음)
+            try:
+                series = orthanc_get(f'series/{series_id}')
+            except requests.HTTPError as e:
+                return Response({
+                    'error': f'Series {series_id} not found'
+                }, status=e.response.status_code)
 
-            if not dicom_slices:
+            if not has_thumbnail_image(series):
                 return Response({
-                    'error': 'Failed to load DICOM instances'
-                }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+                    'error': f'Series {series_id} has no image to preview'
+                }, status=status.HTTP_404_NOT_FOUND)
 
-            # Step 3: InstanceNumber로 정렬
-            dicom_slices.sort(key=lambda x: int(x.InstanceNumber) if hasattr(x, 'InstanceNumber') else 0)
+            thumbnail_path = thumbnail_paths(series)[kind]
+            if not os.path.exists(thumbnail_path):
+                task_id = None
+                if claim_thumbnail_job(series):
+                    try:
+                        task_id = generate_series_thumbnails.delay([series_id]).id
+                    except Exception:
+                        release_thumbnail_job(series)
+                        raise
+                response = Response({
+                    'task_id': task_id,
+                    'status': 'pending',
+                    'message': (
+                        'Thumbnail generation task started' if task_id
+                        else 'Thumbnail generation in progress' if is_stable(series)
+                        else 'Series is still receiving instances'
+                    ),
+                    'series_id': series_id
+                }, status=status.HTTP_202_ACCEPTED)
+                response['Retry-After'] = '5'
+                return response
+
+            # 파일명에 SeriesInstanceUID 해시 + 인스턴스 수가 들어 있으므로 그대로 ETag로 사용
+            etag = f'"{os.path.basename(thumbnail_path)[:-len(".png")]}"'
+            if etag in [value.strip() for value in request.headers.get('If-None-Match', '').split(',')]:
+                response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+            else:
+                response = FileResponse(open(thumbnail_path, 'rb'), content_type='image/png')
+            response['ETag'] = etag
+            response['Cache-Control'] = f'private, max-age={self.THUMBNAIL_MAX_AGE}'
+            return response
 
-            # Step 4: 3D 볼륨 구성
-            # 첫 번째 슬라이스에서 메타데이터 추출
-            first_slice = dicom_slices[0]
+        except requests.exceptions.RequestException as e:
+            return Response({
+                'error': 'Failed to connect to Orthanc server',
+                'details': str(e)
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
 
-            # 픽셀 데이터 추출
-            pixel_arrays = []
-            for dcm in dicom_slices:
-                pixel_array = dcm.pixel_array
-                pixel_arrays.append(pixel_array)
 
-            # 3D 볼륨 생성 (depth, height, width)
-            volume_3d = np.stack(pixel_arrays, axis=0)
+class OrthancSeriesVolumeView(APIView):
+    """CT Series 볼륨 내보내기 API (SimpleITK)"""
+    permission_classes = [AllowAny]
 
-            # Step 5: Spacing 정보 추출
-            try:
-                # Pixel Spacing (row, column)
-                if hasattr(first_slice, 'PixelSpacing'):
-                    pixel_spacing = first_slice.PixelSpacing
-                    spacing_x = float(pixel_spacing[1])  # Column spacing
-                    spacing_y = float(pixel_spacing[0])  # Row spacing
-                else:
-                    spacing_x = 1.0
-                    spacing_y = 1.0
+    def get(self, request, series_id):
+        """
+        CT Series 전체를 볼륨 파일로 다운로드
+        GET /orthanc/series/{series_id}/volume/
+
+        Query params:
+        - spacing: 등방성 리샘플링 간격(mm, 0.25~10), 생략 시 원본 격자
+        - dtype: int16 (기본값, .nii.gz) / float32 (.nii.gz) / float16 (.npz - volume, affine)
+        - async=1: 백그라운드 변환, 202 + task_id 반환
+          (진행 상태: GET /orthanc/jobs/{task_id}/, 완료 후 같은 URL로 다시 요청)
+        """
+        try:
+            spacing = normalize_spacing(request.query_params.get('spacing') or None)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        dtype = request.query_params.get('dtype', 'int16')
+        if dtype not in VOLUME_OUTPUT_FORMATS:
+            return Response({
+                'error': f"dtype은 {', '.join(VOLUME_OUTPUT_FORMATS)} 중 하나여야 합니다."
+            }, status=status.HTTP_400_BAD_REQUEST)
 
-                # Slice Thickness
-                if hasattr(first_slice, 'SliceThickness'):
-                    spacing_z = float(first_slice.SliceThickness)
-                else:
-                    # 두 개 이상의 슬라이스가 있으면 ImagePositionPatient로 계산
-                    if len(dicom_slices) > 1 and hasattr(first_slice, 'ImagePositionPatient'):
-                        second_slice = dicom_slices[1]
-                        if hasattr(second_slice, 'ImagePositionPatient'):
-                            pos1 = np.array(first_slice.ImagePositionPatient)
-                            pos2 = np.array(second_slice.ImagePositionPatient)
-                            spacing_z = float(np.linalg.norm(pos2 - pos1))
-                        else:
-                            spacing_z = 1.0
-                    else:
-                        spacing_z = 1.0
-
-            except Exception as e:
-                print(f"Warning: Could not extract spacing info: {e}")
-                spacing_x = 1.0
-                spacing_y = 1.0
-                spacing_z = 1.0
-
-            # Step 6: NIfTI 이미지 생성
-            # nibabel은 (x, y, z) 순서를 사용하므로 transpose 필요
-            # DICOM은 (z, y, x) 순서
-            volume_nifti = np.transpose(volume_3d, (2, 1, 0))
-
-            # Affine 매트릭스 생성 (spacing 정보 포함)
-            affine = np.eye(4)
-            affine[0, 0] = spacing_x
-            affine[1, 1] = spacing_y
-            affine[2, 2] = spacing_z
-
-            # NIfTI 이미지 생성
-            nifti_img = nib.Nifti1Image(volume_nifti, affine)
-
-            # Step 7: 임시 파일에 저장
-            temp_dir = tempfile.mkdtemp()
-            nifti_path = os.path.join(temp_dir, f'{series_id}.nii.gz')
-            nib.save(nifti_img, nifti_path)
-
-            # Step 8: 파일 응답 반환
-            response = FileResponse(
-                open(nifti_path, 'rb'),
-                content_type='application/gzip',
-                as_attachment=True,
-                filename=f'{series_id}.nii.gz'
+        try:
+            if str(request.query_params.get('async', '')).lower() in ('1', 'true'):
+                task = export_ct_volume.delay(series_id, spacing, dtype)
+                return Response({
+                    'task_id': task.id,
+                    'status': 'pending',
+                    'message': 'Volume export task started',
+                    'series_id': series_id
+                }, status=status.HTTP_202_ACCEPTED)
+
+            volume_path = build_ct_volume(series_id, spacing=spacing, dtype=dtype)
+            extension = VOLUME_OUTPUT_FORMATS[dtype]
+            return local_file_response(
+                request,
+                volume_path,
+                content_type='application/gzip' if extension == '.nii.gz' else 'application/octet-stream',
+                filename=f'{series_id}{extension}',
             )
 
-            # 응답 후 임시 파일 정리를 위한 콜백 설정
-            def cleanup():
-                try:
-                    if os.path.exists(nifti_path):
-                        os.remove(nifti_path)
-                    if os.path.exists(temp_dir):
-                        os.rmdir(temp_dir)
-                except:
-                    pass
-
-            response.close = cleanup
-
-            return response
-
+        except EmptySeries as e:
+            return Response({
+                'error': str(e)
+            }, status=status.HTTP_404_NOT_FOUND)
+        except VolumeTooLarge as e:
+            return Response({
+                'error': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+        except requests.HTTPError as e:
+            return Response({
+                'error': f'Failed to fetch instances for series {series_id}'
+            }, status=e.response.status_code)
         except requests.exceptions.RequestException as e:
             return Response({
                 'error': 'Failed to connect to Orthanc server',
@@ -832,6 +1089,6 @@ class OrthancSeriesNiftiView(APIView):
             }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
         except Exception as e:
             return Response({
-                'error': 'Failed to convert to NIfTI',
+                'error': 'Failed to export volume',
                 'details': str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -0,0 +1,458 @@
+# orthanc_server/volumes.py
+"""
+Series -> 볼륨 파일 변환
+- SEG -> NIfTI: 인스턴스 파일은 디스크 캐시(instance_cache)에서 병렬로 받아 헤더만 먼저 읽고,
+  미리 할당한 볼륨 배열에 슬라이스를 병렬로 디코딩해 채움 (전체 데이터셋 / 중간 배열을 들고 있지 않음)
+- CT -> NIfTI / npz: SimpleITK ImageSeriesReader (멀티스레드, 방향 코사인 / 원점 유지, 선택적 등방성 리샘플링)
+- 결과 파일은 SeriesInstanceUID 기준 파일명으로 캐시 (인스턴스 수가 바뀌면 새로 생성),
+  용량 초과 시 마지막 사용 시간(mtime) 기준으로 오래된 파일부터 삭제
+"""
+import hashlib
+import math
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import nibabel as nib
+import numpy as np
+import pydicom
+
+from .client import ORTHANC_FANOUT_WORKERS, orthanc_get
+from .instance_cache import is_cacheable, link_instance_file, open_instance_file, read_instance_bytes
+
+
+NIFTI_CACHE_DIR = os.getenv(
+    'NIFTI_CACHE_DIR',
+    os.path.join(tempfile.gettempdir(), 'liverguard_nifti_cache')
+)
+
+# 볼륨 캐시 최대 용량 (바이트, 기본 5GB)
+NIFTI_CACHE_MAX_BYTES = int(os.getenv('NIFTI_CACHE_MAX_BYTES', 5 * 1024 ** 3))
+
+# 슬라이스 다운로드 / 디코딩 병렬 워커 수
+VOLUME_WORKERS = int(os.getenv('VOLUME_WORKERS', ORTHANC_FANOUT_WORKERS))
+
+
+class EmptySeries(Exception):
+    """변환할 인스턴스가 없는 Series"""
+
+
+class VolumeTooLarge(ValueError):
+    """리샘플링 결과 복셀 수가 CT_VOLUME_MAX_VOXELS를 넘는 경우"""
+
+
+def _read_instance(instance_id, **kwargs):
+    """
+    Instance 데이터셋 읽기 (캐시 파일은 열린 핸들로 읽음 - 다른 워커의 캐시 정리와 겹쳐도 안전,
+    캐시 불가 ID는 메모리 버퍼)
+    """
+    if is_cacheable(instance_id):
+        with open_instance_file(instance_id) as source:
+            return pydicom.dcmread(source, **kwargs)
+    return pydicom.dcmread(pydicom.filebase.DicomBytesIO(read_instance_bytes(instance_id)), **kwargs)
+
+
+def _read_header(instance_id, source=None):
+    if source:
+        header = pydicom.dcmread(source, stop_before_pixels=True)
+    else:
+        header = _read_instance(instance_id, stop_before_pixels=True)
+    return {
+        'instance_id': instance_id,
+        'instance_number': int(getattr(header, 'InstanceNumber', 0) or 0),
+        'frames': int(getattr(header, 'NumberOfFrames', 1) or 1),
+        'rows': int(header.Rows),
+        'columns': int(header.Columns),
+        'header': header,
+    }
+
+
+def _spacing(first_header, second_header=None):
+    """(x, y, z) spacing - PixelSpacing / SliceThickness / ImagePositionPatient 순으로 추정"""
+    try:
+        # Pixel Spacing (row, column)
+        if hasattr(first_header, 'PixelSpacing'):
+            spacing_x = float(first_header.PixelSpacing[1])  # Column spacing
+            spacing_y = float(first_header.PixelSpacing[0])  # Row spacing
+        else:
+            spacing_x = spacing_y = 1.0
+
+        if hasattr(first_header, 'SliceThickness'):
+            spacing_z = float(first_header.SliceThickness)
+        elif (second_header is not None and hasattr(first_header, 'ImagePositionPatient')
+              and hasattr(second_header, 'ImagePositionPatient')):
+            pos1 = np.array(first_header.ImagePositionPatient, dtype=float)
+            pos2 = np.array(second_header.ImagePositionPatient, dtype=float)
+            spacing_z = float(np.linalg.norm(pos2 - pos1))
+        else:
+            spacing_z = 1.0
+    except Exception as e:
+        print(f"Warning: Could not extract spacing info: {e}")
+        spacing_x = spacing_y = spacing_z = 1.0
+    return spacing_x, spacing_y, spacing_z
+
+
+def seg_nifti_cache_path(series_uid, instance_count):
+    """SeriesInstanceUID + 인스턴스 수 기준 캐시 파일 경로"""
+    digest = hashlib.sha1(series_uid.encode('utf-8')).hexdigest()
+    return os.path.join(NIFTI_CACHE_DIR, f'seg_{digest}_{instance_count}.nii.gz')
+
+
+def _remove_stale(path):
+    """같은 Series의 이전 버전(인스턴스 수가 다른 파일) 삭제"""
+    prefix = os.path.basename(path).rsplit('_', 1)[0] + '_'
+    for name in os.listdir(os.path.dirname(path)):
+        if name.startswith(prefix) and name != os.path.basename(path):
+            try:
+                os.remove(os.path.join(os.path.dirname(path), name))
+            except OSError:
+                pass
+
+
+def _touch(path):
+    """캐시 적중 시 사용 시간 갱신 (LRU 정리 기준), 이미 정리된 파일이면 False"""
+    try:
+        os.utime(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def evict_volume_cache(max_bytes=None, keep=None):
+    """
+    볼륨 캐시 용량 초과 시 오래 사용하지 않은 파일부터 삭제 (keep 경로는 제외)
+
+    Returns:
+        int: 삭제한 파일 수
+    """
+    max_bytes = NIFTI_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    if not os.path.isdir(NIFTI_CACHE_DIR):
+        return 0
+
+    files = []
+    for entry in os.scandir(NIFTI_CACHE_DIR):
+        # 결과 파일만 대상 (작성 중인 임시 파일 제외)
+        if not entry.name.startswith(('seg_', 'ct_')):
+            continue
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:
+            continue
+        files.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total = sum(size for _, size, _ in files)
+    removed = 0
+    for _, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        if path == keep:
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+    return removed
+
+
+def _save_atomic(image, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.nii.gz')
+    os.close(fd)
+    try:
+        nib.save(image, temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    _remove_stale(path)
+    evict_volume_cache(keep=path)
+
+
+def build_seg_nifti(series_id, progress_callback=None, workers=None):
+    """
+    Orthanc Series를 NIfTI(.nii.gz)로 변환 (캐시가 있으면 그대로 반환)
+
+    Args:
+        series_id: Orthanc Series ID
+        progress_callback: callable(processed, total) - 디코딩한 인스턴스 수
+        workers: 병렬 워커 수
+
+    Returns:
+        str: .nii.gz 파일 경로
+
+    Raises:
+        EmptySeries: 인스턴스가 없는 경우
+        requests.HTTPError: Orthanc 조회 실패
+    """
+    series = orthanc_get(f'series/{series_id}')
+    instance_ids = series.get('Instances', [])
+    if not instance_ids:
+        raise EmptySeries(f'No instances found in series {series_id}')
+
+    series_uid = series.get('MainDicomTags', {}).get('SeriesInstanceUID') or series_id
+    cache_path = seg_nifti_cache_path(series_uid, len(instance_ids))
+    if _touch(cache_path):
+        return cache_path
+
+    workers = min(workers or VOLUME_WORKERS, len(instance_ids))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # Step 1: 파일 다운로드(캐시) + 헤더만 읽어 InstanceNumber 순 정렬
+        headers = sorted(executor.map(_read_header, instance_ids), key=lambda item: item['instance_number'])
+
+        rows, columns = headers[0]['rows'], headers[0]['columns']
+        offsets = np.cumsum([0] + [item['frames'] for item in headers])
+        total_frames = int(offsets[-1])
+
+        # Step 2: 첫 슬라이스로 dtype 확인 후 (x, y, z) 볼륨을 한 번만 할당
+        # Fortran 순서라 volume[:, :, k]가 연속 메모리 -> NIfTI 저장 시 추가 복사 없음
+        first_pixels = _read_instance(headers[0]['instance_id']).pixel_array
+        volume = np.empty((columns, rows, total_frames), dtype=first_pixels.dtype, order='F')
+
+        def place(index, pixels):
+            frames = pixels.reshape(-1, rows, columns)
+            for frame_offset, frame in enumerate(frames):
+                # DICOM (y, x) -> NIfTI (x, y)
+                volume[:, :, offsets[index] + frame_offset] = frame.T
+
+        place(0, first_pixels)
+        del first_pixels
+
+        def decode(index):
+            pixels = _read_instance(headers[index]['instance_id']).pixel_array
+            place(index, pixels)
+
+        processed = 1
+        if progress_callback:
+            progress_callback(processed, len(headers))
+        # Step 3: 나머지 슬라이스 병렬 디코딩 (데이터셋은 슬라이스마다 바로 해제)
+        for _ in executor.map(decode, range(1, len(headers))):
+            processed += 1
+            if progress_callback:
+                progress_callback(processed, len(headers))
+
+    spacing_x, spacing_y, spacing_z = _spacing(
+        headers[0]['header'], headers[1]['header'] if len(headers) > 1 else None
+    )
+
+    # Affine 매트릭스 생성 (spacing 정보 포함)
+    affine = np.diag([spacing_x, spacing_y, spacing_z, 1.0])
+
+    _save_atomic(nib.Nifti1Image(volume, affine), cache_path)
+    return cache_path
+
+
+# ========================================
+# CT 볼륨 내보내기 (SimpleITK)
+# ========================================
+
+# 지원 출력 형식: dtype -> 확장자
+# NIfTI에는 float16 형식이 없으므로 float16은 NumPy .npz (volume, affine)로 저장
+VOLUME_OUTPUT_FORMATS = {
+    'int16': '.nii.gz',
+    'float32': '.nii.gz',
+    'float16': '.npz',
+}
+
+# CT HU 기본값 (리샘플링 시 영상 밖 영역)
+AIR_HU = -1024
+
+# 등방성 리샘플링 허용 간격 (mm), 캐시 키 / 리샘플링은 0.01mm 단위로 반올림한 값 사용
+CT_SPACING_MIN = 0.25
+CT_SPACING_MAX = 10.0
+
+# 리샘플링 결과 최대 복셀 수 (기본 512 x 512 x 1024, int16 기준 약 512MB)
+CT_VOLUME_MAX_VOXELS = int(os.getenv('CT_VOLUME_MAX_VOXELS', 512 * 512 * 1024))
+
+
+def normalize_spacing(spacing):
+    """
+    리샘플링 간격 검증 + 반올림 (None이면 원본 격자)
+
+    Raises:
+        ValueError: 숫자가 아니거나 유한하지 않은 값 / 허용 범위 밖
+    """
+    if spacing is None:
+        return None
+    try:
+        spacing = float(spacing)
+    except (TypeError, ValueError):
+        raise ValueError('spacing은 숫자여야 합니다.')
+    if not math.isfinite(spacing) or not CT_SPACING_MIN <= spacing <= CT_SPACING_MAX:
+        raise ValueError(f'spacing은 {CT_SPACING_MIN}~{CT_SPACING_MAX}mm 범위여야 합니다.')
+    return round(spacing, 2)
+
+
+def _slice_position(item):
+    """슬라이스 법선 방향 위치 (ImagePositionPatient · normal), 없으면 InstanceNumber"""
+    header = item['header']
+    orientation = getattr(header, 'ImageOrientationPatient', None)
+    position = getattr(header, 'ImagePositionPatient', None)
+    if orientation is None or position is None:
+        return float(item['instance_number'])
+    row, column = np.array(orientation[:3], dtype=float), np.array(orientation[3:], dtype=float)
+    return float(np.dot(np.cross(row, column), np.array(position, dtype=float)))
+
+
+def ct_volume_cache_path(series_uid, instance_count, spacing=None, dtype='int16'):
+    """SeriesInstanceUID + 인스턴스 수 + 출력 옵션 기준 캐시 파일 경로"""
+    digest = hashlib.sha1(series_uid.encode('utf-8')).hexdigest()
+    variant = f"{dtype}_{'iso' + format(spacing, 'g') if spacing else 'native'}"
+    return os.path.join(NIFTI_CACHE_DIR, f'ct_{digest}_{variant}_{instance_count}{VOLUME_OUTPUT_FORMATS[dtype]}')
+
+
+def lps_to_ras_affine(image):
+    """SimpleITK 이미지(LPS 물리 좌표) -> NIfTI(RAS) affine"""
+    direction = np.array(image.GetDirection(), dtype=float).reshape(3, 3)
+    spacing = np.array(image.GetSpacing(), dtype=float)
+    origin = np.array(image.GetOrigin(), dtype=float)
+    flip = np.diag([-1.0, -1.0, 1.0])
+
+    affine = np.eye(4)
+    affine[:3, :3] = flip @ direction @ np.diag(spacing)
+    affine[:3, 3] = flip @ origin
+    return affine
+
+
+def resample_isotropic(image, spacing, interpolator=None):
+    """지정한 간격(mm)의 등방성 격자로 리샘플링 (방향 / 원점 유지)"""
+    import SimpleITK as sitk
+
+    old_spacing = np.array(image.GetSpacing(), dtype=float)
+    old_size = np.array(image.GetSize(), dtype=float)
+    new_size = [max(int(round(size)), 1) for size in old_size * old_spacing / spacing]
+    if math.prod(new_size) > CT_VOLUME_MAX_VOXELS:
+        raise VolumeTooLarge(
+            f'리샘플링 결과가 너무 큽니다 ({" x ".join(map(str, new_size))}), spacing을 늘려 주세요.'
+        )
+    return sitk.Resample(
+        image,
+        new_size,
+        sitk.Transform(),
+        interpolator if interpolator is not None else sitk.sitkLinear,
+        image.GetOrigin(),
+        (spacing, spacing, spacing),
+        image.GetDirection(),
+        AIR_HU,
+        image.GetPixelID(),
+    )
+
+
+def build_ct_volume(series_id, spacing=None, dtype='int16', progress_callback=None, workers=None):
+    """
+    CT Series를 볼륨 파일로 내보내기 (캐시가 있으면 그대로 반환)
+
+    - 인스턴스 파일을 디스크 캐시로 병렬 다운로드해 임시 디렉터리에 하드 링크 + 헤더로 슬라이스 위치 정렬
+      (ImageSeriesReader가 읽는 도중 다른 작업의 캐시 정리로 파일이 지워지지 않도록)
+    - SimpleITK ImageSeriesReader로 읽기 (멀티스레드, rescale slope/intercept 적용, 방향 코사인 / 원점 유지)
+    - 선택적으로 등방성 간격 리샘플링
+
+    Args:
+        series_id: Orthanc Series ID
+        spacing: 등방성 리샘플링 간격(mm, CT_SPACING_MIN~CT_SPACING_MAX), None이면 원본 격자
+        dtype: 'int16' / 'float32' (.nii.gz), 'float16' (.npz)
+        progress_callback: callable(step, progress)
+
+    Returns:
+        str: 결과 파일 경로
+
+    Raises:
+        ValueError: 지원하지 않는 dtype / spacing
+        VolumeTooLarge: 리샘플링 결과가 CT_VOLUME_MAX_VOXELS를 넘는 경우
+        EmptySeries: 인스턴스가 없는 경우
+        requests.HTTPError: Orthanc 조회 실패
+    """
+    import SimpleITK as sitk
+
+    if dtype not in VOLUME_OUTPUT_FORMATS:
+        raise ValueError(f"dtype은 {', '.join(VOLUME_OUTPUT_FORMATS)} 중 하나여야 합니다.")
+    spacing = normalize_spacing(spacing)
+
+    def report(step, progress):
+        if progress_callback:
+            progress_callback(step, progress)
+
+    series = orthanc_get(f'series/{series_id}')
+    instance_ids = series.get('Instances', [])
+    if not instance_ids:
+        raise EmptySeries(f'No instances found in series {series_id}')
+
+    series_uid = series.get('MainDicomTags', {}).get('SeriesInstanceUID') or series_id
+    cache_path = ct_volume_cache_path(series_uid, len(instance_ids), spacing, dtype)
+    if _touch(cache_path):
+        return cache_path
+
+    # Step 1: ImageSeriesReader용 임시 디렉터리에 파일 준비 + 헤더 병렬 조회, 슬라이스 법선 방향 위치로 정렬
+    report('Fetching instances', 10)
+    workers = min(workers or VOLUME_WORKERS, len(instance_ids))
+    temp_dir = tempfile.mkdtemp(prefix='ct_volume_')
+
+    def materialize(indexed):
+        index, instance_id = indexed
+        path = os.path.join(temp_dir, f'{index:05d}.dcm')
+        if is_cacheable(instance_id):
+            # 캐시 파일 하드 링크 (복사 없음, 캐시에서 정리돼도 링크는 남음)
+            link_instance_file(instance_id, path)
+        else:
+            with open(path, 'wb') as dicom_file:
+                dicom_file.write(read_instance_bytes(instance_id))
+        return _read_header(instance_id, source=path), path
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            materialized = list(executor.map(materialize, enumerate(instance_ids)))
+        headers = [item for item, _ in materialized]
+        file_names = {item['instance_id']: path for item, path in materialized}
+
+        headers.sort(key=_slice_position)
+
+        # Step 2: SimpleITK 멀티스레드 읽기
+        report('Reading volume', 40)
+        reader = sitk.ImageSeriesReader()
+        reader.SetFileNames([file_names[item['instance_id']] for item in headers])
+        reader.SetNumberOfThreads(workers)
+        image = reader.Execute()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    # Step 3: 선택적 등방성 리샘플링
+    if spacing:
+        report('Resampling', 60)
+        image = resample_isotropic(image, spacing)
+
+    # Step 4: dtype 변환 + RAS affine으로 저장
+    report('Writing volume', 80)
+    affine = lps_to_ras_affine(image)
+    voxels = sitk.GetArrayViewFromImage(image)  # (z, y, x), 복사 없음
+    if dtype == 'int16':
+        info = np.iinfo(np.int16)
+        voxels = np.clip(np.rint(voxels), info.min, info.max).astype(np.int16)
+    else:
+        voxels = voxels.astype(np.float16 if dtype == 'float16' else np.float32)
+    volume = voxels.transpose(2, 1, 0)  # (x, y, z)
+
+    os.makedirs(NIFTI_CACHE_DIR, exist_ok=True)
+    if dtype == 'float16':
+        fd, temp_path = tempfile.mkstemp(dir=NIFTI_CACHE_DIR, suffix='.npz')
+        os.close(fd)
+        try:
+            with open(temp_path, 'wb') as npz_file:
+                np.savez_compressed(npz_file, volume=volume, affine=affine)
+            os.replace(temp_path, cache_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        _remove_stale(cache_path)
+        evict_volume_cache(keep=cache_path)
+    else:
+        nifti_img = nib.Nifti1Image(volume, affine)
+        nifti_img.set_qform(affine, code=1)
+        nifti_img.set_sform(affine, code=1)
+        _save_atomic(nifti_img, cache_path)
+
+    report('Completed', 100)
+    return cache_path
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 07:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('radiology', '0002_radiologyairun_mask_series_uid'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dicomseries',
+            name='referenced_series_uid',
+            field=models.CharField(blank=True, db_index=True, max_length=64, null=True),
+        ),
+    ]
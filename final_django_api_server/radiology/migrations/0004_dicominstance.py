@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-19 07:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('radiology', '0003_dicomseries_referenced_series_uid'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DICOMInstance',
+            fields=[
+                ('sop_instance_uid', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('orthanc_instance_id', models.CharField(blank=True, max_length=64, null=True)),
+                ('instance_number', models.IntegerField(blank=True, null=True)),
+                ('image_position_z', models.FloatField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('series', models.ForeignKey(db_column='series_uid', on_delete=django.db.models.deletion.CASCADE, to='radiology.dicomseries')),
+            ],
+            options={
+                'db_table': 'hospital"."dicom_instances',
+                'indexes': [models.Index(fields=['series', 'image_position_z', 'instance_number'], name='dicom_instance_order_idx')],
+            },
+        ),
+    ]
@@ -58,6 +58,8 @@ class DICOMSeries(models.Model):
     slice_thickness = models.DecimalField(max_digits=10, decimal_places=4, blank=True, null=True)
     pixel_spacing = models.CharField(max_length=64, blank=True, null=True)
     protocol_name = models.CharField(max_length=128, blank=True, null=True)
+    # SEG 시리즈가 참조하는 원본 시리즈 (ReferencedSeriesSequence)
+    referenced_series_uid = models.CharField(max_length=64, blank=True, null=True, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -67,6 +69,27 @@ class DICOMSeries(models.Model):
         db_table = 'hospital"."dicom_series'
 
 
+class DICOMInstance(models.Model):
+    """DICOM 인스턴스 (슬라이스 순서 / SOPInstanceUID 조회용 인덱스)"""
+
+    sop_instance_uid = models.CharField(max_length=64, primary_key=True)
+    orthanc_instance_id = models.CharField(max_length=64, blank=True, null=True)
+    instance_number = models.IntegerField(blank=True, null=True)
+    # ImagePositionPatient의 z 좌표 (mm)
+    image_position_z = models.FloatField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    series = models.ForeignKey(DICOMSeries, on_delete=models.CASCADE, to_field='series_uid', db_column='series_uid')
+
+    class Meta:
+        db_table = 'hospital"."dicom_instances'
+        indexes = [
+            # 시리즈별 슬라이스 순서 조회용
+            models.Index(fields=['series', 'image_position_z', 'instance_number'], name='dicom_instance_order_idx'),
+        ]
+
+
 
 
 class RadiologyAIRun(models.Model):
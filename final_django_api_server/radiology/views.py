@@ -3,9 +3,9 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny
 from django.db.models import Q
-from django.utils import timezone
 from accounts.permissions import IsRadiologist, IsDoctorOrRadiologist
 from doctor.models import Patient, Encounter
+from doctor.encounter_workflow import transition_encounter, TransitionConflict
 from .serializers import PatientWaitlistSerializer, RadiologyQueueSerializer, EncounterWaitlistSerializer
 
 
@@ -97,18 +97,19 @@ class StartFilmingView(APIView):
                     Encounter.WorkflowState.WAITING_IMAGING,
                     Encounter.WorkflowState.IN_IMAGING,
                 ],
-            ).order_by('-state_entered_at').first()
+            ).select_related('patient').order_by('-state_entered_at').first()
 
             if not encounter:
                 return Response({
                     'error': f'Encounter for patient {patient_id} not found'
                 }, status=status.HTTP_404_NOT_FOUND)
 
-            # 상태 업데이트
-            encounter.workflow_state = Encounter.WorkflowState.IN_IMAGING
-            encounter.status = Encounter.Status.IN_PROGRESS
-            encounter.state_entered_at = timezone.now()
-            encounter.save()
+            # 상태 전이 (조건부 UPDATE + 카운트/캐시/알림 아웃박스)
+            transition_encounter(
+                encounter,
+                Encounter.WorkflowState.IN_IMAGING,
+                message=f"촬영 시작: {encounter.patient.name}"
+            )
 
             # 업데이트된 환자 정보 직렬화
             serializer = EncounterWaitlistSerializer(encounter)
@@ -118,6 +119,10 @@ class StartFilmingView(APIView):
                 'patient': serializer.data
             }, status=status.HTTP_200_OK)
 
+        except TransitionConflict as e:
+            return Response({
+                'error': str(e)
+            }, status=status.HTTP_409_CONFLICT)
         except Exception as e:
             return Response({
                 'error': str(e)
@@ -151,19 +156,19 @@ class EndFilmingView(APIView):
                     Encounter.WorkflowState.WAITING_IMAGING,
                     Encounter.WorkflowState.IN_IMAGING,
                 ],
-            ).order_by('-state_entered_at').first()
+            ).select_related('patient').order_by('-state_entered_at').first()
 
             if not encounter:
                 return Response({
                     'error': f'Encounter for patient {patient_id} not found'
                 }, status=status.HTTP_404_NOT_FOUND)
 
-            # 상태 업데이트
-            encounter.workflow_state = Encounter.WorkflowState.COMPLETED
-            encounter.status = Encounter.Status.COMPLETED
-            encounter.end_time = timezone.now()
-            encounter.state_entered_at = timezone.now()
-            encounter.save()
+            # 상태 전이 (조건부 UPDATE + 카운트/캐시/알림 아웃박스)
+            transition_encounter(
+                encounter,
+                Encounter.WorkflowState.COMPLETED,
+                message=f"촬영 종료: {encounter.patient.name}"
+            )
 
             # 업데이트된 환자 정보 직렬화
             serializer = EncounterWaitlistSerializer(encounter)
@@ -173,6 +178,10 @@ class EndFilmingView(APIView):
                 'patient': serializer.data
             }, status=status.HTTP_200_OK)
 
+        except TransitionConflict as e:
+            return Response({
+                'error': str(e)
+            }, status=status.HTTP_409_CONFLICT)
         except Exception as e:
             return Response({
                 'error': str(e)